@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # Base directory (travel_app folder)
@@ -5,3 +6,103 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 # SQLite database path
 DATABASE_URL = f"sqlite:///{BASE_DIR / 'travel.db'}"
+
+# =====================================================
+# EXTERNAL SUPPLIER RATES
+# =====================================================
+
+# Base URL of the GRN REST API (unset = built-in mock pricing)
+GRN_API_URL = os.getenv("GRN_API_URL")
+
+# Max in-flight rate calls per supplier while pricing one quotation
+SUPPLIER_MAX_CONCURRENCY = int(os.getenv("SUPPLIER_MAX_CONCURRENCY", "8"))
+
+# Wall-clock budget (seconds) for all supplier calls of one request
+SUPPLIER_RATE_DEADLINE = float(os.getenv("SUPPLIER_RATE_DEADLINE", "8"))
+
+# Rate cache: fresh for TTL, then served stale (and refreshed in the
+# background) for STALE_TTL more seconds before a blocking refetch
+RATE_CACHE_TTL = int(os.getenv("RATE_CACHE_TTL", "900"))
+RATE_CACHE_STALE_TTL = int(os.getenv("RATE_CACHE_STALE_TTL", "3600"))
+RATE_CACHE_MAX_ENTRIES = int(os.getenv("RATE_CACHE_MAX_ENTRIES", "10000"))
+
+# Supplier down: serve the last persisted price for the same stay dates
+# if it is at most this old
+RATE_CACHE_FALLBACK_MAX_AGE = int(os.getenv("RATE_CACHE_FALLBACK_MAX_AGE", "86400"))
+
+# =====================================================
+# DOCUMENT NUMBERING
+# =====================================================
+
+# Numbers each worker reserves per counter round trip. Unused numbers of
+# a block are skipped when the worker exits, so keep this small.
+NUMBER_BLOCK_SIZE = int(os.getenv("NUMBER_BLOCK_SIZE", "20"))
+
+# =====================================================
+# PDF RENDERING
+# =====================================================
+
+# Worker processes for ReportLab layout (kept off the API threadpool)
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Renders allowed queued or running before requests get 503
+PDF_RENDER_MAX_PENDING = int(os.getenv("PDF_RENDER_MAX_PENDING", str(PDF_RENDER_WORKERS * 4)))
+
+# Seconds a request waits for its document before giving up
+PDF_RENDER_TIMEOUT = float(os.getenv("PDF_RENDER_TIMEOUT", "30"))
+
+# Retry-After (seconds) sent with the 503 when the queue is full
+PDF_RENDER_RETRY_AFTER = int(os.getenv("PDF_RENDER_RETRY_AFTER", "5"))
+
+# Rendered-PDF cache on local disk (content-addressed, LRU by mtime)
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", str(BASE_DIR / ".pdf_cache"))
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# =====================================================
+# DOCUMENT BATCHES
+# =====================================================
+
+# Work dirs (rendered parts) and finished ZIPs of batch jobs
+DOCUMENT_BATCH_DIR = os.getenv("DOCUMENT_BATCH_DIR", str(BASE_DIR / ".document_batches"))
+
+# Worker processes used by batch jobs (separate from the request pool)
+DOCUMENT_BATCH_WORKERS = int(os.getenv("DOCUMENT_BATCH_WORKERS", str(os.cpu_count() or 1)))
+
+# Documents loaded, rendered and checkpointed per step
+DOCUMENT_BATCH_CHUNK = int(os.getenv("DOCUMENT_BATCH_CHUNK", "50"))
+
+# A RUNNING batch whose heartbeat is older than this is considered abandoned
+DOCUMENT_BATCH_LEASE = int(os.getenv("DOCUMENT_BATCH_LEASE", "120"))
+
+# =====================================================
+# OVERDUE SWEEPER
+# =====================================================
+
+# Seconds between scheduled sweeps (0 disables the in-process scheduler)
+OVERDUE_SWEEP_INTERVAL = float(os.getenv("OVERDUE_SWEEP_INTERVAL", "3600"))
+
+# Invoices updated per transaction; keeps row locks short
+OVERDUE_SWEEP_BATCH = int(os.getenv("OVERDUE_SWEEP_BATCH", "1000"))
+
+# =====================================================
+# SUMMARY CACHE
+# =====================================================
+
+# Dashboard / account summaries are recomputed after any local commit to
+# the tables they read, and at least this often (seconds) regardless
+SUMMARY_MAX_STALENESS = float(os.getenv("SUMMARY_MAX_STALENESS", "30"))
+
+# =====================================================
+# SERVICE RATE INDEX
+# =====================================================
+
+# Seconds a service's rates stay in the per-process index when no local
+# commit touched service_rates (covers writes from other workers)
+RATE_INDEX_TTL = float(os.getenv("RATE_INDEX_TTL", "300"))
+
+# Services kept in the index; least recently used are dropped first
+RATE_INDEX_MAX_SERVICES = int(os.getenv("RATE_INDEX_MAX_SERVICES", "20000"))
+
+# Currency quotations are priced in; "cheapest vendor" only compares
+# rates in one currency
+BASE_CURRENCY = os.getenv("BASE_CURRENCY", "PKR").upper()
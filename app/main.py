@@ -1,14 +1,41 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
+
+# =====================================================
+# STARTUP / SHUTDOWN
+# =====================================================
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+
+    from app.services import document_batches
+    from app.services.overdue_sweeper import overdue_sweeper
+    from app.services.pdf_render import pdf_renderer
+
+    # Pick up batch jobs a previous process did not finish
+    document_batches.resume_batches()
+
+    overdue_sweeper.start()
+
+    yield
+
+    overdue_sweeper.stop()
+    document_batches.shutdown()
+    pdf_renderer.shutdown()
+
+
 # =====================================================
 # INITIALIZE APP
 # =====================================================
 
 app = FastAPI(
     title="VoyageOS API",
-    version="4.2.4"
+    version="4.2.4",
+    lifespan=lifespan
 )
 
 # =====================================================
@@ -45,6 +72,9 @@ from app.routers.dashboard import router as dashboard_router
 from app.routers.payments import router as payments_router
 from app.routers.accounts import router as accounts_router
 from app.routers.external_suppliers import router as external_suppliers_router  # ✅ NEW
+from app.routers.exports import router as exports_router
+from app.routers.documents import router as documents_router
+from app.routers.pricing_rules import router as pricing_rules_router
 
 # =====================================================
 # STATIC FILES
@@ -73,6 +103,9 @@ app.include_router(dashboard_router)
 app.include_router(payments_router)
 app.include_router(accounts_router)
 app.include_router(external_suppliers_router)  # ✅ NEW
+app.include_router(exports_router)
+app.include_router(documents_router)
+app.include_router(pricing_rules_router)
 
 # =====================================================
 # ROOT
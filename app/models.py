@@ -1,6 +1,7 @@
 from sqlalchemy import (
     Column, Integer, String, Float, DateTime,
-    ForeignKey, Date, Enum, Text, Boolean
+    ForeignKey, Date, Enum, Text, Boolean,
+    UniqueConstraint, Index
 )
 from sqlalchemy.orm import relationship
 from datetime import datetime, date
@@ -58,6 +59,24 @@ class SupplierAPIType(str, enum.Enum):
     MANUAL = "MANUAL"
 
 
+class DocumentBatchKind(str, enum.Enum):
+    INVOICE_PACK = "INVOICE_PACK"
+    CLIENT_STATEMENTS = "CLIENT_STATEMENTS"
+
+
+class BatchStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+
+class PricingRuleKind(str, enum.Enum):
+    SEASON = "SEASON"        # nights inside valid_from..valid_to
+    WEEKDAY = "WEEKDAY"      # nights falling on `weekdays`
+    MIN_STAY = "MIN_STAY"    # every night of stays shorter than min_nights
+
+
 # =====================================================
 # EXTERNAL SUPPLIER (NEW FOUNDATION)
 # =====================================================
@@ -93,14 +112,141 @@ class ExternalProduct(Base):
     city_name = Column(String)
     country_name = Column(String)
 
+    # Last supplier price and the stay it was quoted for
     last_known_price = Column(Float)
     currency = Column(String)
+    last_price_at = Column(DateTime, nullable=True)
+    last_price_start_date = Column(Date, nullable=True)
+    last_price_end_date = Column(Date, nullable=True)
 
     created_at = Column(DateTime, default=datetime.utcnow)
 
     supplier = relationship("ExternalSupplier", back_populates="products")
 
 
+# =====================================================
+# DOCUMENT NUMBERING
+# =====================================================
+
+class DocumentCounter(Base):
+    __tablename__ = "document_counters"
+
+    series = Column(String, primary_key=True)     # QT / INV / RCPT
+    year = Column(Integer, primary_key=True)      # 0 = never resets
+    last_value = Column(Integer, nullable=False, default=0)
+
+
+# =====================================================
+# DOCUMENT BATCHES (month-end packs / statements)
+# =====================================================
+
+class DocumentBatch(Base):
+    __tablename__ = "document_batches"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    kind = Column(Enum(DocumentBatchKind), nullable=False)
+    status = Column(Enum(BatchStatus), nullable=False, default=BatchStatus.PENDING, index=True)
+
+    # Filters
+    client_id = Column(Integer, ForeignKey("clients.id"), nullable=True)
+    date_from = Column(Date, nullable=True)
+    date_to = Column(Date, nullable=True)
+
+    # Progress
+    total = Column(Integer, default=0)
+    rendered = Column(Integer, default=0)
+    heartbeat_at = Column(DateTime, nullable=True)   # lease held by the running worker
+
+    file_path = Column(String, nullable=True)
+    file_size = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+# =====================================================
+# FINANCE ROLLUPS (maintained on invoice/payment writes)
+# =====================================================
+
+class FinanceRollup(Base):
+    __tablename__ = "finance_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    granularity = Column(String(5), nullable=False)     # day / month
+    period = Column(Date, nullable=False)               # the day, or 1st of the month
+
+    client_id = Column(Integer, nullable=False, default=0)
+    country_id = Column(Integer, nullable=False, default=0)   # 0 = unknown
+    category = Column(Enum(ServiceCategory), nullable=False)
+
+    revenue = Column(Float, nullable=False, default=0)
+    cost = Column(Float, nullable=False, default=0)
+    profit = Column(Float, nullable=False, default=0)
+    cash_in = Column(Float, nullable=False, default=0)
+    outstanding = Column(Float, nullable=False, default=0)   # net change in receivables
+    invoices = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "granularity", "period", "client_id", "country_id", "category",
+            name="uq_finance_rollups_key"
+        ),
+        Index("ix_finance_rollups_period", "granularity", "period"),
+    )
+
+
+class FinanceInvoiceShare(Base):
+    """How an invoice's money splits across country/category, frozen when first recorded."""
+
+    __tablename__ = "finance_invoice_shares"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    invoice_id = Column(Integer, ForeignKey("invoices.id"), nullable=False, index=True)
+    country_id = Column(Integer, nullable=False, default=0)
+    category = Column(Enum(ServiceCategory), nullable=False)
+
+    share = Column(Float, nullable=False)     # fraction of the invoice total
+    cost = Column(Float, nullable=False, default=0)
+
+
+# =====================================================
+# NIGHTLY PRICING RULES
+# =====================================================
+
+class PricingRule(Base):
+    __tablename__ = "pricing_rules"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+
+    kind = Column(Enum(PricingRuleKind), nullable=False)
+
+    # Scope (NULL = any)
+    service_id = Column(Integer, ForeignKey("services.id"), nullable=True, index=True)
+    vendor_id = Column(Integer, ForeignKey("vendors.id"), nullable=True)
+    category = Column(Enum(ServiceCategory), nullable=True)
+
+    # Nights the rule applies to (NULL = open ended)
+    valid_from = Column(Date, nullable=True)
+    valid_to = Column(Date, nullable=True)
+
+    weekdays = Column(String, nullable=True)       # "4,5" = Fri, Sat (Mon = 0)
+    min_nights = Column(Integer, nullable=True)
+
+    # Per-night adjustment: cost * (1 + percent / 100) + amount.
+    # A MIN_STAY rule with neither makes shorter stays unbookable.
+    percent = Column(Float, nullable=False, default=0)
+    amount = Column(Float, nullable=False, default=0)
+
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
 # =====================================================
 # EXISTING MODELS (UNCHANGED BELOW)
 # =====================================================
@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import datetime
+from datetime import date
+from typing import Optional
 
 from app.database import get_db
-from app import models
+from app import schemas
 from app.dependencies import get_current_user   # 🔐 NEW
+from app.services.finance_rollups import series
+from app.services.overdue_sweeper import overdue_sweeper
+from app.services.receivables_aging import aging_report, aging_statement
+from app.services.summaries import accounts_summary as cached_accounts_summary
+from app.utils.streaming_export import export_response
 
 
 router = APIRouter(
@@ -17,36 +22,60 @@ router = APIRouter(
 
 @router.get("/summary")
 def accounts_summary(db: Session = Depends(get_db)):
+    return cached_accounts_summary(db)
 
-    total_revenue = db.query(
-        func.coalesce(func.sum(models.Invoice.total_amount), 0)
-    ).scalar()
-
-    total_paid = db.query(
-        func.coalesce(func.sum(models.Invoice.paid_amount), 0)
-    ).scalar()
-
-    total_outstanding = db.query(
-        func.coalesce(func.sum(models.Invoice.due_amount), 0)
-    ).scalar()
-
-    total_invoices = db.query(models.Invoice).count()
-
-    # Monthly Cashflow (Paid grouped by month)
-    monthly = db.query(
-        func.to_char(models.Invoice.created_at, "Mon").label("month"),
-        func.coalesce(func.sum(models.Invoice.paid_amount), 0).label("cash_in")
-    ).group_by("month").all()
-
-    monthly_cashflow = [
-        {"month": m.month, "cash_in": float(m.cash_in)}
-        for m in monthly
-    ]
-
-    return {
-        "total_revenue": float(total_revenue),
-        "total_paid": float(total_paid),
-        "total_outstanding": float(total_outstanding),
-        "total_invoices": total_invoices,
-        "monthly_cashflow": monthly_cashflow
-    }
+
+# =====================================================
+# RECEIVABLES AGING
+# =====================================================
+
+@router.get("/aging", response_model=schemas.AgingReport)
+def get_receivables_aging(
+    as_of: Optional[date] = Query(None),
+    client_id: Optional[int] = Query(None),
+    format: Optional[schemas.ExportFormat] = Query(None),
+    db: Session = Depends(get_db)
+):
+
+    as_of = as_of or date.today()
+
+    # Files stream straight from a server-side cursor
+    if format:
+        return export_response(aging_statement(as_of, client_id), format, "aging")
+
+    return aging_report(db, as_of, client_id)
+
+
+# =====================================================
+# ROLLUP SERIES (charts)
+# =====================================================
+
+@router.get("/rollups")
+def get_rollup_series(
+    granularity: schemas.RollupGranularity = schemas.RollupGranularity.MONTH,
+    group_by: Optional[schemas.RollupDimension] = None,
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    db: Session = Depends(get_db)
+):
+    return series(
+        db,
+        granularity.value,
+        date_from,
+        date_to,
+        group_by.value if group_by else None
+    )
+
+
+# =====================================================
+# OVERDUE SWEEP
+# =====================================================
+
+@router.post("/overdue-sweep")
+def run_overdue_sweep():
+    return overdue_sweeper.run_once("manual")
+
+
+@router.get("/overdue-sweep")
+def get_overdue_sweep_stats():
+    return overdue_sweeper.stats()
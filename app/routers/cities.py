@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session, joinedload
-from typing import List
+from typing import List, Optional, Union
 
 from app.database import get_db
 from app import models, schemas
 from app.dependencies import get_current_user  # 🔐 NEW
+from app.utils.pagination import PageParams, page_params, paginate
 
 
 router = APIRouter(
@@ -54,16 +55,24 @@ def create_city(
 # GET ALL CITIES (Alphabetical Order)
 # =====================================================
 
-@router.get("/", response_model=List[schemas.CityResponse])
-def get_cities(db: Session = Depends(get_db)):
+@router.get(
+    "/",
+    response_model=Union[schemas.Page[schemas.CityResponse], List[schemas.CityResponse]]
+)
+def get_cities(
+    country_id: Optional[int] = Query(None),
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db)
+):
 
     cities = db.query(models.City).options(
         joinedload(models.City.country)
-    ).order_by(
-        models.City.name.asc()
-    ).all()
+    )
 
-    return cities
+    if country_id:
+        cities = cities.filter(models.City.country_id == country_id)
+
+    return paginate(db, cities, [models.City.name, models.City.id], page)
 
 
 # =====================================================
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import date
+from typing import List, Optional, Union
 
 from app.database import get_db
 from app import models, schemas
 from app.dependencies import get_current_user  # ✅ FIXED
+from app.services.client_ledger import client_ledger
+from app.utils.pagination import DEFAULT_LIMIT, MAX_LIMIT, PageParams, page_params, paginate
 
 
 router = APIRouter(
@@ -49,9 +52,22 @@ def create_client(
 # ===============================
 # GET ALL CLIENTS
 # ===============================
-@router.get("/", response_model=List[schemas.ClientResponse])
-def get_clients(db: Session = Depends(get_db)):
-    return db.query(models.Client).all()
+@router.get(
+    "/",
+    response_model=Union[schemas.Page[schemas.ClientResponse], List[schemas.ClientResponse]]
+)
+def get_clients(
+    search: Optional[str] = Query(None),
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db)
+):
+
+    query = db.query(models.Client)
+
+    if search:
+        query = query.filter(models.Client.company_name.ilike(f"%{search}%"))
+
+    return paginate(db, query, [models.Client.id], page)
 
 
 # ===============================
@@ -70,6 +86,29 @@ def get_client(client_id: int, db: Session = Depends(get_db)):
     return client
 
 
+# ===============================
+# CLIENT LEDGER (running balance)
+# ===============================
+@router.get("/{client_id}/ledger", response_model=schemas.ClientLedger)
+def get_client_ledger(
+    client_id: int,
+    date_from: Optional[date] = Query(None, description="Earlier entries collapse into the opening balance"),
+    date_to: Optional[date] = Query(None),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    db: Session = Depends(get_db)
+):
+
+    exists = db.query(models.Client.id).filter(
+        models.Client.id == client_id
+    ).first()
+
+    if not exists:
+        raise HTTPException(status_code=404, detail="Client not found")
+
+    return client_ledger(db, client_id, date_from, date_to, limit, cursor)
+
+
 # ===============================
 # DELETE CLIENT
 # ===============================
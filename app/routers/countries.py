@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Union
 
 from app.database import get_db
-from app import models
+from app import models, schemas
 from pydantic import BaseModel
 from app.dependencies import get_current_user  # 🔐 NEW
+from app.utils.pagination import PageParams, page_params, paginate
 
 
 # =============================
@@ -61,6 +62,9 @@ def create_country(data: CountryCreate, db: Session = Depends(get_db)):
 # GET ALL COUNTRIES
 # =============================
 
-@router.get("/", response_model=List[CountryResponse])
-def get_countries(db: Session = Depends(get_db)):
-    return db.query(models.Country).all()
+@router.get("/", response_model=Union[schemas.Page[CountryResponse], List[CountryResponse]])
+def get_countries(
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db)
+):
+    return paginate(db, db.query(models.Country), [models.Country.id], page)
@@ -0,0 +1,114 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from pathlib import Path
+
+from app.database import get_db
+from app import models, schemas
+from app.dependencies import get_current_user
+from app.services.document_batches import submit_batch
+
+
+router = APIRouter(
+    prefix="/documents",
+    tags=["Documents"],
+    dependencies=[Depends(get_current_user)]   # 🔒 GLOBAL PROTECTION
+)
+
+
+def _get_batch(db: Session, batch_id: int) -> models.DocumentBatch:
+
+    batch = db.query(models.DocumentBatch).filter(
+        models.DocumentBatch.id == batch_id
+    ).first()
+
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    return batch
+
+
+# =====================================================
+# CREATE BATCH (runs in the background)
+# =====================================================
+
+@router.post("/batches", response_model=schemas.DocumentBatchResponse, status_code=202)
+def create_batch(data: schemas.DocumentBatchCreate, db: Session = Depends(get_db)):
+
+    if data.date_from and data.date_to and data.date_from > data.date_to:
+        raise HTTPException(status_code=400, detail="date_from must be before date_to")
+
+    if data.client_id:
+        exists = db.query(models.Client.id).filter(
+            models.Client.id == data.client_id
+        ).first()
+        if not exists:
+            raise HTTPException(status_code=404, detail="Client not found")
+
+    batch = models.DocumentBatch(
+        kind=models.DocumentBatchKind(data.kind.value),
+        status=models.BatchStatus.PENDING,
+        client_id=data.client_id,
+        date_from=data.date_from,
+        date_to=data.date_to
+    )
+
+    db.add(batch)
+    db.commit()
+    db.refresh(batch)
+
+    submit_batch(batch.id)
+
+    return batch
+
+
+# =====================================================
+# STATUS
+# =====================================================
+
+@router.get("/batches/{batch_id}", response_model=schemas.DocumentBatchResponse)
+def get_batch(batch_id: int, db: Session = Depends(get_db)):
+    return _get_batch(db, batch_id)
+
+
+# =====================================================
+# RETRY A FAILED BATCH (keeps already rendered parts)
+# =====================================================
+
+@router.post("/batches/{batch_id}/retry", response_model=schemas.DocumentBatchResponse, status_code=202)
+def retry_batch(batch_id: int, db: Session = Depends(get_db)):
+
+    batch = _get_batch(db, batch_id)
+
+    if batch.status != models.BatchStatus.FAILED:
+        raise HTTPException(status_code=409, detail="Only failed batches can be retried")
+
+    batch.status = models.BatchStatus.PENDING
+    batch.error = None
+    batch.finished_at = None
+    db.commit()
+    db.refresh(batch)
+
+    submit_batch(batch.id)
+
+    return batch
+
+
+# =====================================================
+# DOWNLOAD ZIP
+# =====================================================
+
+@router.get("/batches/{batch_id}/download")
+def download_batch(batch_id: int, db: Session = Depends(get_db)):
+
+    batch = _get_batch(db, batch_id)
+
+    if batch.status != models.BatchStatus.COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Batch is {batch.status.value}")
+
+    path = Path(batch.file_path or "")
+
+    if not path.is_file():
+        raise HTTPException(status_code=410, detail="Batch file is no longer available")
+
+    return FileResponse(path, media_type="application/zip", filename=path.name)
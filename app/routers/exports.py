@@ -0,0 +1,164 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from datetime import date, timedelta
+from typing import Optional
+
+from app import models, schemas
+from app.dependencies import get_current_user
+from app.utils.streaming_export import export_response
+
+
+router = APIRouter(
+    prefix="/exports",
+    tags=["Exports"],
+    dependencies=[Depends(get_current_user)]   # 🔒 GLOBAL PROTECTION
+)
+
+
+def _day_range(column, date_from: Optional[date], date_to: Optional[date]):
+    # Inclusive on both ends, works for Date and DateTime columns
+    conditions = []
+    if date_from:
+        conditions.append(column >= date_from)
+    if date_to:
+        conditions.append(column < date_to + timedelta(days=1))
+    return conditions
+
+
+# =====================================================
+# INVOICES EXPORT
+# =====================================================
+
+@router.get("/invoices")
+def export_invoices(
+    format: schemas.ExportFormat = schemas.ExportFormat.CSV,
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    status: Optional[schemas.PaymentStatus] = Query(None),
+    client_id: Optional[int] = Query(None)
+):
+
+    I = models.Invoice
+
+    stmt = select(
+        I.id,
+        I.invoice_number,
+        I.quotation_id,
+        I.client_id,
+        models.Client.company_name.label("client_name"),
+        I.total_amount,
+        I.paid_amount,
+        I.due_amount,
+        I.payment_status,
+        I.created_at
+    ).outerjoin(
+        models.Client, models.Client.id == I.client_id
+    ).where(
+        *_day_range(I.created_at, date_from, date_to)
+    ).order_by(I.id)
+
+    if status:
+        stmt = stmt.where(I.payment_status == models.PaymentStatus(status.value))
+
+    if client_id:
+        stmt = stmt.where(I.client_id == client_id)
+
+    return export_response(stmt, format, "invoices")
+
+
+# =====================================================
+# PAYMENTS EXPORT
+# =====================================================
+
+@router.get("/payments")
+def export_payments(
+    format: schemas.ExportFormat = schemas.ExportFormat.CSV,
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    payment_method: Optional[schemas.PaymentMethod] = Query(None),
+    client_id: Optional[int] = Query(None)
+):
+
+    P = models.InvoicePayment
+    I = models.Invoice
+
+    stmt = select(
+        P.id,
+        P.receipt_number,
+        P.invoice_id,
+        I.invoice_number,
+        I.client_id,
+        models.Client.company_name.label("client_name"),
+        P.payment_date,
+        P.amount,
+        P.payment_method,
+        P.reference_no,
+        P.notes,
+        P.created_at
+    ).join(
+        I, I.id == P.invoice_id
+    ).outerjoin(
+        models.Client, models.Client.id == I.client_id
+    ).where(
+        *_day_range(P.payment_date, date_from, date_to)
+    ).order_by(P.id)
+
+    if payment_method:
+        stmt = stmt.where(P.payment_method == models.PaymentMethod(payment_method.value))
+
+    if client_id:
+        stmt = stmt.where(I.client_id == client_id)
+
+    return export_response(stmt, format, "payments")
+
+
+# =====================================================
+# QUOTATION ITEMS EXPORT
+# =====================================================
+
+@router.get("/quotation-items")
+def export_quotation_items(
+    format: schemas.ExportFormat = schemas.ExportFormat.CSV,
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    status: Optional[schemas.QuotationStatus] = Query(None),
+    client_id: Optional[int] = Query(None)
+):
+
+    QI = models.QuotationItem
+    Q = models.Quotation
+
+    stmt = select(
+        QI.id,
+        QI.quotation_id,
+        Q.quotation_number,
+        Q.status.label("quotation_status"),
+        Q.client_id,
+        QI.service_id,
+        models.Service.name.label("service_name"),
+        QI.vendor_id,
+        QI.external_supplier_id,
+        QI.external_product_id,
+        QI.quantity,
+        QI.start_date,
+        QI.end_date,
+        QI.cost_price,
+        QI.sell_price,
+        QI.total_cost,
+        QI.total_sell,
+        Q.created_at.label("quotation_created_at")
+    ).join(
+        Q, Q.id == QI.quotation_id
+    ).outerjoin(
+        models.Service, models.Service.id == QI.service_id
+    ).where(
+        *_day_range(Q.created_at, date_from, date_to)
+    ).order_by(QI.id)
+
+    if status:
+        stmt = stmt.where(Q.status == models.QuotationStatus(status.value))
+
+    if client_id:
+        stmt = stmt.where(Q.client_id == client_id)
+
+    return export_response(stmt, format, "quotation-items")
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Union
 
 from app.database import get_db
 from app import models, schemas
+from app.services.external_api.rate_cache import rate_cache
+from app.utils.pagination import PageParams, page_params, paginate
 
 router = APIRouter(
     prefix="/external-suppliers",
@@ -25,9 +27,25 @@ def create_supplier(data: schemas.ExternalSupplierCreate, db: Session = Depends(
     return supplier
 
 
-@router.get("/", response_model=List[schemas.ExternalSupplierResponse])
-def list_suppliers(db: Session = Depends(get_db)):
-    return db.query(models.ExternalSupplier).order_by(models.ExternalSupplier.id.desc()).all()
+@router.get(
+    "/",
+    response_model=Union[
+        schemas.Page[schemas.ExternalSupplierResponse],
+        List[schemas.ExternalSupplierResponse]
+    ]
+)
+def list_suppliers(
+    supplier_type: Optional[schemas.SupplierType] = None,
+    is_active: Optional[bool] = None,
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db)
+):
+    query = db.query(models.ExternalSupplier)
+    if supplier_type:
+        query = query.filter_by(supplier_type=models.SupplierType(supplier_type.value))
+    if is_active is not None:
+        query = query.filter_by(is_active=is_active)
+    return paginate(db, query, [models.ExternalSupplier.id], page, descending=True)
 
 
 @router.get("/{supplier_id}", response_model=schemas.ExternalSupplierResponse)
@@ -49,4 +67,13 @@ def update_supplier(supplier_id: int, data: schemas.ExternalSupplierUpdate, db:
 
     db.commit()
     db.refresh(supplier)
-    return suppl
+    return supplier
+
+
+# =====================================================
+# RATE CACHE STATS
+# =====================================================
+
+@router.get("/rate-cache/stats")
+def get_rate_cache_stats():
+    return rate_cache.stats()
@@ -1,15 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile
+from sqlalchemy import delete
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from datetime import datetime, date
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from app.database import get_db
 from app import models, schemas
-from app.utils.pdf_generator import generate_invoice_pdf
-from app.utils.payment_voucher_generator import generate_payment_voucher_pdf
 from app.dependencies import get_current_user
+from app.services.numbering import next_number
+from app.services.invoice_ledger import apply_payment_delta
+from app.services.bank_import import import_statement
+from app.services.finance_rollups import record_invoice, record_invoice_cancel, record_payments
+from app.services.document_snapshots import invoice_snapshot, payment_snapshot
+from app.services.loading_profiles import load_document, release
+from app.services.pdf_cache import cached_pdf_response, pdf_cache
+from app.services.pdf_render import pdf_renderer
+from app.utils.pagination import PageParams, page_params, paginate
 
 
 # ✅ NO GLOBAL JWT
@@ -23,16 +29,7 @@ router = APIRouter(
 # =====================================================
 
 def generate_invoice_number(db: Session):
-    last = db.query(models.Invoice).order_by(models.Invoice.id.desc()).first()
-
-    if not last:
-        return f"INV-{datetime.utcnow().year}-0001"
-
-    try:
-        last_no = int(last.invoice_number.split("-")[-1])
-        return f"INV-{datetime.utcnow().year}-{last_no + 1:04d}"
-    except:
-        return f"INV-{datetime.utcnow().year}-{last.id + 1:04d}"
+    return next_number("INV")
 
 
 # =====================================================
@@ -40,18 +37,7 @@ def generate_invoice_number(db: Session):
 # =====================================================
 
 def generate_receipt_number(db: Session):
-    last = db.query(models.InvoicePayment).order_by(
-        models.InvoicePayment.id.desc()
-    ).first()
-
-    if not last:
-        return f"RCPT-{datetime.utcnow().year}-0001"
-
-    try:
-        last_no = int(last.receipt_number.split("-")[-1])
-        return f"RCPT-{datetime.utcnow().year}-{last_no + 1:04d}"
-    except:
-        return f"RCPT-{datetime.utcnow().year}-{last.id + 1:04d}"
+    return next_number("RCPT")
 
 
 # =====================================================
@@ -94,6 +80,10 @@ def create_invoice(
     )
 
     db.add(invoice)
+    db.flush()
+
+    record_invoice(db, invoice.id)
+
     db.commit()
     db.refresh(invoice)
 
@@ -104,9 +94,15 @@ def create_invoice(
 # GET ALL INVOICES 🔒
 # =====================================================
 
-@router.get("/", response_model=List[schemas.InvoiceResponse])
+@router.get(
+    "/",
+    response_model=Union[schemas.Page[schemas.InvoiceResponse], List[schemas.InvoiceResponse]]
+)
 def get_invoices(
     quotation_id: Optional[int] = None,
+    client_id: Optional[int] = None,
+    payment_status: Optional[schemas.PaymentStatus] = None,
+    page: PageParams = Depends(page_params),
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user)
 ):
@@ -116,29 +112,16 @@ def get_invoices(
     if quotation_id:
         query = query.filter(models.Invoice.quotation_id == quotation_id)
 
-    invoices = query.order_by(models.Invoice.id.desc()).all()
+    if client_id:
+        query = query.filter(models.Invoice.client_id == client_id)
 
-    for inv in invoices:
+    if payment_status:
+        query = query.filter(
+            models.Invoice.payment_status == models.PaymentStatus(payment_status.value)
+        )
 
-        total_paid = db.query(
-            func.coalesce(func.sum(models.InvoicePayment.amount), 0)
-        ).filter(
-            models.InvoicePayment.invoice_id == inv.id
-        ).scalar()
-
-        inv.paid_amount = float(total_paid)
-        inv.due_amount = float(inv.total_amount - inv.paid_amount)
-
-        if inv.due_amount <= 0:
-            inv.due_amount = 0.0
-            inv.payment_status = models.PaymentStatus.PAID
-        elif inv.paid_amount > 0:
-            inv.payment_status = models.PaymentStatus.PARTIAL
-        else:
-            inv.payment_status = models.PaymentStatus.UNPAID
-
-    db.commit()
-    return invoices
+    # Ledger columns are maintained on write → plain read
+    return paginate(db, query, [models.Invoice.id], page, descending=True)
 
 
 # =====================================================
@@ -163,9 +146,19 @@ def cancel_invoice(
     if invoice.payment_status == models.PaymentStatus.PAID:
         raise HTTPException(status_code=400, detail="Cannot cancel paid invoice")
 
+    # Already cancelled: nothing to reverse twice
+    if invoice.payment_status == models.PaymentStatus.CANCELLED:
+        return invoice
+
+    balance_before = float(invoice.due_amount or 0)
+
     invoice.payment_status = models.PaymentStatus.CANCELLED
     invoice.due_amount = 0.0
 
+    db.flush()
+
+    record_invoice_cancel(db, invoice.id, balance_before)
+
     db.commit()
     db.refresh(invoice)
 
@@ -229,29 +222,83 @@ def update_payment(
     )
 
     db.add(payment)
+
+    # 🔥 Ledger update in the same transaction as the payment row
+    apply_payment_delta(db, invoice.id, data.paid_amount)
+    record_payments(db, [(invoice.id, payment.payment_date, data.paid_amount)])
+
     db.commit()
+    db.refresh(invoice)
+
+    return invoice
 
-    total_paid = db.query(
-        func.coalesce(func.sum(models.InvoicePayment.amount), 0)
-    ).filter(
-        models.InvoicePayment.invoice_id == invoice.id
-    ).scalar()
 
-    invoice.paid_amount = float(total_paid)
-    invoice.due_amount = float(invoice.total_amount - invoice.paid_amount)
+# =====================================================
+# BANK STATEMENT IMPORT 🔒
+# =====================================================
 
-    if invoice.due_amount <= 0:
-        invoice.due_amount = 0.0
-        invoice.payment_status = models.PaymentStatus.PAID
-    elif invoice.paid_amount > 0:
-        invoice.payment_status = models.PaymentStatus.PARTIAL
-    else:
-        invoice.payment_status = models.PaymentStatus.UNPAID
+@router.post("/payments/import", response_model=schemas.BankImportResponse)
+def import_bank_statement(
+    file: UploadFile = File(...),
+    payment_method: schemas.PaymentMethod = schemas.PaymentMethod.BANK_TRANSFER,
+    dayfirst: bool = True,
+    dry_run: bool = False,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user)
+):
+
+    raw = file.file.read()
+
+    if not raw:
+        raise HTTPException(status_code=400, detail="Empty file")
+
+    return import_statement(
+        db, raw,
+        payment_method=models.PaymentMethod(payment_method.value),
+        dayfirst=dayfirst,
+        dry_run=dry_run
+    )
+
+
+# =====================================================
+# CANCEL PAYMENT 🔒
+# =====================================================
+
+@router.delete("/payments/{payment_id}",
+               response_model=schemas.InvoiceResponse)
+def cancel_payment(
+    payment_id: int,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user)
+):
+
+    # DELETE ... RETURNING: only the request that actually removed the
+    # row reverses it, so a double submit cannot refund twice
+    removed = db.execute(
+        delete(models.InvoicePayment)
+        .where(models.InvoicePayment.id == payment_id)
+        .returning(
+            models.InvoicePayment.invoice_id,
+            models.InvoicePayment.amount,
+            models.InvoicePayment.payment_date
+        )
+        .execution_options(synchronize_session=False)
+    ).first()
+
+    if not removed:
+        raise HTTPException(status_code=404, detail="Payment not found")
+
+    invoice_id, amount, payment_date = removed
+
+    # Reverse the payment on the ledger atomically
+    apply_payment_delta(db, invoice_id, -amount)
+    record_payments(db, [(invoice_id, payment_date, -amount)])
 
     db.commit()
-    db.refresh(invoice)
 
-    return invoice
+    return db.query(models.Invoice).filter(
+        models.Invoice.id == invoice_id
+    ).first()
 
 
 # =====================================================
@@ -259,24 +306,24 @@ def update_payment(
 # =====================================================
 
 @router.get("/{invoice_id}/pdf")
-def download_invoice_pdf(invoice_id: int, db: Session = Depends(get_db)):
+def download_invoice_pdf(
+    invoice_id: int,
+    request: Request,
+    db: Session = Depends(get_db)
+):
 
-    invoice = db.query(models.Invoice).filter(
-        models.Invoice.id == invoice_id
-    ).first()
+    invoice = load_document(db, "invoice", invoice_id)
 
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
 
-    pdf_buffer = generate_invoice_pdf(invoice)
+    snapshot = invoice_snapshot(invoice)
+    release(db)
 
-    return StreamingResponse(
-        pdf_buffer,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition":
-                f'inline; filename="{invoice.invoice_number}.pdf"'
-        }
+    return cached_pdf_response(
+        request, "invoice", snapshot,
+        f'{snapshot["invoice_number"]}.pdf',
+        pdf_renderer.render
     )
 
 
@@ -285,22 +332,34 @@ def download_invoice_pdf(invoice_id: int, db: Session = Depends(get_db)):
 # =====================================================
 
 @router.get("/payments/{payment_id}/voucher")
-def view_payment_voucher(payment_id: int, db: Session = Depends(get_db)):
+def view_payment_voucher(
+    payment_id: int,
+    request: Request,
+    db: Session = Depends(get_db)
+):
 
-    payment = db.query(models.InvoicePayment).filter(
-        models.InvoicePayment.id == payment_id
-    ).first()
+    payment = load_document(db, "voucher", payment_id)
 
     if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
 
-    pdf_buffer = generate_payment_voucher_pdf(payment)
+    snapshot = payment_snapshot(payment)
+    release(db)
 
-    return StreamingResponse(
-        pdf_buffer,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition":
-                f'inline; filename="Voucher-{payment.receipt_number}.pdf"'
-        }
+    return cached_pdf_response(
+        request, "voucher", snapshot,
+        f'Voucher-{snapshot["receipt_number"]}.pdf',
+        pdf_renderer.render
     )
+
+
+# =====================================================
+# PDF RENDER METRICS 🔒
+# =====================================================
+
+@router.get("/pdf-render/metrics")
+def get_pdf_render_metrics(current_user=Depends(get_current_user)):
+    return {
+        **pdf_renderer.metrics(),
+        "cache": pdf_cache.stats()
+    }
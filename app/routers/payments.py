@@ -7,6 +7,8 @@ from typing import List
 from app.database import get_db
 from app import models
 from app.dependencies import get_current_user   # 🔐 NEW
+from app.services.finance_rollups import record_payments
+from app.services.summaries import payment_summary as cached_payment_summary
 
 
 router = APIRouter(
@@ -46,8 +48,7 @@ def add_payment(
     )
 
     db.add(payment)
-    db.commit()
-    db.refresh(payment)
+    db.flush()
 
     # -------------------------------------------------
     # Recalculate totals
@@ -62,6 +63,8 @@ def add_payment(
     invoice = quotation.invoice
 
     if invoice:
+        paid_before = float(invoice.paid_amount or 0)
+
         invoice.paid_amount = total_paid
         invoice.due_amount = invoice.total_amount - total_paid
 
@@ -76,7 +79,12 @@ def add_payment(
             if quotation.due_date < date.today():
                 invoice.payment_status = models.PaymentStatus.OVERDUE
 
-        db.commit()
+        # Dashboards read finance_rollups: book the change in paid_amount
+        if float(total_paid) != paid_before:
+            db.flush()
+            record_payments(db, [(invoice.id, date.today(), float(total_paid) - paid_before)])
+
+    db.commit()
 
     return {
         "message": "Payment added successfully",
@@ -107,23 +115,4 @@ def get_payments_by_quotation(
 
 @router.get("/summary")
 def payment_summary(db: Session = Depends(get_db)):
-
-    total_collected = db.query(
-        func.coalesce(func.sum(models.Payment.amount_paid), 0)
-    ).scalar()
-
-    total_due = db.query(
-        func.coalesce(func.sum(models.Invoice.due_amount), 0)
-    ).scalar()
-
-    overdue_amount = db.query(
-        func.coalesce(func.sum(models.Invoice.due_amount), 0)
-    ).filter(
-        models.Invoice.payment_status == models.PaymentStatus.OVERDUE
-    ).scalar()
-
-    return {
-        "total_collected": total_collected,
-        "total_due": total_due,
-        "overdue_amount": overdue_amount
-    }
+    return cached_payment_summary(db)
@@ -0,0 +1,100 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.database import get_db
+from app import models, schemas
+from app.dependencies import get_current_user
+
+
+router = APIRouter(
+    prefix="/pricing-rules",
+    tags=["Pricing Rules"],
+    dependencies=[Depends(get_current_user)]   # 🔒 GLOBAL PROTECTION
+)
+
+
+# =====================================================
+# CREATE RULE
+# =====================================================
+
+@router.post("/", response_model=schemas.PricingRuleResponse)
+def create_pricing_rule(data: schemas.PricingRuleCreate, db: Session = Depends(get_db)):
+
+    if data.valid_from and data.valid_to and data.valid_from > data.valid_to:
+        raise HTTPException(status_code=400, detail="valid_from must be before valid_to")
+
+    if data.kind == schemas.PricingRuleKind.WEEKDAY:
+        if not data.weekdays or any(d < 0 or d > 6 for d in data.weekdays):
+            raise HTTPException(status_code=400, detail="WEEKDAY rules need weekdays between 0 (Mon) and 6 (Sun)")
+
+    if data.kind == schemas.PricingRuleKind.MIN_STAY and not data.min_nights:
+        raise HTTPException(status_code=400, detail="MIN_STAY rules need min_nights")
+
+    if data.service_id:
+        exists = db.query(models.Service.id).filter(models.Service.id == data.service_id).first()
+        if not exists:
+            raise HTTPException(status_code=404, detail="Service not found")
+
+    rule = models.PricingRule(
+        name=data.name,
+        kind=models.PricingRuleKind(data.kind.value),
+        service_id=data.service_id,
+        vendor_id=data.vendor_id,
+        category=models.ServiceCategory(data.category.value) if data.category else None,
+        valid_from=data.valid_from,
+        valid_to=data.valid_to,
+        weekdays=",".join(str(d) for d in sorted(set(data.weekdays))) if data.weekdays else None,
+        min_nights=data.min_nights,
+        percent=data.percent,
+        amount=data.amount,
+        is_active=data.is_active
+    )
+
+    db.add(rule)
+    db.commit()
+    db.refresh(rule)
+
+    return rule
+
+
+# =====================================================
+# LIST RULES
+# =====================================================
+
+@router.get("/", response_model=List[schemas.PricingRuleResponse])
+def get_pricing_rules(
+    service_id: Optional[int] = Query(None),
+    active_only: bool = Query(True),
+    db: Session = Depends(get_db)
+):
+
+    rules = db.query(models.PricingRule)
+
+    if service_id:
+        rules = rules.filter(models.PricingRule.service_id == service_id)
+
+    if active_only:
+        rules = rules.filter(models.PricingRule.is_active.is_(True))
+
+    return rules.order_by(models.PricingRule.id).all()
+
+
+# =====================================================
+# DELETE RULE
+# =====================================================
+
+@router.delete("/{rule_id}")
+def delete_pricing_rule(rule_id: int, db: Session = Depends(get_db)):
+
+    rule = db.query(models.PricingRule).filter(
+        models.PricingRule.id == rule_id
+    ).first()
+
+    if not rule:
+        raise HTTPException(status_code=404, detail="Pricing rule not found")
+
+    db.delete(rule)
+    db.commit()
+
+    return {"message": "Pricing rule deleted successfully"}
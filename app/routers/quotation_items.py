@@ -1,10 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from typing import List
 from decimal import Decimal
 
 from app.database import get_db
 from app import models, schemas
+from app.services.lookups import load_by_ids
+from app.services.quotation_totals import apply_item_delta, recompute_totals
 
 router = APIRouter(
     prefix="/quotation-items",
@@ -12,6 +15,37 @@ router = APIRouter(
 )
 
 
+# =====================================================
+# PRICING
+# =====================================================
+
+def price_item(data: schemas.QuotationItemCreate) -> dict:
+
+    cost_price = Decimal(str(data.cost_price))
+    margin_percent = Decimal(str(data.manual_margin_percentage or 0))
+
+    sell_price = cost_price + (cost_price * margin_percent / 100)
+
+    total_cost = cost_price * data.quantity
+    total_sell = sell_price * data.quantity
+
+    return {
+        "quotation_id": data.quotation_id,
+        "service_id": data.service_id,
+        "vendor_id": data.vendor_id,
+        "external_supplier_id": data.external_supplier_id,
+        "external_product_id": data.external_product_id,
+        "quantity": data.quantity,
+        "start_date": data.start_date,
+        "end_date": data.end_date,
+        "manual_margin_percentage": data.manual_margin_percentage,
+        "cost_price": float(cost_price),
+        "sell_price": float(sell_price),
+        "total_cost": float(total_cost),
+        "total_sell": float(total_sell)
+    }
+
+
 # =====================================================
 # CREATE QUOTATION ITEM
 # =====================================================
@@ -43,50 +77,74 @@ def create_quotation_item(
             detail="Cannot use both vendor and external supplier for same item"
         )
 
-    # Pricing logic
-    cost_price = Decimal(str(data.cost_price))
-    margin_percent = Decimal(str(data.manual_margin_percentage or 0))
+    item = models.QuotationItem(**price_item(data))
 
-    sell_price = cost_price + (cost_price * margin_percent / 100)
-
-    total_cost = cost_price * data.quantity
-    total_sell = sell_price * data.quantity
+    db.add(item)
+    db.flush()
 
-    item = models.QuotationItem(
-        quotation_id=data.quotation_id,
-        service_id=data.service_id,
-        vendor_id=data.vendor_id,
-        external_supplier_id=data.external_supplier_id,
-        external_product_id=data.external_product_id,
-        quantity=data.quantity,
-        start_date=data.start_date,
-        end_date=data.end_date,
-        manual_margin_percentage=data.manual_margin_percentage,
-        cost_price=float(cost_price),
-        sell_price=float(sell_price),
-        total_cost=float(total_cost),
-        total_sell=float(total_sell)
-    )
+    # 🔥 Shift quotation totals by this line (same transaction, no reload)
+    apply_item_delta(db, quotation.id, item.total_cost, item.total_sell)
 
-    db.add(item)
     db.commit()
     db.refresh(item)
 
-    # 🔥 Recalculate quotation totals
-    items = db.query(models.QuotationItem).filter(
-        models.QuotationItem.quotation_id == quotation.id
-    ).all()
+    return item
+
 
-    quotation.total_cost = sum(i.total_cost for i in items)
-    quotation.total_sell = sum(i.total_sell for i in items)
-    quotation.total_profit = quotation.total_sell - quotation.total_cost
+# =====================================================
+# BULK CREATE QUOTATION ITEMS
+# =====================================================
+
+@router.post("/bulk", response_model=schemas.QuotationItemBulkResponse)
+def create_quotation_items_bulk(
+    data: schemas.QuotationItemBulkCreate,
+    db: Session = Depends(get_db)
+):
 
-    if quotation.total_cost > 0:
-        quotation.margin_percentage = (
-            quotation.total_profit / quotation.total_cost
-        ) * 100
+    rows = data.items
 
-    db.commit()
-    db.refresh(quotation)
+    # Batched lookups (one IN query per table)
+    quotations = load_by_ids(db, models.Quotation, (r.quotation_id for r in rows))
+    services = load_by_ids(db, models.Service, (r.service_id for r in rows))
+    vendors = load_by_ids(db, models.Vendor, (r.vendor_id for r in rows))
+    suppliers = load_by_ids(
+        db, models.ExternalSupplier, (r.external_supplier_id for r in rows)
+    )
 
-    return item
+    errors = []
+    item_rows = []
+
+    for index, row in enumerate(rows):
+
+        if row.quotation_id not in quotations:
+            detail = "Quotation not found"
+        elif row.service_id not in services:
+            detail = "Service not found"
+        elif row.vendor_id and row.external_supplier_id:
+            detail = "Cannot use both vendor and external supplier for same item"
+        elif row.vendor_id and row.vendor_id not in vendors:
+            detail = "Vendor not found"
+        elif row.external_supplier_id and row.external_supplier_id not in suppliers:
+            detail = "External supplier not found"
+        else:
+            item_rows.append(price_item(row))
+            continue
+
+        errors.append({"row": index, "detail": detail})
+
+    if errors and data.mode == schemas.BulkMode.ATOMIC:
+        raise HTTPException(status_code=400, detail=errors)
+
+    quotation_ids = sorted({r["quotation_id"] for r in item_rows})
+
+    if item_rows:
+        # Single multi-row INSERT, then one totals recompute per quotation
+        db.execute(insert(models.QuotationItem), item_rows)
+        recompute_totals(db, quotation_ids)
+        db.commit()
+
+    return {
+        "inserted": len(item_rows),
+        "quotation_ids": quotation_ids,
+        "errors": errors
+    }
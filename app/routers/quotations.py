@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from sqlalchemy import func, insert
 from decimal import Decimal
 from collections import defaultdict
 from datetime import datetime, date
@@ -17,9 +17,21 @@ from reportlab.lib.units import inch
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.utils import ImageReader
 
+from app.config import BASE_CURRENCY
 from app.database import get_db
 from app import models, schemas
-from app.services.external_api.grn import fetch_grn_rate  # 🔥 GRN MOCK
+from app.dependencies import get_current_user
+from app.services.external_api.gateway import RateRequest
+from app.services.external_api.rate_cache import get_supplier_rates
+from app.services.lookups import load_by_ids
+from app.services.numbering import next_number
+from app.services.document_snapshots import quotation_snapshot
+from app.services.loading_profiles import load_document, release
+from app.services.nightly_pricing import price_lines, price_quotation
+from app.services.quotation_simulation import simulate
+from app.services.rate_resolver import rate_index
+from app.services.pdf_cache import cached_pdf_response
+from app.services.pdf_render import pdf_renderer
 
 router = APIRouter(prefix="/quotations", tags=["Quotations"])
 
@@ -29,18 +41,7 @@ router = APIRouter(prefix="/quotations", tags=["Quotations"])
 # =====================================================
 
 def generate_quotation_number(db: Session):
-    last = db.query(models.Quotation).order_by(
-        models.Quotation.id.desc()
-    ).first()
-
-    if not last:
-        return "QT-0001"
-
-    try:
-        last_number = int(last.quotation_number.split("-")[1])
-        return f"QT-{last_number + 1:04d}"
-    except:
-        return f"QT-{last.id + 1:04d}"
+    return next_number("QT")
 
 
 # =====================================================
@@ -64,19 +65,20 @@ def create_quotation(data: schemas.QuotationCreate, db: Session = Depends(get_db
         status=models.QuotationStatus.DRAFT
     )
 
-    db.add(quotation)
-    db.flush()
+    # -------------------------------------------------
+    # Batched lookups (one IN query per table)
+    # -------------------------------------------------
 
-    total_cost = Decimal("0")
-    total_sell = Decimal("0")
+    services = load_by_ids(db, models.Service, (i.service_id for i in data.items))
+    vendors = load_by_ids(db, models.Vendor, (i.vendor_id for i in data.items))
+    suppliers = load_by_ids(
+        db, models.ExternalSupplier,
+        (i.external_supplier_id for i in data.items)
+    )
 
     for item in data.items:
 
-        service = db.query(models.Service).filter(
-            models.Service.id == item.service_id
-        ).first()
-
-        if not service:
+        if item.service_id not in services:
             raise HTTPException(status_code=404, detail="Service not found")
 
         # 🔥 Business Rule: Cannot use both vendor and external supplier
@@ -86,21 +88,87 @@ def create_quotation(data: schemas.QuotationCreate, db: Session = Depends(get_db
                 detail="Cannot use both vendor and external supplier for same item"
             )
 
-        # 🔥 External Supplier GRN Logic
-        if item.external_supplier_id:
-            supplier = db.query(models.ExternalSupplier).filter(
-                models.ExternalSupplier.id == item.external_supplier_id
-            ).first()
+        if item.vendor_id and item.vendor_id not in vendors:
+            raise HTTPException(status_code=404, detail="Vendor not found")
+
+        if item.external_supplier_id and item.external_supplier_id not in suppliers:
+            raise HTTPException(status_code=404, detail="External supplier not found")
+
+    # -------------------------------------------------
+    # Contracted rates valid on each line's start date
+    # -------------------------------------------------
+    # Lines without a vendor take the cheapest vendor that day. A line
+    # with no such rate in the base currency keeps the submitted cost.
+
+    own_lines = [index for index, item in enumerate(data.items) if not item.external_supplier_id]
+
+    contracted = {
+        index: rate
+        for index, rate in zip(own_lines, rate_index.resolve_many(
+            db,
+            [
+                (data.items[index].service_id, data.items[index].vendor_id, data.items[index].start_date)
+                for index in own_lines
+            ],
+            currency=BASE_CURRENCY
+        ))
+        if rate and (rate.currency or BASE_CURRENCY).upper() == BASE_CURRENCY.upper()
+    }
+
+    # -------------------------------------------------
+    # 🔥 External Supplier Rates (REST lines fetched concurrently)
+    # -------------------------------------------------
+    # Fetched before anything is written: the fan-out can take up to the
+    # gateway timeout, so end the read-only transaction first and keep no
+    # pooled connection checked out while waiting on suppliers.
+
+    rate_requests = [
+        RateRequest(
+            key=index,
+            supplier_id=item.external_supplier_id,
+            external_product_id=item.external_product_id,
+            start_date=item.start_date,
+            end_date=item.end_date
+        )
+        for index, item in enumerate(data.items)
+        if item.external_supplier_id
+        and suppliers[item.external_supplier_id].api_type == models.SupplierAPIType.REST
+    ]
+
+    if rate_requests:
+        db.commit()
 
-            if not supplier:
-                raise HTTPException(status_code=404, detail="External supplier not found")
+    rates = get_supplier_rates(db, rate_requests)
+    rate_errors = []
 
-            if supplier.api_type == models.SupplierAPIType.REST:
-                fetched_rate = fetch_grn_rate(item.external_product_id)
-                cost_price = Decimal(str(fetched_rate))
-            else:
-                cost_price = Decimal(str(item.cost_price))
+    db.add(quotation)
+    db.flush()
+
+    total_cost = Decimal("0")
+    total_sell = Decimal("0")
+    item_rows = []
+
+    for index, item in enumerate(data.items):
+
+        rate = rates.get(index)
+
+        if rate and not rate.ok:
+            rate_errors.append({
+                "item_index": index,
+                "external_supplier_id": item.external_supplier_id,
+                "external_product_id": item.external_product_id,
+                "detail": rate.error
+            })
+
+        contract = contracted.get(index)
+
+        if rate and rate.price is not None:
+            cost_price = Decimal(str(rate.price))
+        elif contract:
+            cost_price = Decimal(str(contract.cost_price))
         else:
+            # No contracted rate, or supplier failed with no last known
+            # price → submitted cost
             cost_price = Decimal(str(item.cost_price))
 
         margin = Decimal(str(
@@ -114,27 +182,29 @@ def create_quotation(data: schemas.QuotationCreate, db: Session = Depends(get_db
         item_total_cost = cost_price * item.quantity
         item_total_sell = sell_price * item.quantity
 
-        db_item = models.QuotationItem(
-            quotation_id=quotation.id,
-            service_id=service.id,
-            vendor_id=item.vendor_id,
-            external_supplier_id=item.external_supplier_id,
-            external_product_id=item.external_product_id,
-            quantity=item.quantity,
-            start_date=item.start_date,
-            end_date=item.end_date,
-            manual_margin_percentage=item.manual_margin_percentage,
-            cost_price=float(cost_price),
-            sell_price=float(sell_price),
-            total_cost=float(item_total_cost),
-            total_sell=float(item_total_sell)
-        )
-
-        db.add(db_item)
+        item_rows.append({
+            "quotation_id": quotation.id,
+            "service_id": item.service_id,
+            "vendor_id": item.vendor_id or (contract.vendor_id if contract else None),
+            "external_supplier_id": item.external_supplier_id,
+            "external_product_id": item.external_product_id,
+            "quantity": item.quantity,
+            "start_date": item.start_date,
+            "end_date": item.end_date,
+            "manual_margin_percentage": item.manual_margin_percentage,
+            "cost_price": float(cost_price),
+            "sell_price": float(sell_price),
+            "total_cost": float(item_total_cost),
+            "total_sell": float(item_total_sell)
+        })
 
         total_cost += item_total_cost
         total_sell += item_total_sell
 
+    # Single multi-row INSERT for all lines
+    if item_rows:
+        db.execute(insert(models.QuotationItem), item_rows)
+
     quotation.total_cost = float(total_cost)
     quotation.total_sell = float(total_sell)
     quotation.total_profit = float(total_sell - total_cost)
@@ -142,9 +212,102 @@ def create_quotation(data: schemas.QuotationCreate, db: Session = Depends(get_db
     db.commit()
     db.refresh(quotation)
 
+    quotation.rate_errors = rate_errors
+
     return quotation
 
 
+# =====================================================
+# NIGHTLY PRICING (per-night breakdown, no writes)
+# =====================================================
+
+@router.post("/nightly-pricing")
+def preview_nightly_pricing(data: schemas.NightlyPricingRequest, db: Session = Depends(get_db)):
+
+    lines = [
+        {"key": index, **item.model_dump(include={
+            "service_id", "vendor_id", "start_date", "end_date",
+            "quantity", "cost_price", "manual_margin_percentage"
+        })}
+        for index, item in enumerate(data.items)
+    ]
+
+    return price_lines(db, lines, data.margin_percentage)
+
+
+@router.get("/{quotation_id}/nightly-pricing")
+def get_nightly_pricing(quotation_id: int, db: Session = Depends(get_db)):
+
+    report = price_quotation(db, quotation_id)
+
+    if report is None:
+        raise HTTPException(status_code=404, detail="Quotation not found")
+
+    return report
+
+
+# =====================================================
+# WHAT-IF REPRICING (open quotations) 🔒
+# =====================================================
+
+@router.post("/simulate", response_model=schemas.QuotationSimulationResponse)
+def simulate_repricing(
+    data: schemas.QuotationSimulationRequest,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user)
+):
+
+    if not data.cost_changes and data.margin_percentage is None:
+        raise HTTPException(status_code=400, detail="Nothing to simulate: give cost_changes or margin_percentage")
+
+    if not data.statuses:
+        raise HTTPException(status_code=400, detail="statuses cannot be empty")
+
+    if data.apply and any(s not in (schemas.QuotationStatus.DRAFT, schemas.QuotationStatus.SENT) for s in data.statuses):
+        raise HTTPException(status_code=400, detail="Only DRAFT and SENT quotations can be repriced")
+
+    return simulate(
+        db,
+        cost_changes=[c.model_dump() for c in data.cost_changes],
+        margin_percentage=data.margin_percentage,
+        override_manual_margins=data.override_manual_margins,
+        statuses=[models.QuotationStatus(s.value) for s in data.statuses],
+        quotation_ids=data.quotation_ids,
+        apply=data.apply
+    )
+
+
 # =====================================================
 # (बाकी file unchanged — GET / FILTER / PDF ENGINE same as before)
 # =====================================================
+
+
+# =====================================================
+# QUOTATION / PROFIT SHEET PDF
+# =====================================================
+
+def _quotation_document(quotation_id: int, kind: str, prefix: str, request: Request, db: Session):
+
+    quotation = load_document(db, "quotation", quotation_id)
+
+    if not quotation:
+        raise HTTPException(status_code=404, detail="Quotation not found")
+
+    snapshot = quotation_snapshot(quotation)
+    release(db)
+
+    return cached_pdf_response(
+        request, kind, snapshot,
+        f'{prefix}{snapshot["quotation_number"]}.pdf',
+        pdf_renderer.render
+    )
+
+
+@router.get("/{quotation_id}/pdf")
+def download_quotation_pdf(quotation_id: int, request: Request, db: Session = Depends(get_db)):
+    return _quotation_document(quotation_id, "quotation", "", request, db)
+
+
+@router.get("/{quotation_id}/profit")
+def download_profit_pdf(quotation_id: int, request: Request, db: Session = Depends(get_db)):
+    return _quotation_document(quotation_id, "profit", "Profit-", request, db)
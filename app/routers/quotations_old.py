@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app import schemas, models
 from app.services.quotation_service import create_quotation
+from app.services.document_snapshots import quotation_snapshot
 from app.utils.pdf_generator import generate_quotation_pdf, generate_profit_pdf
 
 router = APIRouter(
@@ -21,10 +22,11 @@ def create_new_quotation(quotation_data: schemas.QuotationCreate, db: Session =
 def download_quotation_pdf(quotation_id: int, db: Session = Depends(get_db)):
 
     quotation = db.query(models.Quotation).filter(models.Quotation.id == quotation_id).first()
-    client = db.query(models.Client).filter(models.Client.id == quotation.client_id).first()
-    items = db.query(models.QuotationItem).filter(models.QuotationItem.quotation_id == quotation_id).all()
 
-    pdf_buffer = generate_quotation_pdf(quotation, items, client)
+    if not quotation:
+        raise HTTPException(status_code=404, detail="Quotation not found")
+
+    pdf_buffer = generate_quotation_pdf(quotation_snapshot(quotation))
 
     return StreamingResponse(
         pdf_buffer,
@@ -37,10 +39,11 @@ def download_quotation_pdf(quotation_id: int, db: Session = Depends(get_db)):
 def download_profit_pdf(quotation_id: int, db: Session = Depends(get_db)):
 
     quotation = db.query(models.Quotation).filter(models.Quotation.id == quotation_id).first()
-    client = db.query(models.Client).filter(models.Client.id == quotation.client_id).first()
-    items = db.query(models.QuotationItem).filter(models.QuotationItem.quotation_id == quotation_id).all()
 
-    pdf_buffer = generate_profit_pdf(quotation, items, client)
+    if not quotation:
+        raise HTTPException(status_code=404, detail="Quotation not found")
+
+    pdf_buffer = generate_profit_pdf(quotation_snapshot(quotation))
 
     return StreamingResponse(
         pdf_buffer,
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
 from sqlalchemy.orm import Session, joinedload
 from typing import List
 
 from app.database import get_db
-from app import models
+from app import models, schemas
+from app.dependencies import get_current_user
+from app.services.rate_resolver import rate_index, resolve_quotation_items
+from app.services.rate_sheet_import import import_rate_sheet
 
 router = APIRouter(
     prefix="/service-rates",
@@ -40,3 +43,79 @@ def get_rates_by_service(
         })
 
     return result
+
+
+# =====================================
+# RATE SHEET IMPORT (CSV / EXCEL) 🔒
+# =====================================
+
+@router.post("/import", response_model=schemas.RateSheetImportResponse)
+def import_rates(
+    file: UploadFile = File(...),
+    currency: str = Query("PKR", description="Used for rows without a currency"),
+    dayfirst: bool = Query(True),
+    on_overlap: schemas.RateOverlapPolicy = schemas.RateOverlapPolicy.ERROR,
+    dry_run: bool = Query(False, description="Return the diff against current rates without writing"),
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user)
+):
+
+    raw = file.file.read()
+
+    if not raw:
+        raise HTTPException(status_code=400, detail="Empty file")
+
+    return import_rate_sheet(
+        db, raw, file.filename or "",
+        currency=currency,
+        dayfirst=dayfirst,
+        on_overlap=on_overlap.value,
+        dry_run=dry_run
+    )
+
+
+# =====================================
+# RESOLVE VALID RATES (batch)
+# =====================================
+
+@router.post("/resolve", response_model=List[schemas.RateResolution])
+def resolve_rates(
+    data: schemas.RateResolveRequest,
+    db: Session = Depends(get_db)
+):
+
+    resolved = rate_index.resolve_many(
+        db, [(i.service_id, i.vendor_id, i.date) for i in data.items],
+        currency=data.currency
+    )
+
+    return [
+        {
+            "service_id": item.service_id,
+            "vendor_id": item.vendor_id,
+            "date": item.date,
+            "rate": rate._asdict() if rate else None
+        }
+        for item, rate in zip(data.items, resolved)
+    ]
+
+
+@router.get("/quotation/{quotation_id}")
+def resolve_quotation_rates(
+    quotation_id: int,
+    db: Session = Depends(get_db)
+):
+
+    exists = db.query(models.Quotation.id).filter(
+        models.Quotation.id == quotation_id
+    ).first()
+
+    if not exists:
+        raise HTTPException(status_code=404, detail="Quotation not found")
+
+    return resolve_quotation_items(db, quotation_id)
+
+
+@router.get("/index-stats")
+def get_rate_index_stats():
+    return rate_index.stats()
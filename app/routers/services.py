@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
-from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import List, Optional, Union
 import pandas as pd
 
 from app.database import get_db
 from app import models, schemas
 from app.dependencies import get_current_user  # 🔐 NEW
+from app.services.catalog_import import import_catalog
+from app.utils.pagination import PageParams, page_params, paginate
 
 
 router = APIRouter(
@@ -14,6 +16,27 @@ router = APIRouter(
     dependencies=[Depends(get_current_user)]  # 🔒 GLOBAL PROTECTION
 )
 
+# =====================================================
+# SERIALIZATION
+# =====================================================
+
+def serialize_service(service):
+    return {
+        "id": service.id,
+        "name": service.name,
+        "category": service.category,
+        "city_id": service.city_id,
+        "created_at": service.created_at,
+        "vendors": [
+            {
+                "id": vs.vendor.id,
+                "name": vs.vendor.name
+            }
+            for vs in service.vendors
+        ]
+    }
+
+
 # =====================================================
 # CREATE SERVICE (WITH VENDOR MAPPING)
 # =====================================================
@@ -89,35 +112,47 @@ def create_service(
         models.Service.id == new_service.id
     ).first()
 
-    return {
-        "id": service.id,
-        "name": service.name,
-        "category": service.category,
-        "city_id": service.city_id,
-        "created_at": service.created_at,
-        "vendors": [
-            {
-                "id": vs.vendor.id,
-                "name": vs.vendor.name
-            }
-            for vs in service.vendors
-        ]
-    }
+    return serialize_service(service)
+
+
+# =====================================================
+# BULK IMPORT (CSV / EXCEL)
+# =====================================================
+
+@router.post("/import", response_model=schemas.CatalogImportResponse)
+def import_services(
+    file: UploadFile = File(...),
+    create_cities: bool = Query(True, description="Create unknown cities when the row names a known country"),
+    dry_run: bool = Query(False, description="Resolve and report without writing"),
+    db: Session = Depends(get_db)
+):
+
+    raw = file.file.read()
+
+    if not raw:
+        raise HTTPException(status_code=400, detail="Empty file")
+
+    return import_catalog(db, raw, file.filename or "", create_cities, dry_run)
 
 
 # =====================================================
 # GET SERVICES
 # =====================================================
 
-@router.get("/", response_model=List[schemas.ServiceResponse])
+@router.get(
+    "/",
+    response_model=Union[schemas.Page[schemas.ServiceResponse], List[schemas.ServiceResponse]]
+)
 def get_services(
     city_id: Optional[int] = Query(None),
     category: Optional[str] = Query(None),
+    page: PageParams = Depends(page_params),
     db: Session = Depends(get_db)
 ):
 
+    # selectinload: a joined collection would be cut by LIMIT
     services = db.query(models.Service).options(
-        joinedload(models.Service.vendors)
+        selectinload(models.Service.vendors)
         .joinedload(models.VendorService.vendor)
     )
 
@@ -131,27 +166,10 @@ def get_services(
         except KeyError:
             raise HTTPException(status_code=400, detail="Invalid category")
 
-    services = services.all()
-
-    result = []
-
-    for service in services:
-        result.append({
-            "id": service.id,
-            "name": service.name,
-            "category": service.category,
-            "city_id": service.city_id,
-            "created_at": service.created_at,
-            "vendors": [
-                {
-                    "id": vs.vendor.id,
-                    "name": vs.vendor.name
-                }
-                for vs in service.vendors
-            ]
-        })
-
-    return result
+    return paginate(
+        db, services, [models.Service.id], page,
+        serialize=serialize_service
+    )
 
 
 # =====================================================
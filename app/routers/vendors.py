@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional, Union
 
 from app.database import get_db
 from app import models, schemas
 from app.dependencies import get_current_user  # 🔐 NEW
+from app.utils.pagination import PageParams, page_params, paginate
 
 
 router = APIRouter(
@@ -50,37 +51,51 @@ def create_vendor(
 # GET VENDORS (FIXED SERIALIZATION)
 # =====================================================
 
-@router.get("/", response_model=List[schemas.VendorResponse])
-def get_vendors(db: Session = Depends(get_db)):
+def serialize_vendor(v):
+
+    services_list = []
+
+    for mapping in v.services:
+        if mapping.service:
+            services_list.append({
+                "id": mapping.service.id,
+                "name": mapping.service.name,
+                "category": mapping.service.category
+            })
+
+    return {
+        "id": v.id,
+        "name": v.name,
+        "vendor_type": v.vendor_type,
+        "contact_person": v.contact_person,
+        "phone": v.phone,
+        "email": v.email,
+        "address": v.address,
+        "created_at": v.created_at,
+        "services": services_list
+    }
+
+
+@router.get(
+    "/",
+    response_model=Union[schemas.Page[schemas.VendorResponse], List[schemas.VendorResponse]]
+)
+def get_vendors(
+    search: Optional[str] = Query(None),
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db)
+):
 
+    # selectinload: a joined collection would be cut by LIMIT
     vendors = db.query(models.Vendor).options(
-        joinedload(models.Vendor.services)
+        selectinload(models.Vendor.services)
         .joinedload(models.VendorService.service)
-    ).all()
-
-    result = []
-
-    for v in vendors:
-        services_list = []
-
-        for mapping in v.services:
-            if mapping.service:
-                services_list.append({
-                    "id": mapping.service.id,
-                    "name": mapping.service.name,
-                    "category": mapping.service.category
-                })
-
-        result.append({
-            "id": v.id,
-            "name": v.name,
-            "vendor_type": v.vendor_type,
-            "contact_person": v.contact_person,
-            "phone": v.phone,
-            "email": v.email,
-            "address": v.address,
-            "created_at": v.created_at,
-            "services": services_list
-        })
-
-    return result
+    )
+
+    if search:
+        vendors = vendors.filter(models.Vendor.name.ilike(f"%{search}%"))
+
+    return paginate(
+        db, vendors, [models.Vendor.id], page,
+        serialize=serialize_vendor
+    )
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, field_validator
+from typing import Generic, List, Optional, TypeVar
 from datetime import datetime, date
 from enum import Enum
 
@@ -40,6 +40,40 @@ class ServiceCategory(str, Enum):
     OTHER = "OTHER"
 
 
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class RollupGranularity(str, Enum):
+    DAY = "day"
+    MONTH = "month"
+
+
+class RollupDimension(str, Enum):
+    CLIENT = "client"
+    COUNTRY = "country"
+    CATEGORY = "category"
+
+
+class PricingRuleKind(str, Enum):
+    SEASON = "SEASON"
+    WEEKDAY = "WEEKDAY"
+    MIN_STAY = "MIN_STAY"
+
+
+class DocumentBatchKind(str, Enum):
+    INVOICE_PACK = "INVOICE_PACK"
+    CLIENT_STATEMENTS = "CLIENT_STATEMENTS"
+
+
+class BatchStatus(str, Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+
 # =====================================================
 # 🔥 NEW – EXTERNAL SUPPLIER ENUMS
 # =====================================================
@@ -57,6 +91,20 @@ class SupplierAPIType(str, Enum):
     MANUAL = "MANUAL"
 
 
+# =====================================================
+# PAGINATION
+# =====================================================
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+    limit: int
+    total_estimate: Optional[int] = None
+
+
 # =====================================================
 # COUNTRY
 # =====================================================
@@ -123,6 +171,31 @@ class ClientResponse(ClientBase):
         from_attributes = True
 
 
+# =====================================================
+# CLIENT LEDGER
+# =====================================================
+
+class LedgerEntry(BaseModel):
+    entry_date: date
+    kind: str                      # INVOICE | PAYMENT
+    reference: Optional[str] = None
+    invoice_id: int
+    invoice_number: Optional[str] = None
+    debit: float
+    credit: float
+    balance: float
+
+
+class ClientLedger(BaseModel):
+    client_id: int
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    opening_balance: float
+    items: List[LedgerEntry]
+    next_cursor: Optional[str] = None
+    limit: int
+
+
 # =====================================================
 # SERVICE MINI (for VendorResponse)
 # =====================================================
@@ -228,8 +301,11 @@ class ExternalSupplierResponse(ExternalSupplierBase):
 # =====================================================
 
 class QuotationItemCreate(BaseModel):
+    quotation_id: Optional[int] = None     # required by /quotation-items
     service_id: int
     vendor_id: Optional[int] = None
+    external_supplier_id: Optional[int] = None
+    external_product_id: Optional[str] = None
     quantity: int = 1
     start_date: date
     end_date: date
@@ -257,6 +333,27 @@ class QuotationItemResponse(BaseModel):
         from_attributes = True
 
 
+class BulkMode(str, Enum):
+    ATOMIC = "atomic"      # any bad row rejects the whole batch
+    PARTIAL = "partial"    # insert valid rows, report the rest
+
+
+class QuotationItemBulkCreate(BaseModel):
+    items: List[QuotationItemCreate]
+    mode: BulkMode = BulkMode.ATOMIC
+
+
+class BulkRowError(BaseModel):
+    row: int
+    detail: str
+
+
+class QuotationItemBulkResponse(BaseModel):
+    inserted: int
+    quotation_ids: List[int]
+    errors: List[BulkRowError] = []
+
+
 # =====================================================
 # QUOTATION
 # =====================================================
@@ -267,6 +364,13 @@ class QuotationCreate(BaseModel):
     items: List[QuotationItemCreate]
 
 
+class SupplierRateError(BaseModel):
+    item_index: int
+    external_supplier_id: int
+    external_product_id: Optional[str] = None
+    detail: str
+
+
 class QuotationResponse(BaseModel):
     id: int
     quotation_number: str
@@ -279,6 +383,7 @@ class QuotationResponse(BaseModel):
     created_at: datetime
     items: List[QuotationItemResponse]
     client: Optional[ClientResponse] = None
+    rate_errors: List[SupplierRateError] = []
 
     class Config:
         from_attributes = True
@@ -343,3 +448,318 @@ class InvoicePaymentResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+# =====================================================
+# BANK STATEMENT IMPORT
+# =====================================================
+
+class BankImportMatch(BaseModel):
+    row: int
+    invoice_id: int
+    invoice_number: str
+    amount: float
+    payment_date: date
+    matched_by: str                       # reference | client_amount
+    receipt_number: Optional[str] = None  # None on dry runs
+
+
+class BankImportUnmatched(BaseModel):
+    row: int
+    payment_date: Optional[date] = None
+    amount: Optional[float] = None
+    reference: str
+    payer: str
+    reason: str
+
+
+class BankImportResponse(BaseModel):
+    dry_run: bool
+    total_rows: int
+    matched: int
+    unmatched: int
+    amount_matched: float
+    matches: List[BankImportMatch] = []
+    unmatched_rows: List[BankImportUnmatched] = []
+
+
+# =====================================================
+# SERVICE CATALOG IMPORT
+# =====================================================
+
+class CatalogImportRow(BaseModel):
+    row: int
+    name: str
+    category: str
+    city_id: Optional[int] = None
+    status: str                        # created | exists | duplicate | error
+    service_id: Optional[int] = None   # None for new services on dry runs
+    vendors_linked: int = 0
+    error: Optional[str] = None
+
+
+class CatalogImportResponse(BaseModel):
+    dry_run: bool
+    total_rows: int
+    created: int
+    existing: int
+    duplicates: int
+    errors: int
+    cities_created: int
+    vendor_links_created: int
+    duration_ms: float
+    rows: List[CatalogImportRow] = []
+
+
+# =====================================================
+# RATE SHEET IMPORT
+# =====================================================
+
+class RateOverlapPolicy(str, Enum):
+    ERROR = "error"        # reject rows overlapping a current rate
+    REPLACE = "replace"    # remove the overlapped current rates
+
+
+class RateSheetRow(BaseModel):
+    row: int
+    action: str            # insert | update | unchanged | replace | duplicate | error
+    service_id: Optional[int] = None
+    vendor_id: Optional[int] = None
+    valid_from: Optional[date] = None
+    valid_to: Optional[date] = None
+    cost_price: Optional[float] = None
+    currency: Optional[str] = None
+    previous_price: Optional[float] = None
+    replaces: List[int] = []
+    error: Optional[str] = None
+
+
+class RateWindow(BaseModel):
+    valid_from: Optional[date] = None
+    valid_to: Optional[date] = None
+
+
+class RateSheetRateChange(BaseModel):
+    rate_id: int
+    action: str            # trim | split | delete
+    service_id: int
+    vendor_id: int
+    cost_price: float
+    currency: Optional[str] = None
+    valid_from: Optional[date] = None
+    valid_to: Optional[date] = None
+    keeps: List[RateWindow] = []
+
+
+class RateSheetImportResponse(BaseModel):
+    dry_run: bool
+    total_rows: int
+    inserted: int
+    updated: int
+    unchanged: int
+    replaced: int
+    rates_removed: int
+    rates_trimmed: int
+    rates_split: int
+    duplicates: int
+    errors: int
+    duration_ms: float
+    rows: List[RateSheetRow] = []
+    rate_changes: List[RateSheetRateChange] = []
+
+
+# =====================================================
+# RATE RESOLUTION
+# =====================================================
+
+class RateLookup(BaseModel):
+    service_id: int
+    vendor_id: Optional[int] = None    # None = cheapest vendor valid that day
+    date: date
+
+
+class RateResolveRequest(BaseModel):
+    items: List[RateLookup]
+    currency: Optional[str] = None    # cheapest vendor is chosen among rates in this currency
+
+
+class ResolvedRate(BaseModel):
+    rate_id: int
+    service_id: int
+    vendor_id: Optional[int] = None
+    valid_from: Optional[date] = None
+    valid_to: Optional[date] = None
+    cost_price: float
+    currency: Optional[str] = None
+
+
+class RateResolution(BaseModel):
+    service_id: int
+    vendor_id: Optional[int] = None
+    date: date
+    rate: Optional[ResolvedRate] = None
+
+
+# =====================================================
+# NIGHTLY PRICING
+# =====================================================
+
+class PricingRuleCreate(BaseModel):
+    name: str
+    kind: PricingRuleKind
+    service_id: Optional[int] = None
+    vendor_id: Optional[int] = None
+    category: Optional[ServiceCategory] = None
+    valid_from: Optional[date] = None
+    valid_to: Optional[date] = None
+    weekdays: Optional[List[int]] = None     # Mon = 0 … Sun = 6
+    min_nights: Optional[int] = None
+    percent: float = 0
+    amount: float = 0
+    is_active: bool = True
+
+
+class PricingRuleResponse(BaseModel):
+    id: int
+    name: str
+    kind: PricingRuleKind
+    service_id: Optional[int] = None
+    vendor_id: Optional[int] = None
+    category: Optional[ServiceCategory] = None
+    valid_from: Optional[date] = None
+    valid_to: Optional[date] = None
+    weekdays: Optional[List[int]] = None
+    min_nights: Optional[int] = None
+    percent: float
+    amount: float
+    is_active: bool
+    created_at: datetime
+
+    # Stored as "4,5"
+    @field_validator("weekdays", mode="before")
+    @classmethod
+    def split_weekdays(cls, value):
+        if isinstance(value, str):
+            return [int(d) for d in value.split(",") if d.strip().isdigit()]
+        return value
+
+    class Config:
+        from_attributes = True
+
+
+class NightlyPricingRequest(BaseModel):
+    margin_percentage: Optional[float] = 25
+    items: List[QuotationItemCreate]
+
+
+# =====================================================
+# QUOTATION SIMULATION (what-if repricing)
+# =====================================================
+
+class CostChange(BaseModel):
+    vendor_id: Optional[int] = None      # both empty = every line
+    service_id: Optional[int] = None
+    percent: float = 0
+    amount: float = 0
+
+
+class QuotationSimulationRequest(BaseModel):
+    cost_changes: List[CostChange] = []
+    margin_percentage: Optional[float] = None     # new default margin
+    override_manual_margins: bool = False
+    statuses: List[QuotationStatus] = [QuotationStatus.DRAFT, QuotationStatus.SENT]
+    quotation_ids: Optional[List[int]] = None
+    apply: bool = False
+
+
+class SimulationTotals(BaseModel):
+    old_cost: float
+    new_cost: float
+    old_sell: float
+    new_sell: float
+    old_profit: float
+    new_profit: float
+    profit_delta: float
+
+
+class QuotationSimulationRow(SimulationTotals):
+    quotation_id: int
+    quotation_number: Optional[str] = None
+    lines_changed: int
+
+
+class QuotationSimulationResponse(BaseModel):
+    applied: bool
+    lines: int
+    lines_changed: int
+    lines_updated: int
+    quotations: int
+    quotations_changed: int
+    changes_matched: List[int] = []
+    totals: SimulationTotals
+    by_quotation: List[QuotationSimulationRow] = []
+    load_ms: float
+    duration_ms: float
+
+
+# =====================================================
+# RECEIVABLES AGING
+# =====================================================
+
+class AgingTotals(BaseModel):
+    days_0_30: float
+    days_31_60: float
+    days_61_90: float
+    days_over_90: float
+    total: float
+    invoices: int
+
+
+class AgingClientRow(BaseModel):
+    client_id: Optional[int] = None
+    client_name: Optional[str] = None
+    days_0_30: float
+    days_31_60: float
+    days_61_90: float
+    days_over_90: float
+    total: float
+    invoices: int
+    oldest_due_on: Optional[date] = None
+    share_pct: float
+    rank: int
+
+
+class AgingReport(BaseModel):
+    as_of: date
+    totals: AgingTotals
+    clients: List[AgingClientRow] = []
+
+
+# =====================================================
+# DOCUMENT BATCHES
+# =====================================================
+
+class DocumentBatchCreate(BaseModel):
+    kind: DocumentBatchKind
+    client_id: Optional[int] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+
+
+class DocumentBatchResponse(BaseModel):
+    id: int
+    kind: DocumentBatchKind
+    status: BatchStatus
+    client_id: Optional[int] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    total: int
+    rendered: int
+    file_size: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,349 @@
+import io
+from typing import List, Optional
+
+import pandas as pd
+from fastapi import HTTPException
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.orm import Session
+
+from app import models
+from app.services.finance_rollups import record_payments
+from app.services.invoice_ledger import recompute_ledgers
+from app.services.numbering import next_numbers
+
+
+# =====================================================
+# STATEMENT PARSING
+# =====================================================
+# Banks disagree on headers, so each logical column accepts a few names.
+
+COLUMN_ALIASES = {
+    "date": ["date", "transaction_date", "value_date", "posting_date", "txn_date"],
+    "amount": ["amount", "credit", "credit_amount", "deposit", "cr"],
+    "reference": ["reference", "description", "narration", "details", "remarks", "particulars"],
+    "payer": ["payer", "client", "name", "sender", "remitter", "from"],
+    "bank_ref": ["transaction_id", "bank_reference", "txn_id", "utr", "reference_no"],
+}
+
+INVOICE_PATTERN = r"(INV-\d{4}-\d+)"
+
+# Payments that close out an invoice only count when within a cent
+AMOUNT_TOLERANCE = 0.01
+
+OPEN_STATUSES = [
+    models.PaymentStatus.UNPAID,
+    models.PaymentStatus.PARTIAL,
+    models.PaymentStatus.OVERDUE,
+]
+
+
+def _normalize_name(series: pd.Series) -> pd.Series:
+    return series.fillna("").astype(str).str.lower().str.replace(r"[^a-z0-9]", "", regex=True)
+
+
+def _pick(frame: pd.DataFrame, logical: str) -> Optional[str]:
+    for name in COLUMN_ALIASES[logical]:
+        if name in frame.columns:
+            return name
+    return None
+
+
+def read_statement(raw: bytes, dayfirst: bool = True) -> pd.DataFrame:
+    """
+    CSV → one row per credit with columns
+    row, date, amount, reference, payer, bank_ref (row = CSV line number).
+    """
+
+    try:
+        frame = pd.read_csv(io.BytesIO(raw), dtype=str, skipinitialspace=True)
+    except (ValueError, pd.errors.ParserError) as exc:
+        raise HTTPException(status_code=400, detail=f"Could not read CSV: {exc}")
+
+    frame.columns = (
+        frame.columns.str.strip().str.lower().str.replace(r"[^a-z0-9]+", "_", regex=True)
+    )
+
+    date_col, amount_col = _pick(frame, "date"), _pick(frame, "amount")
+
+    if not date_col or not amount_col:
+        raise HTTPException(
+            status_code=400,
+            detail="Statement needs a date column and an amount/credit column"
+        )
+
+    out = pd.DataFrame({"row": frame.index + 2})   # +1 header, +1 one-based
+
+    out["date"] = pd.to_datetime(frame[date_col], errors="coerce", dayfirst=dayfirst).dt.date
+    out["amount"] = pd.to_numeric(
+        frame[amount_col].str.replace(r"[^0-9.\-]", "", regex=True),
+        errors="coerce"
+    ).round(2)
+
+    # Every free-text column is searched for an invoice number
+    text_cols = [c for c in COLUMN_ALIASES["reference"] if c in frame.columns]
+    out["reference"] = (
+        frame[text_cols].fillna("").agg(" ".join, axis=1).str.strip()
+        if text_cols else ""
+    )
+
+    payer_col = _pick(frame, "payer")
+    out["payer"] = frame[payer_col].fillna("").str.strip() if payer_col else ""
+
+    bank_ref_col = _pick(frame, "bank_ref")
+    out["bank_ref"] = frame[bank_ref_col].fillna("").str.strip() if bank_ref_col else ""
+
+    return out
+
+
+# =====================================================
+# VECTORIZED MATCHING
+# =====================================================
+
+def _open_invoices(db: Session, numbers: List[str], client_ids: List[int]) -> pd.DataFrame:
+
+    I = models.Invoice
+
+    stmt = select(
+        I.id.label("invoice_id"),
+        I.invoice_number,
+        I.client_id,
+        I.due_amount,
+        I.payment_status
+    ).where(
+        I.invoice_number.in_(numbers) | I.client_id.in_(client_ids)
+    )
+
+    frame = pd.DataFrame(db.execute(stmt).all(), columns=[
+        "invoice_id", "invoice_number", "client_id", "due_amount", "payment_status"
+    ])
+
+    frame["due_amount"] = pd.to_numeric(frame["due_amount"]).fillna(0).round(2)
+    frame["is_open"] = frame["payment_status"].isin(OPEN_STATUSES)
+
+    return frame
+
+
+def _clients(db: Session, payers: pd.Series) -> pd.DataFrame:
+
+    keys = set(_normalize_name(payers)) - {""}
+
+    if not keys:
+        return pd.DataFrame(columns=["payer_key", "client_id"])
+
+    rows = db.query(models.Client.id, models.Client.company_name).all()
+
+    clients = pd.DataFrame(rows, columns=["client_id", "company_name"])
+    clients["payer_key"] = _normalize_name(clients["company_name"])
+
+    # Ambiguous company names cannot identify a payer
+    clients = clients[clients["payer_key"].isin(keys)]
+    clients = clients.drop_duplicates("payer_key", keep=False)
+
+    return clients[["payer_key", "client_id"]]
+
+
+def match_statement(db: Session, statement: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds invoice_id / invoice_number / matched_by / reason to every row.
+
+    1. An INV-YYYY-NNNN number anywhere in the narration.
+    2. Otherwise payer name = client, and exactly one open invoice of that
+       client whose balance due equals the amount.
+    """
+
+    rows = statement.copy()
+    rows["reason"] = None
+    rows["matched_by"] = None
+    rows["invoice_id"] = pd.NA
+
+    bad = rows["date"].isna() | rows["amount"].isna() | (rows["amount"] <= 0)
+    rows.loc[bad, "reason"] = "missing date or non-positive amount"
+
+    rows["invoice_number"] = (
+        rows["reference"].str.upper().str.extract(INVOICE_PATTERN, expand=False)
+    )
+    rows["payer_key"] = _normalize_name(rows["payer"])
+
+    clients = _clients(db, rows.loc[~bad, "payer"])
+    rows = rows.merge(clients, on="payer_key", how="left")
+
+    invoices = _open_invoices(
+        db,
+        rows["invoice_number"].dropna().unique().tolist(),
+        rows["client_id"].dropna().astype(int).unique().tolist()
+    )
+
+    # ---- 1. by invoice number -------------------------------------------
+    by_number = rows[["row", "invoice_number"]].merge(
+        invoices[["invoice_number", "invoice_id", "is_open"]],
+        on="invoice_number", how="inner"
+    ).set_index("row")
+
+    has_number = rows["invoice_number"].notna() & rows["reason"].isna()
+    found = rows["row"].map(by_number["invoice_id"])
+    is_open = rows["row"].map(by_number["is_open"]).astype("boolean").fillna(False)
+
+    rows.loc[has_number & found.isna(), "reason"] = "invoice number not found"
+    rows.loc[has_number & found.notna() & ~is_open, "reason"] = "invoice is paid or cancelled"
+
+    ok = has_number & found.notna() & is_open
+    rows.loc[ok, "invoice_id"] = found[ok]
+    rows.loc[ok, "matched_by"] = "reference"
+
+    # ---- 2. by client + exact balance due ------------------------------
+    pending = rows["reason"].isna() & rows["invoice_id"].isna()
+
+    candidates = rows.loc[pending & rows["client_id"].notna(), ["row", "client_id", "amount"]].merge(
+        invoices.loc[invoices["is_open"], ["invoice_id", "client_id", "due_amount"]],
+        on="client_id"
+    )
+    candidates = candidates[(candidates["amount"] - candidates["due_amount"]).abs() <= AMOUNT_TOLERANCE]
+
+    counts = candidates.groupby("row")["invoice_id"].agg(["count", "first"])
+    unique = rows["row"].map(counts["first"].where(counts["count"] == 1))
+    ambiguous = rows["row"].map(counts["count"]).fillna(0) > 1
+
+    rows.loc[pending & unique.notna(), "invoice_id"] = unique[pending & unique.notna()]
+    rows.loc[pending & unique.notna(), "matched_by"] = "client_amount"
+
+    rows.loc[pending & ambiguous, "reason"] = "several open invoices match client and amount"
+    rows.loc[pending & rows["client_id"].isna() & ~ambiguous & unique.isna(), "reason"] = (
+        "no invoice number and payer is not a known client"
+    )
+    rows.loc[rows["reason"].isna() & rows["invoice_id"].isna(), "reason"] = (
+        "no open invoice of this client with that balance"
+    )
+
+    # ---- never pay more than is due ------------------------------------
+    # In statement order. A rejected row does not use up the balance, so a
+    # later smaller credit that still fits is accepted.
+    rows["invoice_id"] = rows["invoice_id"].astype("Int64")
+
+    remaining = invoices.set_index("invoice_id")["due_amount"].to_dict()
+    over = pd.Series(False, index=rows.index)
+
+    for index, invoice_id, amount in zip(rows.index, rows["invoice_id"], rows["amount"]):
+        if pd.isna(invoice_id):
+            continue
+        if amount > remaining[invoice_id] + AMOUNT_TOLERANCE:
+            over[index] = True
+        else:
+            remaining[invoice_id] -= amount
+
+    rows.loc[over, "reason"] = "amount exceeds balance due"
+    rows.loc[over, ["invoice_id", "matched_by"]] = [pd.NA, None]
+
+    numbers = invoices.set_index("invoice_id")["invoice_number"]
+    rows["invoice_number"] = rows["invoice_id"].map(numbers)
+
+    return rows
+
+
+# =====================================================
+# IMPORT
+# =====================================================
+
+def _already_imported(db: Session, pairs: pd.DataFrame) -> set:
+
+    pairs = pairs[pairs["bank_ref"] != ""]
+
+    if pairs.empty:
+        return set()
+
+    P = models.InvoicePayment
+
+    keys = list(zip(pairs["invoice_id"].astype(int), pairs["bank_ref"]))
+
+    existing = db.execute(
+        select(P.invoice_id, P.reference_no).where(
+            tuple_(P.invoice_id, P.reference_no).in_(keys)
+        )
+    ).all()
+
+    return {(invoice_id, ref) for invoice_id, ref in existing}
+
+
+def _plain(value):
+    return None if pd.isna(value) else value
+
+
+def import_statement(
+    db: Session,
+    raw: bytes,
+    payment_method: models.PaymentMethod = models.PaymentMethod.BANK_TRANSFER,
+    dayfirst: bool = True,
+    dry_run: bool = False
+) -> dict:
+
+    rows = match_statement(db, read_statement(raw, dayfirst))
+
+    matched = rows[rows["invoice_id"].notna()].copy()
+
+    # Re-uploading the same statement must not double-count
+    seen = _already_imported(db, matched)
+    if seen:
+        dup = pd.MultiIndex.from_arrays(
+            [matched["invoice_id"].astype(int), matched["bank_ref"]]
+        ).isin(list(seen))
+        dup_rows = rows["row"].isin(matched.loc[dup, "row"])
+        rows.loc[dup_rows, "reason"] = "already imported"
+        rows.loc[dup_rows, ["invoice_id", "matched_by"]] = [pd.NA, None]
+        matched = matched.loc[~dup]
+
+    matched["receipt_number"] = None
+
+    if not dry_run and not matched.empty:
+
+        matched["receipt_number"] = next_numbers("RCPT", len(matched))
+
+        payments = [
+            {
+                "receipt_number": r.receipt_number,
+                "invoice_id": int(r.invoice_id),
+                "payment_date": r.date,
+                "amount": float(r.amount),
+                "payment_method": payment_method,
+                "reference_no": r.bank_ref or (r.reference[:100] or None),
+                "notes": f"Bank statement import, line {r.row}"
+            }
+            for r in matched.itertuples(index=False)
+        ]
+
+        # All payments, then every touched ledger in one grouped UPDATE
+        db.execute(insert(models.InvoicePayment), payments)
+        recompute_ledgers(db, matched["invoice_id"].astype(int).tolist())
+        record_payments(db, [(p["invoice_id"], p["payment_date"], p["amount"]) for p in payments])
+        db.commit()
+
+    unmatched = rows[rows["invoice_id"].isna()]
+
+    return {
+        "dry_run": dry_run,
+        "total_rows": len(rows),
+        "matched": len(matched),
+        "unmatched": len(unmatched),
+        "amount_matched": round(float(matched["amount"].sum()), 2),
+        "matches": [
+            {
+                "row": int(r.row),
+                "invoice_id": int(r.invoice_id),
+                "invoice_number": r.invoice_number,
+                "amount": float(r.amount),
+                "payment_date": r.date,
+                "matched_by": r.matched_by,
+                "receipt_number": r.receipt_number
+            }
+            for r in matched.itertuples(index=False)
+        ],
+        "unmatched_rows": [
+            {
+                "row": int(r.row),
+                "payment_date": _plain(r.date),
+                "amount": _plain(r.amount),
+                "reference": r.reference,
+                "payer": r.payer,
+                "reason": r.reason
+            }
+            for r in unmatched.itertuples(index=False)
+        ]
+    }
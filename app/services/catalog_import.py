@@ -0,0 +1,347 @@
+import io
+import time
+from typing import List, Optional
+
+import pandas as pd
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app import models
+
+
+# =====================================================
+# SHEET PARSING
+# =====================================================
+# One row per service:
+#
+#   name | category | city | country (optional) | vendors (optional)
+#
+# city may be a name or an id; country disambiguates city names and
+# lets unknown cities be created. vendors is a list of vendor names or
+# ids separated by , ; or |.
+
+COLUMN_ALIASES = {
+    "name": ["name", "service", "service_name"],
+    "category": ["category", "service_category", "type"],
+    "city": ["city", "city_name", "city_id"],
+    "country": ["country", "country_name"],
+    "vendors": ["vendors", "vendor", "vendor_names", "vendor_ids"],
+}
+
+EXCEL_SUFFIXES = (".xlsx", ".xlsm", ".xls")
+
+CATEGORIES = [c.name for c in models.ServiceCategory]
+
+
+def _key(series: pd.Series) -> pd.Series:
+    return series.fillna("").astype(str).str.strip().str.casefold()
+
+
+def _pick(frame: pd.DataFrame, logical: str) -> Optional[str]:
+    for name in COLUMN_ALIASES[logical]:
+        if name in frame.columns:
+            return name
+    return None
+
+
+def read_sheet(raw: bytes, filename: str) -> pd.DataFrame:
+
+    try:
+        if filename.lower().endswith(EXCEL_SUFFIXES):
+            frame = pd.read_excel(io.BytesIO(raw), dtype=str)
+        else:
+            frame = pd.read_csv(io.BytesIO(raw), dtype=str, skipinitialspace=True)
+    except ImportError:
+        raise HTTPException(status_code=400, detail="Excel upload needs openpyxl installed; upload CSV instead")
+    except (ValueError, pd.errors.ParserError) as exc:
+        raise HTTPException(status_code=400, detail=f"Could not read sheet: {exc}")
+
+    frame.columns = (
+        frame.columns.astype(str).str.strip().str.lower().str.replace(r"[^a-z0-9]+", "_", regex=True)
+    )
+
+    columns = {logical: _pick(frame, logical) for logical in COLUMN_ALIASES}
+
+    missing = [c for c in ("name", "category", "city") if not columns[c]]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Missing column(s): {', '.join(missing)}")
+
+    out = pd.DataFrame({"row": frame.index + 2})   # +1 header, +1 one-based
+
+    for logical, column in columns.items():
+        out[logical] = frame[column].fillna("").astype(str).str.strip() if column else ""
+
+    out["category"] = out["category"].str.upper()
+
+    return out
+
+
+# =====================================================
+# VECTORIZED RESOLUTION
+# =====================================================
+
+def _fail(rows: pd.DataFrame, mask: pd.Series, reason: str):
+    # First error wins, later checks do not overwrite it
+    rows.loc[mask & rows["error"].isna(), "error"] = reason
+
+
+def _resolve_cities(db: Session, rows: pd.DataFrame, create_cities: bool, dry_run: bool) -> int:
+    """Fill rows.city_id; returns how many cities were (or would be) created."""
+
+    C = models.City
+    K = models.Country
+
+    cities = pd.DataFrame(
+        db.execute(select(C.id, C.name, K.name).join(K, K.id == C.country_id)).all(),
+        columns=["city_id", "city_name", "country_name"]
+    )
+    cities["city_key"] = _key(cities["city_name"])
+    cities["country_key"] = _key(cities["country_name"])
+
+    rows["city_key"] = _key(rows["city"])
+    rows["country_key"] = _key(rows["country"])
+    rows["city_id"] = pd.Series(pd.NA, index=rows.index, dtype="Int64")
+
+    # 1. numeric ids
+    by_id = pd.to_numeric(rows["city"], errors="coerce")
+    known_id = by_id.isin(cities["city_id"])
+    rows.loc[known_id, "city_id"] = by_id[known_id]
+    _fail(rows, by_id.notna() & ~known_id, "city id not found")
+
+    # 2. name + country
+    pairs = cities.drop_duplicates(["city_key", "country_key"])
+    by_pair = rows[["city_key", "country_key"]].merge(
+        pairs[["city_key", "country_key", "city_id"]],
+        on=["city_key", "country_key"], how="left"
+    )["city_id"].set_axis(rows.index)
+    use_pair = rows["city_id"].isna() & by_id.isna() & (rows["country_key"] != "")
+    rows.loc[use_pair, "city_id"] = by_pair[use_pair]
+
+    # 3. name alone, only when the name is unique across countries
+    counts = rows["city_key"].map(cities["city_key"].value_counts()).fillna(0)
+    unique = cities.drop_duplicates("city_key", keep=False).set_index("city_key")["city_id"]
+    use_name = rows["city_id"].isna() & by_id.isna() & (rows["country_key"] == "")
+    rows.loc[use_name, "city_id"] = rows.loc[use_name, "city_key"].map(unique)
+    _fail(rows, use_name & (counts > 1), "city name exists in several countries; add a country column")
+
+    # 4. unknown city with a known country -> create it
+    unresolved = rows["city_id"].isna() & by_id.isna() & (rows["city_key"] != "")
+
+    countries = pd.DataFrame(db.execute(select(K.id, K.name)).all(), columns=["country_id", "country_name"])
+    country_ids = countries.assign(key=_key(countries["country_name"])).drop_duplicates("key", keep=False).set_index("key")["country_id"]
+    rows["country_id"] = rows["country_key"].map(country_ids).astype("Int64")
+
+    creatable = unresolved & rows["country_id"].notna() & create_cities & rows["error"].isna()
+    _fail(rows, unresolved & (rows["country_key"] != "") & rows["country_id"].isna(), "country not found")
+    _fail(rows, unresolved & ~creatable, "city not found")
+    _fail(rows, rows["city_key"] == "", "city is required")
+
+    new = (
+        rows.loc[creatable, ["city", "city_key", "country_id", "country_key"]]
+        .drop_duplicates(["city_key", "country_key"])
+    )
+
+    if new.empty or dry_run:
+        return len(new)
+
+    created = db.execute(
+        pg_insert(C).returning(C.id, C.name, C.country_id),
+        [{"name": r.city, "country_id": int(r.country_id)} for r in new.itertuples(index=False)]
+    ).all()
+
+    made = pd.DataFrame(created, columns=["city_id", "city_name", "country_id"])
+    made["city_key"] = _key(made["city_name"])
+
+    rows.loc[creatable, "city_id"] = rows.loc[creatable, ["city_key", "country_id"]].merge(
+        made[["city_key", "country_id", "city_id"]],
+        on=["city_key", "country_id"], how="left"
+    )["city_id"].set_axis(rows.index[creatable])
+
+    return len(made)
+
+
+def _resolve_vendors(db: Session, rows: pd.DataFrame) -> pd.DataFrame:
+    """One row per (sheet row, vendor_id); unknown vendors fail the row."""
+
+    listed = (
+        rows.loc[rows["vendors"] != "", ["row", "vendors"]]
+        .assign(vendor=lambda f: f["vendors"].str.split(r"[,;|]", regex=True))
+        .explode("vendor")
+    )
+    listed["vendor"] = listed["vendor"].str.strip()
+    listed = listed[listed["vendor"] != ""]
+
+    if listed.empty:
+        return pd.DataFrame(columns=["row", "vendor_id"])
+
+    V = models.Vendor
+    vendors = pd.DataFrame(db.execute(select(V.id, V.name)).all(), columns=["vendor_id", "name"])
+    vendors["key"] = _key(vendors["name"])
+
+    by_name = vendors.drop_duplicates("key", keep=False).set_index("key")["vendor_id"]
+    by_id = pd.to_numeric(listed["vendor"], errors="coerce")
+
+    listed["vendor_id"] = by_id.where(by_id.isin(vendors["vendor_id"]))
+    listed["vendor_id"] = listed["vendor_id"].fillna(_key(listed["vendor"]).map(by_name))
+
+    unknown = listed[listed["vendor_id"].isna()].groupby("row")["vendor"].agg(", ".join)
+    if not unknown.empty:
+        bad = rows["row"].isin(unknown.index) & rows["error"].isna()
+        rows.loc[bad, "error"] = "unknown or ambiguous vendor: " + rows.loc[bad, "row"].map(unknown)
+
+    listed = listed.dropna(subset=["vendor_id"])
+    listed["vendor_id"] = listed["vendor_id"].astype(int)
+
+    return listed[["row", "vendor_id"]].drop_duplicates()
+
+
+def _existing_services(db: Session, city_ids: List[int]) -> pd.DataFrame:
+
+    S = models.Service
+
+    frame = pd.DataFrame(
+        db.execute(
+            select(S.id, S.name, S.city_id, S.category).where(S.city_id.in_(city_ids))
+        ).all() if city_ids else [],
+        columns=["service_id", "name", "city_id", "category"]
+    )
+    frame["name_key"] = _key(frame["name"])
+    frame["category"] = frame["category"].map(lambda c: getattr(c, "name", c))
+    frame["city_id"] = frame["city_id"].astype("Int64")
+
+    return frame
+
+
+# =====================================================
+# IMPORT
+# =====================================================
+
+def import_catalog(
+    db: Session,
+    raw: bytes,
+    filename: str,
+    create_cities: bool = True,
+    dry_run: bool = False
+) -> dict:
+
+    started = time.perf_counter()
+
+    rows = read_sheet(raw, filename)
+    rows["error"] = None
+
+    _fail(rows, rows["name"] == "", "name is required")
+    _fail(rows, ~rows["category"].isin(CATEGORIES), "invalid category")
+
+    cities_created = _resolve_cities(db, rows, create_cities, dry_run)
+    links = _resolve_vendors(db, rows)
+
+    rows["name_key"] = _key(rows["name"])
+    rows["status"] = None
+    ok = rows["error"].isna()
+
+    # ---- duplicates inside the sheet -----------------------------------
+    key = ["name_key", "city_id", "category"]
+    repeated = rows[ok].duplicated(key, keep="first").reindex(rows.index, fill_value=False)
+    rows.loc[repeated, "status"] = "duplicate"
+
+    # ---- duplicates against the database ------------------------------
+    existing = _existing_services(db, rows.loc[ok, "city_id"].dropna().astype(int).unique().tolist())
+    rows = rows.merge(existing[key + ["service_id"]].drop_duplicates(key), on=key, how="left")
+
+    ok = rows["error"].isna()
+    rows.loc[ok & rows["status"].isna() & rows["service_id"].notna(), "status"] = "exists"
+    rows.loc[ok & rows["status"].isna(), "status"] = "created"
+    rows.loc[~ok, "status"] = "error"
+
+    fresh = rows[rows["status"] == "created"]
+
+    if not dry_run and not fresh.empty:
+
+        S = models.Service
+
+        inserted = db.execute(
+            pg_insert(S).on_conflict_do_nothing().returning(S.id, S.name, S.city_id, S.category),
+            [
+                {
+                    "name": r.name,
+                    "category": models.ServiceCategory[r.category],
+                    "city_id": int(r.city_id)
+                }
+                for r in fresh.itertuples(index=False)
+            ]
+        ).all()
+
+        made = pd.DataFrame(inserted, columns=["new_id", "name", "city_id", "category"])
+        made["name_key"] = _key(made["name"])
+        made["category"] = made["category"].map(lambda c: c.name)
+        made["city_id"] = made["city_id"].astype("Int64")
+
+        rows = rows.merge(made[key + ["new_id"]], on=key, how="left")
+        rows["service_id"] = rows["service_id"].fillna(rows["new_id"])
+
+        # Lost a race with a concurrent insert: row exists, id unknown here
+        rows.loc[(rows["status"] == "created") & rows["new_id"].isna(), "status"] = "exists"
+
+    # Every row naming a service (including in-sheet duplicates) links its vendors
+    service_of = (
+        rows.loc[(rows["status"] != "error") & rows["service_id"].notna(), key + ["service_id"]]
+        .drop_duplicates(key)
+    )
+    rows = rows.drop(columns="service_id").merge(service_of, on=key, how="left")
+    rows.loc[rows["status"] == "error", "service_id"] = None
+
+    pairs = links.merge(rows[["row", "service_id"]], on="row").dropna(subset=["service_id"])
+    pairs["service_id"] = pairs["service_id"].astype(int)
+    pairs = pairs.drop_duplicates(["vendor_id", "service_id"])
+
+    if not pairs.empty:
+        VS = models.VendorService
+        current = set(
+            db.execute(
+                select(VS.vendor_id, VS.service_id).where(
+                    VS.service_id.in_(pairs["service_id"].unique().tolist())
+                )
+            ).all()
+        )
+        pairs = pairs[~pd.MultiIndex.from_frame(pairs[["vendor_id", "service_id"]]).isin(list(current))]
+
+    if not dry_run and not pairs.empty:
+        db.execute(
+            pg_insert(models.VendorService).on_conflict_do_nothing(),
+            pairs[["vendor_id", "service_id"]].to_dict("records")
+        )
+
+    if not dry_run:
+        db.commit()
+
+    linked = pairs.groupby("row").size() if not pairs.empty else pd.Series(dtype=int)
+    rows["vendors_linked"] = rows["row"].map(linked).fillna(0).astype(int)
+
+    summary = rows["status"].value_counts()
+
+    return {
+        "dry_run": dry_run,
+        "total_rows": len(rows),
+        "created": int(summary.get("created", 0)),
+        "existing": int(summary.get("exists", 0)),
+        "duplicates": int(summary.get("duplicate", 0)),
+        "errors": int(summary.get("error", 0)),
+        "cities_created": cities_created,
+        "vendor_links_created": len(pairs),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        "rows": [
+            {
+                "row": int(r.row),
+                "name": r.name,
+                "category": r.category,
+                "city_id": None if pd.isna(r.city_id) else int(r.city_id),
+                "status": r.status,
+                "service_id": None if pd.isna(r.service_id) else int(r.service_id),
+                "vendors_linked": int(r.vendors_linked),
+                "error": r.error
+            }
+            for r in rows.sort_values("row").itertuples(index=False)
+        ]
+    }
@@ -0,0 +1,146 @@
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import Date, func, literal, select, tuple_, union_all
+from sqlalchemy.orm import Session
+
+from app import models
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+# =====================================================
+# CLIENT LEDGER
+# =====================================================
+# Invoices are debits on their invoice date, payments are credits on
+# their payment date; cancelled invoices and their payments are left out.
+#
+# Entries are ordered by (entry_date, kind_order, source_id): invoices
+# before payments on the same day, then by row id. That triple is the
+# keyset cursor. A page's running balance is
+#
+#     SUM(amount) of every entry before the page's start key
+#   + SUM(amount) OVER (ORDER BY key) within the page
+#
+# so every page is one query, however many years of history lie before it.
+
+INVOICE = "INVOICE"
+PAYMENT = "PAYMENT"
+
+
+def ledger_entries(client_id: int):
+
+    I = models.Invoice
+    P = models.InvoicePayment
+
+    live = I.payment_status != models.PaymentStatus.CANCELLED
+
+    debits = select(
+        func.date(I.created_at, type_=Date).label("entry_date"),
+        literal(0).label("kind_order"),
+        I.id.label("source_id"),
+        literal(INVOICE).label("kind"),
+        I.invoice_number.label("reference"),
+        I.id.label("invoice_id"),
+        I.invoice_number.label("invoice_number"),
+        func.coalesce(I.total_amount, 0).label("amount")
+    ).where(I.client_id == client_id, live)
+
+    credits = select(
+        P.payment_date.label("entry_date"),
+        literal(1).label("kind_order"),
+        P.id.label("source_id"),
+        literal(PAYMENT).label("kind"),
+        P.receipt_number.label("reference"),
+        I.id.label("invoice_id"),
+        I.invoice_number.label("invoice_number"),
+        (-func.coalesce(P.amount, 0)).label("amount")
+    ).join(I, I.id == P.invoice_id).where(I.client_id == client_id, live)
+
+    return union_all(debits, credits).subquery("ledger")
+
+
+def client_ledger(
+    db: Session,
+    client_id: int,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> dict:
+
+    entries = ledger_entries(client_id)
+    e = entries.c
+
+    key_columns = [e.entry_date, e.kind_order, e.source_id]
+    key = tuple_(*key_columns)
+
+    # Balance brought forward at the cutoff (constant across pages)
+    if date_from:
+        opening = select(func.coalesce(func.sum(e.amount), 0)).where(
+            e.entry_date < date_from
+        ).scalar_subquery()
+    else:
+        opening = literal(0.0)
+
+    conditions = []
+
+    # Balance before this page's first row
+    if cursor:
+        after = tuple_(*decode_cursor(cursor, key_columns))
+        conditions.append(key > after)
+        carried = select(func.coalesce(func.sum(e.amount), 0)).where(key <= after).scalar_subquery()
+    else:
+        if date_from:
+            conditions.append(e.entry_date >= date_from)
+        carried = opening
+
+    if date_to:
+        conditions.append(e.entry_date <= date_to)
+
+    stmt = (
+        select(
+            *entries.c,
+            opening.label("opening_balance"),
+            (
+                carried + func.sum(e.amount).over(order_by=key_columns, rows=(None, 0))
+            ).label("balance")
+        )
+        .where(*conditions)
+        .order_by(*key_columns)
+        .limit(limit + 1)
+    )
+
+    rows = db.execute(stmt).mappings().all()
+
+    if rows:
+        opening_balance = float(rows[0]["opening_balance"])
+    else:
+        opening_balance = float(db.execute(select(opening)).scalar() or 0)
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([last["entry_date"], last["kind_order"], last["source_id"]])
+
+    return {
+        "client_id": client_id,
+        "date_from": date_from,
+        "date_to": date_to,
+        "opening_balance": round(opening_balance, 2),
+        "items": [
+            {
+                "entry_date": r["entry_date"],
+                "kind": r["kind"],
+                "reference": r["reference"],
+                "invoice_id": r["invoice_id"],
+                "invoice_number": r["invoice_number"],
+                "debit": round(float(r["amount"]), 2) if r["amount"] > 0 else 0.0,
+                "credit": round(float(-r["amount"]), 2) if r["amount"] < 0 else 0.0,
+                "balance": round(float(r["balance"]), 2)
+            }
+            for r in rows
+        ],
+        "next_cursor": next_cursor,
+        "limit": limit
+    }
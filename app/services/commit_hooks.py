@@ -0,0 +1,81 @@
+import threading
+from typing import Callable, Iterable, List, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+# =====================================================
+# TABLE-CHANGE NOTIFICATIONS ON COMMIT
+# =====================================================
+# Listeners subscribe to table names and are called after a session
+# commits a transaction that wrote to any of them. Writes are collected
+# from both the unit of work (add / dirty / delete) and ORM-enabled bulk
+# statements (session.execute(update(Model)...), insert(Model), ...).
+# Rolled back transactions notify nobody.
+#
+# Scope is this process: other workers see the change through whatever
+# max-staleness the subscriber applies.
+
+_KEY = "changed_tables"
+
+_listeners: List[Tuple[Set[str], Callable[[Set[str]], None]]] = []
+_lock = threading.Lock()
+
+
+def subscribe(tables: Iterable[str], callback: Callable[[Set[str]], None]):
+    with _lock:
+        _listeners.append((set(tables), callback))
+
+
+def _changed(session: Session) -> Set[str]:
+    return session.info.setdefault(_KEY, set())
+
+
+def _table_names(mapped) -> Set[str]:
+    mapper = getattr(mapped, "__mapper__", None)
+    if mapper is None:
+        return set()
+    return {t.name for t in mapper.tables}
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flush(session, flush_context):
+    changed = _changed(session)
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        changed |= _table_names(type(obj))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_statement(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    name = getattr(table, "name", None)
+    if name:
+        _changed(orm_execute_state.session).add(name)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify(session):
+
+    changed = session.info.pop(_KEY, None)
+    if not changed:
+        return
+
+    with _lock:
+        listeners = list(_listeners)
+
+    for tables, callback in listeners:
+        hit = tables & changed
+        if hit:
+            try:
+                callback(hit)
+            except Exception:
+                # A broken listener must never turn a committed write into an error
+                pass
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session):
+    session.info.pop(_KEY, None)
@@ -0,0 +1,340 @@
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import threading
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import or_, update
+
+from app import models
+from app.config import (
+    DOCUMENT_BATCH_CHUNK, DOCUMENT_BATCH_DIR,
+    DOCUMENT_BATCH_LEASE, DOCUMENT_BATCH_WORKERS
+)
+from app.database import SessionLocal
+from app.services.document_snapshots import invoice_snapshot, statement_snapshot
+from app.services.loading_profiles import document_query
+from app.services.pdf_render import render_document
+
+
+# =====================================================
+# BATCH DOCUMENT JOBS
+# =====================================================
+# Each job renders into <DOCUMENT_BATCH_DIR>/<id>/parts, one file per
+# document, and only then packs the parts into a ZIP. A part that exists
+# on disk is finished, so an interrupted job resumes where it stopped.
+#
+# Jobs are claimed with a heartbeat lease on the row, so when several API
+# processes start up only one of them picks up an abandoned job.
+
+_jobs = ThreadPoolExecutor(max_workers=1, thread_name_prefix="document-batch")
+_queued = set()
+_queued_lock = threading.Lock()
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _render_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max(1, DOCUMENT_BATCH_WORKERS),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def batch_dir(batch_id: int) -> Path:
+    return Path(DOCUMENT_BATCH_DIR) / str(batch_id)
+
+
+def _slug(text: str, fallback: str = "client") -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "-", text or "").strip("-") or fallback
+
+
+def _write_atomic(path: Path, data: bytes):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _invoice_range(query, batch):
+    I = models.Invoice
+    if batch.client_id:
+        query = query.filter(I.client_id == batch.client_id)
+    if batch.date_from:
+        query = query.filter(I.created_at >= batch.date_from)
+    if batch.date_to:
+        query = query.filter(I.created_at < batch.date_to + timedelta(days=1))
+    return query
+
+
+# =====================================================
+# TARGETS: (part file name, key) for every document
+# =====================================================
+
+def _targets(db, batch):
+
+    if batch.kind == models.DocumentBatchKind.INVOICE_PACK:
+        rows = _invoice_range(
+            db.query(models.Invoice.id, models.Invoice.invoice_number),
+            batch
+        ).order_by(models.Invoice.id).all()
+        return [(f"{_slug(number, f'invoice-{invoice_id}')}.pdf", invoice_id) for invoice_id, number in rows]
+
+    rows = _invoice_range(
+        db.query(models.Client.id, models.Client.company_name)
+        .join(models.Invoice, models.Invoice.client_id == models.Client.id),
+        batch
+    ).distinct().order_by(models.Client.id).all()
+
+    return [
+        (f"Statement-{client_id}-{_slug(name)}.pdf", client_id)
+        for client_id, name in rows
+    ]
+
+
+def _snapshots(db, batch, keys):
+    """Load one chunk of documents (two or three queries) as plain dicts."""
+
+    if batch.kind == models.DocumentBatchKind.INVOICE_PACK:
+        invoices = document_query(db, "invoice").filter(
+            models.Invoice.id.in_(keys)
+        ).all()
+        by_id = {inv.id: inv for inv in invoices}
+        return {k: ("invoice", invoice_snapshot(by_id[k])) for k in keys if k in by_id}
+
+    invoices = _invoice_range(
+        document_query(db, "statement").filter(models.Invoice.client_id.in_(keys)),
+        batch
+    ).order_by(models.Invoice.created_at, models.Invoice.id).all()
+
+    grouped = defaultdict(list)
+    for inv in invoices:
+        grouped[inv.client_id].append(inv)
+
+    return {
+        client_id: (
+            "statement",
+            statement_snapshot(rows[0].client, rows, batch.date_from, batch.date_to)
+        )
+        for client_id, rows in grouped.items()
+    }
+
+
+# =====================================================
+# LEASE
+# =====================================================
+
+def _claim(db, batch_id: int) -> bool:
+
+    B = models.DocumentBatch
+    now = datetime.utcnow()
+
+    claimed = db.execute(
+        update(B)
+        .where(
+            B.id == batch_id,
+            or_(
+                B.status == models.BatchStatus.PENDING,
+                (B.status == models.BatchStatus.RUNNING)
+                & (or_(B.heartbeat_at.is_(None),
+                       B.heartbeat_at < now - timedelta(seconds=DOCUMENT_BATCH_LEASE)))
+            )
+        )
+        .values(status=models.BatchStatus.RUNNING, heartbeat_at=now, error=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+    db.commit()
+    return claimed == 1
+
+
+def _checkpoint(db, batch, **values):
+    for field, value in values.items():
+        setattr(batch, field, value)
+    batch.heartbeat_at = datetime.utcnow()
+    db.commit()
+
+
+# =====================================================
+# RUN
+# =====================================================
+
+def _pack(parts_dir: Path, targets, zip_path: Path) -> int:
+    """Stream every part from disk into the ZIP; nothing is held in memory."""
+
+    fd, tmp = tempfile.mkstemp(dir=zip_path.parent, suffix=".zip.tmp")
+    os.close(fd)
+
+    with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+        for name, _ in targets:
+            part = parts_dir / name
+            if part.exists():
+                zf.write(part, arcname=name)
+
+    os.replace(tmp, zip_path)
+    return zip_path.stat().st_size
+
+
+def run_batch(batch_id: int):
+
+    db = SessionLocal()
+
+    try:
+        if not _claim(db, batch_id):
+            return
+
+        batch = db.get(models.DocumentBatch, batch_id)
+
+        work = batch_dir(batch_id)
+        parts = work / "parts"
+        parts.mkdir(parents=True, exist_ok=True)
+
+        targets = _targets(db, batch)
+        todo = [(name, key) for name, key in targets if not (parts / name).exists()]
+
+        _checkpoint(
+            db, batch,
+            total=len(targets),
+            rendered=len(targets) - len(todo),
+            started_at=batch.started_at or datetime.utcnow()
+        )
+
+        pool = _render_pool()
+
+        for start in range(0, len(todo), DOCUMENT_BATCH_CHUNK):
+
+            chunk = todo[start:start + DOCUMENT_BATCH_CHUNK]
+            names = {key: name for name, key in chunk}
+
+            # Short-lived session per chunk: the connection is back in the
+            # pool and the ORM objects are gone before rendering starts
+            with SessionLocal() as chunk_db:
+                snapshots = _snapshots(chunk_db, batch, list(names))
+
+            futures = {
+                pool.submit(render_document, kind, snapshot): key
+                for key, (kind, snapshot) in snapshots.items()
+            }
+
+            for future in as_completed(futures):
+                pdf, _ = future.result()
+                _write_atomic(parts / names[futures[future]], pdf)
+
+            _checkpoint(db, batch, rendered=batch.rendered + len(futures))
+
+        suffix = "invoices" if batch.kind == models.DocumentBatchKind.INVOICE_PACK else "statements"
+        zip_path = work / f"batch-{batch_id}-{suffix}.zip"
+        size = _pack(parts, targets, zip_path)
+
+        shutil.rmtree(parts, ignore_errors=True)
+
+        _checkpoint(
+            db, batch,
+            status=models.BatchStatus.COMPLETED,
+            file_path=str(zip_path),
+            file_size=size,
+            finished_at=datetime.utcnow()
+        )
+
+    except Exception as exc:
+        if isinstance(exc, BrokenProcessPool):
+            _reset_pool()   # a crashed worker poisons the pool; start fresh next time
+        db.rollback()
+        batch = db.get(models.DocumentBatch, batch_id)
+        if batch:
+            # Rendered parts stay on disk; re-submitting resumes from them
+            _checkpoint(
+                db, batch,
+                status=models.BatchStatus.FAILED,
+                error=str(exc)[:2000],
+                finished_at=datetime.utcnow()
+            )
+
+    finally:
+        db.close()
+        with _queued_lock:
+            _queued.discard(batch_id)
+
+
+# =====================================================
+# SCHEDULING
+# =====================================================
+
+def submit_batch(batch_id: int):
+    with _queued_lock:
+        if batch_id in _queued:
+            return
+        _queued.add(batch_id)
+    _jobs.submit(run_batch, batch_id)
+
+
+def resume_batches():
+    """
+    Re-queue jobs left PENDING or RUNNING by a stopped process. Jobs whose
+    lease is still fresh (maybe another process is on them) are checked
+    again once the lease has had time to expire.
+    """
+
+    db = SessionLocal()
+
+    try:
+        rows = db.query(
+            models.DocumentBatch.id
+        ).filter(
+            models.DocumentBatch.status.in_([
+                models.BatchStatus.PENDING,
+                models.BatchStatus.RUNNING
+            ])
+        ).order_by(models.DocumentBatch.id).all()
+    finally:
+        db.close()
+
+    for (batch_id,) in rows:
+        submit_batch(batch_id)
+
+    if rows:
+        timer = threading.Timer(DOCUMENT_BATCH_LEASE + 5, _resume_stale)
+        timer.daemon = True
+        timer.start()
+
+
+def _resume_stale():
+    # Second pass only; does not schedule itself again
+    db = SessionLocal()
+    try:
+        stale = datetime.utcnow() - timedelta(seconds=DOCUMENT_BATCH_LEASE)
+        rows = db.query(models.DocumentBatch.id).filter(
+            models.DocumentBatch.status == models.BatchStatus.RUNNING,
+            models.DocumentBatch.heartbeat_at < stale
+        ).all()
+    finally:
+        db.close()
+
+    for (batch_id,) in rows:
+        submit_batch(batch_id)
+
+
+def shutdown():
+    _jobs.shutdown(wait=False, cancel_futures=True)
+    _reset_pool()
@@ -0,0 +1,143 @@
+from typing import Optional
+
+
+# =====================================================
+# PLAIN-DATA SNAPSHOTS FOR PDF RENDERING
+# =====================================================
+# Renderers run in worker processes and must never touch the session,
+# so handlers flatten ORM objects into dicts of str / float / date.
+
+def _enum_value(value) -> Optional[str]:
+    if value is None:
+        return None
+    return getattr(value, "value", value)
+
+
+def _money(value) -> float:
+    return float(value or 0)
+
+
+def invoice_snapshot(invoice) -> dict:
+
+    quotation = invoice.quotation
+    items = quotation.items if quotation and quotation.items else []
+    payments = invoice.payments if getattr(invoice, "payments", None) else []
+
+    return {
+        "invoice_id": invoice.id,
+        "invoice_number": invoice.invoice_number,
+        "date": invoice.created_at.date() if invoice.created_at else None,
+        "client_name": invoice.client.company_name if invoice.client else "",
+        "total_amount": _money(invoice.total_amount),
+        "paid_amount": _money(invoice.paid_amount),
+        "due_amount": _money(invoice.due_amount),
+        "payment_status": _enum_value(invoice.payment_status),
+        "items": [
+            {
+                "id": item.id,
+                "service_name": item.service.name if item.service else "",
+                "quantity": item.quantity,
+                "sell_price": _money(item.sell_price),
+                "total_sell": _money(item.total_sell)
+            }
+            for item in items
+        ],
+        "payments": [
+            {
+                "id": p.id,
+                "payment_date": p.payment_date,
+                "payment_method": _enum_value(p.payment_method) or "",
+                "reference_no": p.reference_no or "",
+                "amount": _money(p.amount)
+            }
+            for p in payments
+        ]
+    }
+
+
+def payment_snapshot(payment) -> dict:
+
+    invoice = payment.invoice
+    client = invoice.client if invoice else None
+
+    return {
+        "payment_id": payment.id,
+        "receipt_number": payment.receipt_number,
+        "invoice_number": invoice.invoice_number if invoice else "",
+        "client_name": client.company_name if client else "",
+        "payment_date": payment.payment_date,
+        "payment_method": _enum_value(payment.payment_method) or "",
+        "reference_no": payment.reference_no or "",
+        "amount": _money(payment.amount)
+    }
+
+
+def _country_name(service) -> Optional[str]:
+    city = getattr(service, "city", None) if service else None
+    country = getattr(city, "country", None) if city else None
+    return country.name if country else None
+
+
+def quotation_snapshot(quotation) -> dict:
+    """Shared by the client quotation and the internal profit sheet."""
+
+    items = quotation.items or []
+
+    rows = [
+        {
+            "id": item.id,
+            "service_name": item.service.name if item.service else "",
+            "country": _country_name(item.service),
+            "start_date": item.start_date,
+            "end_date": item.end_date,
+            "quantity": item.quantity,
+            "cost_price": _money(item.cost_price),
+            "sell_price": _money(item.sell_price),
+            "total_cost": _money(item.total_cost),
+            "total_sell": _money(item.total_sell)
+        }
+        for item in items
+    ]
+
+    # Destinations in itinerary order, each once
+    countries = list(dict.fromkeys(r["country"] for r in rows if r["country"]))
+
+    return {
+        "quotation_id": quotation.id,
+        "quotation_number": quotation.quotation_number,
+        "date": quotation.created_at.date() if quotation.created_at else None,
+        "client_name": quotation.client.company_name if quotation.client else "",
+        "status": _enum_value(quotation.status),
+        "margin_percentage": _money(quotation.margin_percentage),
+        "total_cost": _money(quotation.total_cost),
+        "total_sell": _money(quotation.total_sell),
+        "total_profit": _money(quotation.total_profit),
+        "countries": countries,
+        "items": rows
+    }
+
+
+def statement_snapshot(client, invoices, date_from=None, date_to=None) -> dict:
+
+    rows = [
+        {
+            "invoice_number": inv.invoice_number,
+            "date": inv.created_at.date() if inv.created_at else None,
+            "total_amount": _money(inv.total_amount),
+            "paid_amount": _money(inv.paid_amount),
+            "due_amount": _money(inv.due_amount),
+            "payment_status": _enum_value(inv.payment_status)
+        }
+        for inv in invoices
+    ]
+
+    return {
+        "client_id": client.id,
+        "client_name": client.company_name,
+        "date_from": date_from,
+        "date_to": date_to,
+        "invoices": rows,
+        "total_amount": sum(r["total_amount"] for r in rows),
+        "paid_amount": sum(r["paid_amount"] for r in rows),
+        "due_amount": sum(r["due_amount"] for r in rows)
+    }
@@ -0,0 +1,123 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+import httpx
+
+from app.config import SUPPLIER_MAX_CONCURRENCY, SUPPLIER_RATE_DEADLINE
+from app.services.external_api.grn import fetch_grn_rate_async
+
+
+# =====================================================
+# REQUEST / RESULT
+# =====================================================
+
+@dataclass
+class RateRequest:
+    key: Hashable                     # caller's handle, e.g. line index
+    supplier_id: int
+    external_product_id: str
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+
+@dataclass
+class RateResult:
+    key: Hashable
+    price: Optional[float] = None
+    currency: Optional[str] = None
+    error: Optional[str] = None
+    source: str = "supplier"          # supplier | cache | stored | stale | last_known
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+RateFetcher = Callable[
+    [httpx.AsyncClient, RateRequest],
+    Awaitable[Tuple[float, Optional[str]]]
+]
+
+
+async def _grn_fetcher(client: httpx.AsyncClient, req: RateRequest):
+    return await fetch_grn_rate_async(
+        client, req.external_product_id, req.start_date, req.end_date
+    )
+
+
+# =====================================================
+# GATEWAY
+# =====================================================
+
+class SupplierRateGateway:
+    """
+    Fans out REST rate calls for one quotation concurrently.
+
+    - at most `max_concurrency` in-flight calls per supplier
+    - one shared deadline for the whole batch
+    - failures are reported per request, never raised
+    """
+
+    def __init__(
+        self,
+        fetcher: RateFetcher = _grn_fetcher,
+        max_concurrency: int = SUPPLIER_MAX_CONCURRENCY,
+        deadline: float = SUPPLIER_RATE_DEADLINE,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.fetcher = fetcher
+        self.max_concurrency = max_concurrency
+        self.deadline = deadline
+        self.transport = transport
+
+    async def fetch_all(self, requests: List[RateRequest]) -> Dict[Hashable, RateResult]:
+
+        if not requests:
+            return {}
+
+        deadline_at = time.monotonic() + self.deadline
+
+        semaphores: Dict[int, asyncio.Semaphore] = {}
+        for req in requests:
+            semaphores.setdefault(
+                req.supplier_id, asyncio.Semaphore(self.max_concurrency)
+            )
+
+        async with httpx.AsyncClient(
+            timeout=self.deadline, transport=self.transport
+        ) as client:
+
+            async def run(req: RateRequest) -> RateResult:
+                async with semaphores[req.supplier_id]:
+                    remaining = deadline_at - time.monotonic()
+                    if remaining <= 0:
+                        return RateResult(req.key, error="Supplier deadline exceeded")
+                    try:
+                        price, currency = await asyncio.wait_for(
+                            self.fetcher(client, req), timeout=remaining
+                        )
+                        return RateResult(req.key, price=price, currency=currency)
+                    except asyncio.TimeoutError:
+                        return RateResult(req.key, error="Supplier deadline exceeded")
+                    except httpx.HTTPStatusError as exc:
+                        return RateResult(
+                            req.key,
+                            error=f"Supplier returned HTTP {exc.response.status_code}"
+                        )
+                    except Exception as exc:
+                        return RateResult(req.key, error=f"Supplier error: {exc}")
+
+            results = await asyncio.gather(*(run(req) for req in requests))
+
+        return {result.key: result for result in results}
+
+    def fetch_all_sync(self, requests: List[RateRequest]) -> Dict[Hashable, RateResult]:
+        # Sync routes run in the threadpool, so there is no loop to reuse
+        return asyncio.run(self.fetch_all(requests))
+
+
+def fetch_supplier_rates(requests: List[RateRequest]) -> Dict[Hashable, RateResult]:
+    return SupplierRateGateway().fetch_all_sync(requests)
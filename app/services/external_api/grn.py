@@ -1,4 +1,10 @@
 from random import randint
+from datetime import date
+from typing import Optional, Tuple
+
+import httpx
+
+from app.config import GRN_API_URL
 
 
 def fetch_grn_rate(external_product_id: str) -> float:
@@ -14,3 +20,36 @@ def fetch_grn_rate(external_product_id: str) -> float:
     base_price = randint(3000, 8000)
 
     return float(base_price)
+
+
+async def fetch_grn_rate_async(
+    client: httpx.AsyncClient,
+    external_product_id: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> Tuple[float, Optional[str]]:
+    """
+    GRN rate call used by the supplier rate gateway.
+
+    Hits `GET {GRN_API_URL}/rates/{product_id}` when GRN_API_URL is set,
+    otherwise falls back to the mock above. Returns (price, currency).
+    """
+
+    if not GRN_API_URL:
+        return fetch_grn_rate(external_product_id), None
+
+    params = {}
+    if start_date:
+        params["check_in"] = start_date.isoformat()
+    if end_date:
+        params["check_out"] = end_date.isoformat()
+
+    response = await client.get(
+        f"{GRN_API_URL.rstrip('/')}/rates/{external_product_id}",
+        params=params
+    )
+    response.raise_for_status()
+
+    payload = response.json()
+
+    return float(payload["price"]), payload.get("currency")
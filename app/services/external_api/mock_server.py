@@ -0,0 +1,77 @@
+"""
+Local mock supplier for exercising the rate gateway.
+
+    python -m app.services.external_api.mock_server --port 8099 --latency 0.4
+    GRN_API_URL=http://127.0.0.1:8099 uvicorn app.main:app
+
+Latency can also be injected per call with `?latency=<seconds>`, and
+`--fail-rate` makes that share of calls answer 503.
+"""
+
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def make_handler(latency: float, jitter: float, fail_rate: float):
+
+    class MockSupplierHandler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            parts = url.path.strip("/").split("/")
+
+            if len(parts) != 2 or parts[0] != "rates":
+                self.send_error(404)
+                return
+
+            delay = float(query.get("latency", [latency])[0])
+            time.sleep(delay + random.uniform(0, jitter))
+
+            if random.random() < fail_rate:
+                self.send_error(503, "Supplier unavailable")
+                return
+
+            body = json.dumps({
+                "product_id": parts[1],
+                "check_in": query.get("check_in", [None])[0],
+                "check_out": query.get("check_out", [None])[0],
+                "price": float(random.randint(3000, 8000)),
+                "currency": "PKR"
+            }).encode()
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return MockSupplierHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock REST supplier")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(
+        (args.host, args.port),
+        make_handler(args.latency, args.jitter, args.fail_rate)
+    )
+    print(f"Mock supplier on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
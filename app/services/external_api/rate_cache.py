@@ -0,0 +1,389 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import (
+    RATE_CACHE_FALLBACK_MAX_AGE, RATE_CACHE_MAX_ENTRIES,
+    RATE_CACHE_STALE_TTL, RATE_CACHE_TTL
+)
+from app.database import SessionLocal
+from app.services.external_api.gateway import (
+    RateRequest, RateResult, SupplierRateGateway
+)
+
+
+CacheKey = Tuple[int, str, Optional[object], Optional[object]]
+
+
+def cache_key(req: RateRequest) -> CacheKey:
+    return (req.supplier_id, req.external_product_id, req.start_date, req.end_date)
+
+
+@dataclass
+class CachedRate:
+    price: float
+    currency: Optional[str]
+    fetched_at: float
+
+
+# =====================================================
+# IN-PROCESS LRU TIER
+# =====================================================
+
+class RateCache:
+
+    def __init__(
+        self,
+        ttl: int = RATE_CACHE_TTL,
+        stale_ttl: int = RATE_CACHE_STALE_TTL,
+        max_entries: int = RATE_CACHE_MAX_ENTRIES
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+
+        self._entries: "OrderedDict[CacheKey, CachedRate]" = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+        self.counters = {
+            "hits": 0,
+            "stale_hits": 0,
+            "stored_hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "refresh_failures": 0,
+            "evictions": 0
+        }
+
+    def lookup(self, key: CacheKey) -> Tuple[Optional[CachedRate], bool]:
+        """Return (entry, is_fresh); entry is None on a miss."""
+
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.counters["misses"] += 1
+                return None, False
+
+            age = now - entry.fetched_at
+
+            if age > self.ttl + self.stale_ttl:
+                del self._entries[key]
+                self.counters["misses"] += 1
+                return None, False
+
+            self._entries.move_to_end(key)
+
+            if age <= self.ttl:
+                self.counters["hits"] += 1
+                return entry, True
+
+            self.counters["stale_hits"] += 1
+            return entry, False
+
+    def store(self, key: CacheKey, price: float, currency: Optional[str], age: float = 0):
+
+        with self._lock:
+            self._entries[key] = CachedRate(price, currency, time.monotonic() - age)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def claim_refresh(self, keys: List[CacheKey]) -> List[CacheKey]:
+        # Only one background refresh per key at a time
+        with self._lock:
+            claimed = [k for k in keys if k not in self._refreshing]
+            self._refreshing.update(claimed)
+            return claimed
+
+    def release_refresh(self, keys: List[CacheKey]):
+        with self._lock:
+            self._refreshing.difference_update(keys)
+
+    def bump(self, counter: str, amount: int = 1):
+        with self._lock:
+            self.counters[counter] += amount
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self.counters)
+            size = len(self._entries)
+
+        lookups = counters["hits"] + counters["stale_hits"] + counters["misses"]
+
+        return {
+            **counters,
+            "entries": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "stale_ttl_seconds": self.stale_ttl,
+            # stored_hits are in-process misses answered by the DB tier
+            "hit_ratio": round(
+                (counters["hits"] + counters["stale_hits"] + counters["stored_hits"]) / lookups, 4
+            ) if lookups else 0.0
+        }
+
+
+rate_cache = RateCache()
+
+_refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rate-refresh")
+
+
+# =====================================================
+# DB TIER (ExternalProduct.last_known_price)
+# =====================================================
+# One price per product, stored with the stay dates it was quoted for
+# and when. It backs the in-process tier after a restart (same dates,
+# within TTL + STALE_TTL) and is the stale-if-error fallback (same
+# dates, within RATE_CACHE_FALLBACK_MAX_AGE). A price for other dates
+# is never served.
+
+@dataclass
+class StoredRate:
+    price: float
+    currency: Optional[str]
+    start_date: Optional[object]
+    end_date: Optional[object]
+    age: float
+
+
+def _write_back(db: Session, results: List[Tuple[RateRequest, RateResult]]):
+
+    rows = {}
+    now = datetime.utcnow()
+
+    for req, res in results:
+        rows[(req.supplier_id, req.external_product_id)] = {
+            "b_supplier_id": req.supplier_id,
+            "b_product_id": req.external_product_id,
+            "b_price": res.price,
+            "b_currency": res.currency,
+            "b_at": now,
+            "b_start": req.start_date,
+            "b_end": req.end_date
+        }
+
+    if not rows:
+        return
+
+    table = models.ExternalProduct.__table__
+
+    stmt = update(table).where(
+        table.c.supplier_id == bindparam("b_supplier_id"),
+        table.c.external_product_id == bindparam("b_product_id")
+    ).values(
+        last_known_price=bindparam("b_price"),
+        currency=bindparam("b_currency"),
+        last_price_at=bindparam("b_at"),
+        last_price_start_date=bindparam("b_start"),
+        last_price_end_date=bindparam("b_end")
+    )
+
+    db.execute(stmt, list(rows.values()))
+
+
+def _stored_prices(requests: List[RateRequest]) -> Dict[Tuple[int, str], StoredRate]:
+    """
+    Persisted prices for the requested products. Uses its own short
+    session so no connection stays checked out during the supplier call.
+    """
+
+    if not requests:
+        return {}
+
+    P = models.ExternalProduct
+
+    db = SessionLocal()
+    try:
+        rows = db.query(
+            P.supplier_id, P.external_product_id, P.last_known_price, P.currency,
+            P.last_price_at, P.last_price_start_date, P.last_price_end_date
+        ).filter(
+            P.supplier_id.in_({r.supplier_id for r in requests}),
+            P.external_product_id.in_({r.external_product_id for r in requests}),
+            P.last_known_price.isnot(None),
+            P.last_price_at.isnot(None)
+        ).all()
+    finally:
+        db.close()
+
+    now = datetime.utcnow()
+
+    return {
+        (r.supplier_id, r.external_product_id): StoredRate(
+            r.last_known_price, r.currency,
+            r.last_price_start_date, r.last_price_end_date,
+            (now - r.last_price_at).total_seconds()
+        )
+        for r in rows
+    }
+
+
+def _stored_for(stored: Dict, req: RateRequest, max_age: float) -> Optional[StoredRate]:
+
+    rate = stored.get((req.supplier_id, req.external_product_id))
+
+    if rate is None or rate.age > max_age:
+        return None
+
+    if (rate.start_date, rate.end_date) != (req.start_date, req.end_date):
+        return None
+
+    return rate
+
+
+def _refresh(requests: List[RateRequest], keys: List[CacheKey]):
+
+    try:
+        fetched = SupplierRateGateway().fetch_all_sync(requests)
+        good = []
+
+        for req in requests:
+            res = fetched.get(req.key)
+            if res and res.ok:
+                rate_cache.store(cache_key(req), res.price, res.currency)
+                good.append((req, res))
+            else:
+                rate_cache.bump("refresh_failures")
+
+        rate_cache.bump("refreshes", len(good))
+
+        if good:
+            db = SessionLocal()
+            try:
+                _write_back(db, good)
+                db.commit()
+            finally:
+                db.close()
+
+    except Exception:
+        rate_cache.bump("refresh_failures", len(requests))
+
+    finally:
+        rate_cache.release_refresh(keys)
+
+
+# =====================================================
+# CACHED RATE LOOKUP (USED BY PRICING)
+# =====================================================
+
+def get_supplier_rates(
+    db: Session,
+    requests: List[RateRequest]
+) -> Dict[Hashable, RateResult]:
+    """
+    Resolve REST supplier rates through the cache.
+
+    Fresh entries are served directly, stale ones are served and refreshed
+    in the background. In-process misses fall through to the price
+    persisted on ExternalProduct for the same stay dates, then to the
+    supplier gateway in one concurrent batch. New prices are written back
+    in `db` (the caller commits). If the supplier fails, the persisted
+    price for the same dates is used if it is recent enough, and the
+    error is still reported on the result.
+    """
+
+    results: Dict[Hashable, RateResult] = {}
+    misses: List[RateRequest] = []
+    stale: List[RateRequest] = []
+
+    for req in requests:
+        entry, fresh = rate_cache.lookup(cache_key(req))
+
+        if entry is None:
+            misses.append(req)
+            continue
+
+        results[req.key] = RateResult(
+            req.key,
+            price=entry.price,
+            currency=entry.currency,
+            source="cache" if fresh else "stale"
+        )
+
+        if not fresh:
+            stale.append(req)
+
+    # Restart-warm tier: persisted price for the same stay, still in window
+    stored = _stored_prices(misses)
+    remaining = []
+
+    for req in misses:
+        rate = _stored_for(stored, req, rate_cache.ttl + rate_cache.stale_ttl)
+
+        if rate is None:
+            remaining.append(req)
+            continue
+
+        rate_cache.store(cache_key(req), rate.price, rate.currency, age=rate.age)
+        rate_cache.bump("stored_hits")
+
+        results[req.key] = RateResult(
+            req.key,
+            price=rate.price,
+            currency=rate.currency,
+            source="stored" if rate.age <= rate_cache.ttl else "stale"
+        )
+
+        if rate.age > rate_cache.ttl:
+            stale.append(req)
+
+    misses = remaining
+
+    if stale:
+        claimed = rate_cache.claim_refresh([cache_key(r) for r in stale])
+        if claimed:
+            claimed_set = set(claimed)
+            _refresh_pool.submit(
+                _refresh,
+                [r for r in stale if cache_key(r) in claimed_set],
+                claimed
+            )
+
+    if not misses:
+        return results
+
+    fetched = SupplierRateGateway().fetch_all_sync(misses)
+
+    good = []
+    failed = []
+
+    for req in misses:
+        res = fetched[req.key]
+        results[req.key] = res
+
+        if res.ok:
+            rate_cache.store(cache_key(req), res.price, res.currency)
+            good.append((req, res))
+        else:
+            failed.append(req)
+
+    _write_back(db, good)
+
+    # Stale-if-error: the last price persisted for the same stay dates
+    for req in failed:
+        rate = _stored_for(stored, req, RATE_CACHE_FALLBACK_MAX_AGE)
+        if rate:
+            res = results[req.key]
+            res.price = rate.price
+            res.currency = rate.currency
+            res.source = "last_known"
+
+    return results
@@ -0,0 +1,440 @@
+import argparse
+import time
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import SessionLocal
+
+
+# =====================================================
+# FINANCE ROLLUPS
+# =====================================================
+# Rows of finance_rollups hold additive deltas per
+# (granularity, period, client, country, service category):
+#
+#   invoice created      revenue/cost/profit +, outstanding + total, invoices +1
+#   invoice cancelled    revenue/cost/profit -, outstanding - balance left
+#                        (both on the invoice's own date)
+#   payment / reversal   cash_in ±, outstanding ∓ (on the payment date)
+#
+# Summing any measure over a range gives that range's figure; summing
+# outstanding over all periods gives today's receivables. An invoice's
+# money is split across countries/categories by the sell value of its
+# quotation lines.
+
+GRANULARITIES = ("day", "month")
+UNKNOWN_COUNTRY = 0
+MEASURES = ("revenue", "cost", "profit", "cash_in", "outstanding", "invoices")
+
+Key = Tuple[str, date, int, int, models.ServiceCategory]
+
+
+def _as_date(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _periods(day: date):
+    return (("day", day), ("month", day.replace(day=1)))
+
+
+class RollupDeltas:
+    """Accumulates deltas in memory so one write covers a whole request."""
+
+    def __init__(self):
+        self.rows: Dict[Key, Dict[str, float]] = defaultdict(lambda: dict.fromkeys(MEASURES, 0.0))
+
+    def add(self, day, client_id, country_id, category, **measures):
+        for granularity, period in _periods(_as_date(day)):
+            row = self.rows[(granularity, period, client_id or 0, country_id, category)]
+            for name, value in measures.items():
+                row[name] += value
+
+    def __bool__(self):
+        return bool(self.rows)
+
+
+# =====================================================
+# INVOICE SHARES (one grouped query for many invoices)
+# =====================================================
+# The split is derived from the quotation lines the first time an
+# invoice is recorded and frozen in finance_invoice_shares, so later
+# edits to the quotation cannot move payments or a cancellation onto
+# other countries/categories than the invoice was booked under.
+
+def _derive_parts(db: Session, invoice_ids: List[int]) -> Dict[int, list]:
+
+    I = models.Invoice
+    QI = models.QuotationItem
+    S = models.Service
+    C = models.City
+
+    rows = db.execute(
+        select(
+            I.id,
+            C.country_id,
+            S.category,
+            func.coalesce(func.sum(QI.total_sell), 0).label("sell"),
+            func.coalesce(func.sum(QI.total_cost), 0).label("cost")
+        )
+        .join(QI, QI.quotation_id == I.quotation_id)
+        .outerjoin(S, S.id == QI.service_id)
+        .outerjoin(C, C.id == S.city_id)
+        .where(I.id.in_(invoice_ids))
+        .group_by(I.id, C.country_id, S.category)
+    ).all()
+
+    parts = defaultdict(list)
+
+    for r in rows:
+        if r.category is not None or r.sell:
+            parts[r.id].append([
+                r.country_id or UNKNOWN_COUNTRY,
+                r.category or models.ServiceCategory.OTHER,
+                float(r.sell),
+                float(r.cost)
+            ])
+
+    for invoice_id in invoice_ids:
+        lines = parts[invoice_id]
+        sell_total = sum(p[2] for p in lines)
+
+        if not lines:
+            lines.append([UNKNOWN_COUNTRY, models.ServiceCategory.OTHER, 1.0, 0.0])
+        elif sell_total <= 0:
+            for p in lines:
+                p[2] = 1.0 / len(lines)
+        else:
+            for p in lines:
+                p[2] = p[2] / sell_total
+
+    return parts
+
+
+def invoice_shares(db: Session, invoice_ids: Iterable[int], freeze: bool = True) -> Dict[int, dict]:
+    """
+    invoice_id -> {client_id, status, total, paid, created_at,
+                   parts: [(country_id, category, share, cost)]}
+    parts are ordered largest share first. With `freeze`, splits derived
+    here are stored (in the caller's transaction) for later events.
+    """
+
+    ids = list(set(invoice_ids))
+    if not ids:
+        return {}
+
+    I = models.Invoice
+    F = models.FinanceInvoiceShare
+
+    shares: Dict[int, dict] = {
+        r.id: {
+            "client_id": r.client_id,
+            "status": r.payment_status,
+            "total": float(r.total_amount or 0),
+            "paid": float(r.paid_amount or 0),
+            "created_at": r.created_at,
+            "parts": []
+        }
+        for r in db.execute(
+            select(I.id, I.client_id, I.payment_status, I.total_amount, I.paid_amount, I.created_at)
+            .where(I.id.in_(ids))
+        )
+    }
+
+    for r in db.execute(
+        select(F.invoice_id, F.country_id, F.category, F.share, F.cost)
+        .where(F.invoice_id.in_(list(shares)))
+    ):
+        shares[r.invoice_id]["parts"].append([r.country_id, r.category, float(r.share), float(r.cost)])
+
+    unfrozen = [invoice_id for invoice_id, entry in shares.items() if not entry["parts"]]
+
+    if unfrozen:
+        derived = _derive_parts(db, unfrozen)
+
+        for invoice_id in unfrozen:
+            shares[invoice_id]["parts"] = derived[invoice_id]
+
+        if freeze:
+            db.execute(insert(F), [
+                {
+                    "invoice_id": invoice_id,
+                    "country_id": country_id,
+                    "category": category,
+                    "share": share,
+                    "cost": cost
+                }
+                for invoice_id in unfrozen
+                for country_id, category, share, cost in derived[invoice_id]
+            ])
+
+    for entry in shares.values():
+        entry["parts"].sort(key=lambda p: -p[2])
+
+    return shares
+
+
+# =====================================================
+# EVENTS → DELTAS
+# =====================================================
+
+def _invoice_created(deltas: RollupDeltas, info: dict, sign: float = 1.0, balance: Optional[float] = None):
+
+    total = info["total"]
+    balance = total if balance is None else balance
+
+    for index, (country_id, category, share, cost) in enumerate(info["parts"]):
+        revenue = total * share
+        deltas.add(
+            info["created_at"], info["client_id"], country_id, category,
+            revenue=sign * revenue,
+            cost=sign * cost,
+            profit=sign * (revenue - cost),
+            outstanding=sign * balance * share,
+            invoices=1 if sign > 0 and index == 0 else 0
+        )
+
+
+def _payment(deltas: RollupDeltas, info: dict, payment_date, amount: float):
+
+    # Money received on a cancelled invoice is cash, not a receivable change
+    affects_balance = info["status"] != models.PaymentStatus.CANCELLED
+
+    for country_id, category, share, _ in info["parts"]:
+        deltas.add(
+            payment_date, info["client_id"], country_id, category,
+            cash_in=amount * share,
+            outstanding=-amount * share if affects_balance else 0.0
+        )
+
+
+# =====================================================
+# WRITE (additive upsert, caller's transaction)
+# =====================================================
+
+def _insert_for(db: Session):
+    dialect = db.get_bind().dialect.name
+    return sqlite_insert if dialect == "sqlite" else pg_insert
+
+
+def apply_deltas(db: Session, deltas: RollupDeltas) -> int:
+
+    if not deltas:
+        return 0
+
+    R = models.FinanceRollup
+
+    rows = [
+        {
+            "granularity": granularity,
+            "period": period,
+            "client_id": client_id,
+            "country_id": country_id,
+            "category": category,
+            **measures,
+            "invoices": int(round(measures["invoices"]))
+        }
+        # Key order: concurrent writers lock shared rows in the same order
+        # instead of deadlocking on each other
+        for (granularity, period, client_id, country_id, category), measures in sorted(deltas.rows.items())
+    ]
+
+    stmt = _insert_for(db)(R)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["granularity", "period", "client_id", "country_id", "category"],
+        set_={m: getattr(R, m) + getattr(stmt.excluded, m) for m in MEASURES}
+    )
+
+    db.execute(stmt, rows)
+    return len(rows)
+
+
+# =====================================================
+# HOOKS CALLED FROM WRITE PATHS
+# =====================================================
+
+def record_invoice(db: Session, invoice_id: int):
+    """After the invoice row is flushed."""
+
+    deltas = RollupDeltas()
+    for info in invoice_shares(db, [invoice_id]).values():
+        _invoice_created(deltas, info)
+    apply_deltas(db, deltas)
+
+
+def record_invoice_cancel(db: Session, invoice_id: int, balance_before: float):
+    """Reverse revenue and the balance that was still open at cancellation."""
+
+    deltas = RollupDeltas()
+    for info in invoice_shares(db, [invoice_id]).values():
+        _invoice_created(deltas, info, sign=-1.0, balance=balance_before)
+    apply_deltas(db, deltas)
+
+
+def record_payments(db: Session, payments: List[Tuple[int, date, float]]):
+    """(invoice_id, payment_date, amount); negative amount = reversal."""
+
+    shares = invoice_shares(db, [p[0] for p in payments])
+
+    deltas = RollupDeltas()
+    for invoice_id, payment_date, amount in payments:
+        if invoice_id in shares:
+            _payment(deltas, shares[invoice_id], payment_date, float(amount))
+    apply_deltas(db, deltas)
+
+
+# =====================================================
+# READS
+# =====================================================
+
+DIMENSIONS = {
+    "client": models.FinanceRollup.client_id,
+    "country": models.FinanceRollup.country_id,
+    "category": models.FinanceRollup.category,
+}
+
+
+def totals(db: Session) -> dict:
+    R = models.FinanceRollup
+    row = db.execute(
+        select(*[func.coalesce(func.sum(getattr(R, m)), 0).label(m) for m in MEASURES])
+        .where(R.granularity == "month")
+    ).mappings().one()
+    return {m: (int(row[m]) if m == "invoices" else float(row[m])) for m in MEASURES}
+
+
+def series(
+    db: Session,
+    granularity: str = "month",
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    group_by: Optional[str] = None
+) -> List[dict]:
+
+    R = models.FinanceRollup
+
+    keys = [R.period] + ([DIMENSIONS[group_by].label(group_by)] if group_by else [])
+
+    stmt = select(
+        *keys,
+        *[func.sum(getattr(R, m)).label(m) for m in MEASURES]
+    ).where(R.granularity == granularity)
+
+    if date_from:
+        start = date_from.replace(day=1) if granularity == "month" else date_from
+        stmt = stmt.where(R.period >= start)
+    if date_to:
+        stmt = stmt.where(R.period <= date_to)
+
+    rows = db.execute(stmt.group_by(*keys).order_by(*keys)).mappings().all()
+
+    return [
+        {
+            **{k: (v.value if hasattr(v, "value") else v) for k, v in r.items() if k not in MEASURES},
+            **{m: round(float(r[m] or 0), 2) for m in MEASURES if m != "invoices"},
+            "invoices": int(r["invoices"] or 0)
+        }
+        for r in rows
+    ]
+
+
+# =====================================================
+# BACKFILL
+# =====================================================
+
+def rebuild(db: Session, chunk_size: int = 500) -> dict:
+    """
+    Recompute every rollup row from invoices and invoice_payments.
+    Runs in one transaction, so readers see the old or the new figures.
+
+    On Postgres the table is locked EXCLUSIVE for the whole rebuild:
+    reads go on, but invoice/payment writes wait for it instead of adding
+    deltas that the delete would drop or the replay would count twice.
+    Other databases get no lock, so stop writes while rebuilding there.
+    """
+
+    started = time.perf_counter()
+
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE finance_rollups IN EXCLUSIVE MODE"))
+
+    db.execute(delete(models.FinanceRollup))
+
+    ids = db.execute(select(models.Invoice.id).order_by(models.Invoice.id)).scalars().all()
+    written = 0
+
+    for start in range(0, len(ids), chunk_size):
+
+        chunk = ids[start:start + chunk_size]
+        shares = invoice_shares(db, chunk)
+
+        payments = db.execute(
+            select(
+                models.InvoicePayment.invoice_id,
+                models.InvoicePayment.payment_date,
+                models.InvoicePayment.amount
+            ).where(models.InvoicePayment.invoice_id.in_(chunk))
+        ).all()
+
+        paid = defaultdict(float)
+        for p in payments:
+            paid[p.invoice_id] += float(p.amount or 0)
+
+        deltas = RollupDeltas()
+
+        for invoice_id, info in shares.items():
+            _invoice_created(deltas, info)
+            if info["status"] == models.PaymentStatus.CANCELLED:
+                _invoice_created(
+                    deltas, info, sign=-1.0,
+                    balance=max(info["total"] - max(paid[invoice_id], info["paid"]), 0.0)
+                )
+
+        for p in payments:
+            info = shares.get(p.invoice_id)
+            if info:
+                # Replay as if paid before any cancellation
+                live = dict(info, status=models.PaymentStatus.UNPAID)
+                _payment(deltas, live, p.payment_date, float(p.amount or 0))
+
+        # Money taken through /payments has no invoice_payments row: book
+        # what paid_amount holds beyond them on the invoice date
+        for invoice_id, info in shares.items():
+            untracked = info["paid"] - paid[invoice_id]
+            if untracked > 0.005:
+                live = dict(info, status=models.PaymentStatus.UNPAID)
+                _payment(deltas, live, info["created_at"], untracked)
+
+        written += apply_deltas(db, deltas)
+
+    db.commit()
+
+    return {
+        "invoices": len(ids),
+        "rows_written": written,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild finance_rollups from invoices and payments")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        report = rebuild(db, args.chunk_size)
+    finally:
+        db.close()
+
+    print(f"invoices={report['invoices']} rows_written={report['rows_written']} duration_ms={report['duration_ms']}")
+
+
+if __name__ == "__main__":
+    main()
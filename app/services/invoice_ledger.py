@@ -0,0 +1,203 @@
+import argparse
+from typing import Iterable, List, Optional
+
+from sqlalchemy import case, func, literal, select, update
+from sqlalchemy.orm import Session, aliased
+
+from app import models
+from app.database import SessionLocal
+
+
+# =====================================================
+# LEDGER EXPRESSIONS
+# =====================================================
+# paid/due/status always derive from one "paid" expression so the
+# per-payment delta and the bulk reconcile can never disagree.
+
+def _status(value: models.PaymentStatus):
+    return literal(value, models.Invoice.payment_status.type)
+
+
+def ledger_values(paid) -> dict:
+
+    I = models.Invoice
+    Status = models.PaymentStatus
+
+    cancelled = I.payment_status == _status(Status.CANCELLED)
+    remaining = func.coalesce(I.total_amount, 0) - paid
+
+    return {
+        "paid_amount": paid,
+        "due_amount": case(
+            (cancelled, 0.0),
+            else_=func.greatest(remaining, 0.0)
+        ),
+        "payment_status": case(
+            (cancelled, _status(Status.CANCELLED)),
+            (remaining <= 0, _status(Status.PAID)),
+            (I.payment_status == _status(Status.OVERDUE), _status(Status.OVERDUE)),
+            (paid > 0, _status(Status.PARTIAL)),
+            else_=_status(Status.UNPAID)
+        )
+    }
+
+
+# =====================================================
+# TRANSACTIONAL MAINTENANCE
+# =====================================================
+
+def apply_payment_delta(db: Session, invoice_id: int, amount: float):
+    """
+    Record +amount (payment) or -amount (reversal) on an invoice's ledger
+    with one row-locked UPDATE in the caller's transaction.
+    """
+
+    I = models.Invoice
+
+    db.execute(
+        update(I)
+        .where(I.id == invoice_id)
+        .values(**ledger_values(func.coalesce(I.paid_amount, 0) + amount))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def recompute_ledgers(
+    db: Session,
+    invoice_ids: Optional[Iterable[int]] = None
+) -> int:
+    """
+    Rebuild paid/due/status from invoice_payments with one
+    UPDATE ... FROM over a GROUP BY. `invoice_ids=None` means all.
+    """
+
+    I = models.Invoice
+    P = models.InvoicePayment
+    target = aliased(I)
+
+    sums = (
+        select(
+            target.id.label("invoice_id"),
+            func.coalesce(func.sum(P.amount), 0).label("paid")
+        )
+        .outerjoin(P, P.invoice_id == target.id)
+        .group_by(target.id)
+    )
+
+    if invoice_ids is not None:
+        ids = list(set(invoice_ids))
+        if not ids:
+            return 0
+        sums = sums.where(target.id.in_(ids))
+
+    sums = sums.subquery()
+
+    result = db.execute(
+        update(I)
+        .where(I.id == sums.c.invoice_id)
+        .values(**ledger_values(sums.c.paid))
+        .execution_options(synchronize_session=False)
+    )
+
+    return result.rowcount
+
+
+# =====================================================
+# RECONCILIATION
+# =====================================================
+
+def find_ledger_drift(db: Session, tolerance: float = 0.01) -> List[dict]:
+
+    I = models.Invoice
+    P = models.InvoicePayment
+
+    sums = (
+        select(
+            P.invoice_id.label("invoice_id"),
+            func.sum(P.amount).label("paid")
+        )
+        .group_by(P.invoice_id)
+        .subquery()
+    )
+
+    actual = func.coalesce(sums.c.paid, 0)
+    stored = func.coalesce(I.paid_amount, 0)
+    expected = ledger_values(actual)
+
+    rows = db.execute(
+        select(
+            I.id,
+            I.invoice_number,
+            stored.label("stored_paid"),
+            actual.label("actual_paid"),
+            I.due_amount.label("stored_due"),
+            expected["due_amount"].label("expected_due"),
+            I.payment_status.label("stored_status"),
+            expected["payment_status"].label("expected_status")
+        )
+        .outerjoin(sums, sums.c.invoice_id == I.id)
+        .where(
+            (func.abs(stored - actual) > tolerance)
+            | (func.abs(func.coalesce(I.due_amount, 0) - expected["due_amount"]) > tolerance)
+            | (I.payment_status.is_distinct_from(expected["payment_status"]))
+        )
+        .order_by(I.id)
+    ).all()
+
+    return [
+        {
+            "invoice_id": r.id,
+            "invoice_number": r.invoice_number,
+            "stored_paid": float(r.stored_paid),
+            "actual_paid": float(r.actual_paid),
+            "stored_due": float(r.stored_due or 0),
+            "expected_due": float(r.expected_due),
+            "stored_status": r.stored_status,
+            "expected_status": r.expected_status
+        }
+        for r in rows
+    ]
+
+
+def reconcile_ledgers(db: Session, fix: bool = False, tolerance: float = 0.01) -> dict:
+
+    drift = find_ledger_drift(db, tolerance)
+    fixed = 0
+
+    if fix and drift:
+        fixed = recompute_ledgers(db, [d["invoice_id"] for d in drift])
+        db.commit()
+
+    return {
+        "drifted": len(drift),
+        "fixed": fixed,
+        "invoices": drift
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Reconcile invoice paid/due/status against invoice_payments"
+    )
+    parser.add_argument("--fix", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.01)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        report = reconcile_ledgers(db, fix=args.fix, tolerance=args.tolerance)
+    finally:
+        db.close()
+
+    for d in report["invoices"]:
+        print(
+            f"{d['invoice_number']}: paid {d['stored_paid']:.2f} -> {d['actual_paid']:.2f}, "
+            f"due {d['stored_due']:.2f} -> {d['expected_due']:.2f}, "
+            f"status {d['stored_status']} -> {d['expected_status']}"
+        )
+
+    print(f"drifted={report['drifted']} fixed={report['fixed']}")
+
+
+if __name__ == "__main__":
+    main()
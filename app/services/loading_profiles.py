@@ -0,0 +1,84 @@
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app import models
+
+
+# =====================================================
+# DOCUMENT LOADING PROFILES
+# =====================================================
+# Everything a document prints, fetched up front:
+#   many-to-one  → joinedload  (same SELECT)
+#   one-to-many  → selectinload (one extra SELECT ... WHERE id IN (...))
+# so a document costs two or three queries no matter how many lines it has,
+# and nothing lazy-loads once the snapshot is taken.
+
+def _service_place(load):
+    # Destination flags need service → city → country
+    if hasattr(models.Service, "city"):
+        return load.joinedload(models.Service.city).joinedload(models.City.country)
+    return load
+
+
+def _invoice_document():
+    return [
+        joinedload(models.Invoice.client),
+        joinedload(models.Invoice.quotation)
+            .selectinload(models.Quotation.items)
+            .joinedload(models.QuotationItem.service),
+        selectinload(models.Invoice.payments)
+    ]
+
+
+def _voucher_document():
+    return [
+        joinedload(models.InvoicePayment.invoice)
+            .joinedload(models.Invoice.client)
+    ]
+
+
+def _quotation_document():
+    return [
+        joinedload(models.Quotation.client),
+        _service_place(
+            selectinload(models.Quotation.items)
+                .joinedload(models.QuotationItem.service)
+        )
+    ]
+
+
+def _statement_document():
+    # Statement lines come straight from the ledger columns on Invoice
+    return [
+        joinedload(models.Invoice.client)
+    ]
+
+
+PROFILES = {
+    "invoice": (lambda: models.Invoice, _invoice_document),
+    "voucher": (lambda: models.InvoicePayment, _voucher_document),
+    "quotation": (lambda: models.Quotation, _quotation_document),
+    "statement": (lambda: models.Invoice, _statement_document),
+}
+
+
+def document_query(db: Session, profile: str):
+    """db.query(<model>) with the profile's loader options applied."""
+
+    model, options = PROFILES[profile]
+    return db.query(model()).options(*options())
+
+
+def load_document(db: Session, profile: str, id: int):
+    model, _ = PROFILES[profile]
+    return document_query(db, profile).filter(model().id == id).first()
+
+
+def release(db: Session):
+    """
+    Give the pooled connection back before rendering starts.
+
+    Only call this once the snapshot is built: objects are expunged and any
+    attribute that was not loaded can no longer be fetched.
+    """
+
+    db.close()
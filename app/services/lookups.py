@@ -0,0 +1,26 @@
+from typing import Dict, Iterable
+
+from sqlalchemy.orm import Session
+
+
+# =====================================================
+# BATCHED PRIMARY-KEY LOOKUPS
+# =====================================================
+
+def load_by_ids(db: Session, model, ids: Iterable) -> Dict:
+    """
+    Load every row of `model` whose id is in `ids` with a single
+    `IN` query and return them keyed by id.
+
+    None values and duplicates are ignored, so callers can pass the raw
+    column of a request payload straight in.
+    """
+
+    wanted = {i for i in ids if i is not None}
+
+    if not wanted:
+        return {}
+
+    rows = db.query(model).filter(model.id.in_(wanted)).all()
+
+    return {row.id: row for row in rows}
@@ -0,0 +1,325 @@
+import time
+from datetime import date
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import BASE_CURRENCY
+from app.services.rate_resolver import rate_index
+
+
+# =====================================================
+# NIGHTLY PRICING ENGINE
+# =====================================================
+# Hotel lines are expanded to one row per night (start_date inclusive,
+# end_date exclusive; a same-day stay counts one night). Other lines are
+# one row on their start date. For every row, in whole-quotation arrays:
+#
+#   base   = BASE_CURRENCY ServiceRate valid that night for the line's
+#            vendor (cheapest vendor at check-in when the line has none),
+#            else the line's own cost_price
+#   cost   = base * (1 + Σ percent / 100) + Σ amount     (matching rules)
+#   sell   = cost * (1 + margin / 100)
+#
+# Line totals are per-night sums times quantity.
+
+NIGHTLY = models.ServiceCategory.HOTEL.name
+
+
+def _as_day(values) -> np.ndarray:
+    return pd.to_datetime(pd.Series(values)).to_numpy(dtype="datetime64[D]")
+
+
+def _lines_frame(db: Session, lines: List[dict], default_margin: float) -> pd.DataFrame:
+
+    frame = pd.DataFrame(lines)
+
+    service_ids = frame["service_id"].dropna().astype(int).unique().tolist()
+    categories = {
+        service_id: getattr(category, "name", category)
+        for service_id, category in db.execute(
+            select(models.Service.id, models.Service.category).where(models.Service.id.in_(service_ids))
+        ).all()
+    } if service_ids else {}
+
+    frame["category"] = frame["service_id"].map(categories)
+    frame["nightly"] = frame["category"] == NIGHTLY
+
+    start = _as_day(frame["start_date"].fillna(date.today()))
+    end = _as_day(frame["end_date"].fillna(frame["start_date"]).fillna(date.today()))
+
+    frame["start"] = start
+    frame["nights"] = np.where(frame["nightly"], np.maximum((end - start).astype(int), 1), 1)
+
+    frame["quantity"] = frame["quantity"].fillna(1).astype(int)
+    frame["item_cost"] = pd.to_numeric(frame["cost_price"], errors="coerce").fillna(0.0)
+    frame["margin"] = pd.to_numeric(frame["manual_margin_percentage"], errors="coerce").fillna(default_margin or 0)
+
+    # Lines without a vendor take the cheapest vendor valid at check-in
+    # (the defaulted start, so lines without dates resolve too)
+    open_vendor = frame["vendor_id"].isna()
+    if open_vendor.any():
+        check_in = pd.to_datetime(frame.loc[open_vendor, "start"]).dt.date
+        picked = rate_index.resolve_many(db, [
+            (int(service_id), None, day)
+            for service_id, day in zip(frame.loc[open_vendor, "service_id"], check_in)
+        ], currency=BASE_CURRENCY)
+    else:
+        picked = []
+
+    frame["vendor_id"] = _fill_vendors(frame["vendor_id"], open_vendor, picked)
+
+    return frame
+
+
+def _fill_vendors(vendor_id: pd.Series, open_vendor: pd.Series, picked) -> pd.Series:
+    """Picked vendors into the open slots; -1 where none was found."""
+
+    # float + NaN: a list holding None cannot be set into a float64 column
+    filled = vendor_id.astype(float)
+    filled.loc[open_vendor] = np.array([p.vendor_id if p else np.nan for p in picked], dtype=float)
+
+    return filled.fillna(-1).astype(int)
+
+
+def _expand(frame: pd.DataFrame) -> pd.DataFrame:
+    """One row per (line, night), built with repeat/arange, no Python loop."""
+
+    counts = frame["nights"].to_numpy()
+    line = np.repeat(np.arange(len(frame)), counts)
+    offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    nights = pd.DataFrame({
+        "line": line,
+        "night": frame["start"].to_numpy()[line] + offset.astype("timedelta64[D]"),
+    })
+
+    for column in ("service_id", "vendor_id", "category", "nightly", "nights", "item_cost", "margin", "quantity"):
+        nights[column] = frame[column].to_numpy()[line]
+
+    nights["night"] = nights["night"].astype("datetime64[ns]")
+
+    return nights
+
+
+def _base_rates(db: Session, nights: pd.DataFrame) -> pd.DataFrame:
+    """merge_asof each night onto the last rate starting on or before it."""
+
+    R = models.ServiceRate
+
+    service_ids = nights["service_id"].unique().tolist()
+
+    rates = pd.DataFrame(
+        db.execute(
+            select(R.id, R.service_id, R.vendor_id, R.valid_from, R.valid_to, R.cost_price)
+            .where(
+                R.service_id.in_(service_ids),
+                R.vendor_id.isnot(None),
+                func.upper(R.currency) == BASE_CURRENCY
+            )
+        ).all(),
+        columns=["rate_id", "service_id", "vendor_id", "valid_from", "valid_to", "rate_cost"]
+    )
+
+    rates["valid_from"] = pd.to_datetime(rates["valid_from"]).fillna(pd.Timestamp.min).astype("datetime64[ns]")
+    rates["valid_to"] = pd.to_datetime(rates["valid_to"]).astype("datetime64[ns]")
+    rates[["service_id", "vendor_id"]] = rates[["service_id", "vendor_id"]].astype(int)
+
+    ordered = nights.reset_index().sort_values("night")
+
+    merged = pd.merge_asof(
+        ordered,
+        rates.sort_values("valid_from"),
+        left_on="night", right_on="valid_from",
+        by=["service_id", "vendor_id"],
+        direction="backward"
+    ).set_index("index").sort_index()
+
+    covered = merged["rate_id"].notna() & (merged["valid_to"].isna() | (merged["night"] <= merged["valid_to"]))
+
+    nights["rate_id"] = merged["rate_id"].where(covered).astype("Int64")
+    nights["base"] = merged["rate_cost"].where(covered).fillna(nights["item_cost"]).astype(float)
+    nights["source"] = np.where(covered, "rate", "item")
+
+    return nights
+
+
+def _rules(db: Session, service_ids: List[int]) -> List[models.PricingRule]:
+    P = models.PricingRule
+    return db.query(P).filter(
+        P.is_active.is_(True),
+        or_(P.service_id.is_(None), P.service_id.in_(service_ids))
+    ).order_by(P.id).all()
+
+
+def _apply_rules(nights: pd.DataFrame, rules: List[models.PricingRule]):
+
+    n = len(nights)
+    percent = np.zeros(n)
+    amount = np.zeros(n)
+    matched = np.zeros((n, len(rules)), dtype=bool)
+    blocked = np.zeros(n, dtype=bool)
+
+    night = nights["night"].to_numpy()
+    weekday = nights["night"].dt.weekday.to_numpy()
+
+    for j, rule in enumerate(rules):
+
+        mask = np.ones(n, dtype=bool)
+
+        if rule.service_id is not None:
+            mask &= nights["service_id"].to_numpy() == rule.service_id
+        if rule.vendor_id is not None:
+            mask &= nights["vendor_id"].to_numpy() == rule.vendor_id
+        if rule.category is not None:
+            mask &= (nights["category"] == rule.category.name).to_numpy()
+        if rule.valid_from:
+            mask &= night >= np.datetime64(rule.valid_from)
+        if rule.valid_to:
+            mask &= night <= np.datetime64(rule.valid_to)
+
+        if rule.kind == models.PricingRuleKind.WEEKDAY:
+            days = [int(d) for d in (rule.weekdays or "").split(",") if d.strip().isdigit()]
+            mask &= np.isin(weekday, days)
+
+        elif rule.kind == models.PricingRuleKind.MIN_STAY:
+            mask &= nights["nightly"].to_numpy() & (nights["nights"].to_numpy() < (rule.min_nights or 0))
+            if not rule.percent and not rule.amount:
+                blocked |= mask
+
+        percent += mask * (rule.percent or 0)
+        amount += mask * (rule.amount or 0)
+        matched[:, j] = mask
+
+    nights["percent"] = percent
+    nights["amount"] = amount
+    nights["blocked"] = blocked
+    nights["cost"] = nights["base"] * (1 + percent / 100) + amount
+    nights["sell"] = nights["cost"] * (1 + nights["margin"] / 100)
+
+    # Nights matching the same rule set share one list
+    if rules:
+        rule_ids = np.array([r.id for r in rules])
+        patterns, inverse = np.unique(matched, axis=0, return_inverse=True)
+        shared = [rule_ids[p].tolist() for p in patterns]
+        nights["rules"] = [shared[k] for k in inverse.ravel()]
+    else:
+        nights["rules"] = [[] for _ in range(n)]
+
+
+def price_lines(db: Session, lines: List[dict], default_margin: Optional[float] = 0) -> dict:
+    """
+    lines: dicts with key, service_id, vendor_id, start_date, end_date,
+    quantity, cost_price, manual_margin_percentage.
+    """
+
+    started = time.perf_counter()
+
+    if not lines:
+        return {"lines": [], "totals": {"cost": 0.0, "sell": 0.0, "profit": 0.0}, "duration_ms": 0.0}
+
+    frame = _lines_frame(db, lines, default_margin)
+    nights = _base_rates(db, _expand(frame))
+
+    rules = _rules(db, frame["service_id"].dropna().astype(int).unique().tolist())
+    _apply_rules(nights, rules)
+
+    # ---- line totals ---------------------------------------------------
+    # Nights of a line are contiguous (built in line order), so per-line
+    # sums are reduceat over the line offsets and the breakdown is a slice.
+    counts = frame["nights"].to_numpy()
+    offsets = np.cumsum(counts) - counts
+    quantity = frame["quantity"].to_numpy()
+
+    line_base = np.add.reduceat(nights["base"].to_numpy(), offsets)
+    line_cost = np.add.reduceat(nights["cost"].to_numpy(), offsets)
+    line_sell = np.add.reduceat(nights["sell"].to_numpy(), offsets)
+    line_blocked = np.logical_or.reduceat(nights["blocked"].to_numpy(), offsets)
+    line_from_item = np.logical_or.reduceat((nights["source"] == "item").to_numpy(), offsets)
+
+    total_costs = line_cost * quantity
+    total_sells = line_sell * quantity
+
+    dates = nights["night"].dt.date.tolist()
+    rate_ids = [None if pd.isna(r) else int(r) for r in nights["rate_id"]]
+    sources = nights["source"].tolist()
+    bases = nights["base"].round(2).tolist()
+    percents = nights["percent"].tolist()
+    amounts = nights["amount"].tolist()
+    rule_lists = nights["rules"].tolist()
+    costs = nights["cost"].round(2).tolist()
+    sells = nights["sell"].round(2).tolist()
+
+    out = []
+    for i, line in enumerate(frame[["key", "service_id", "vendor_id", "nightly", "nights", "quantity"]].itertuples(index=False)):
+        first, last = offsets[i], offsets[i] + counts[i]
+
+        out.append({
+            "key": line.key,
+            "service_id": line.service_id,
+            "vendor_id": None if line.vendor_id < 0 else int(line.vendor_id),
+            "nightly": bool(line.nightly),
+            "nights": int(line.nights),
+            "quantity": int(line.quantity),
+            "base_cost": round(float(line_base[i]), 2),
+            "unit_cost": round(float(line_cost[i]), 2),
+            "unit_sell": round(float(line_sell[i]), 2),
+            "total_cost": round(float(total_costs[i]), 2),
+            "total_sell": round(float(total_sells[i]), 2),
+            "profit": round(float(total_sells[i] - total_costs[i]), 2),
+            "bookable": not bool(line_blocked[i]),
+            "missing_rates": bool(line_from_item[i]),
+            "breakdown": [
+                {
+                    "date": dates[k],
+                    "rate_id": rate_ids[k],
+                    "source": sources[k],
+                    "base": bases[k],
+                    "percent": percents[k],
+                    "amount": amounts[k],
+                    "rules": rule_lists[k],
+                    "cost": costs[k],
+                    "sell": sells[k]
+                }
+                for k in range(first, last)
+            ]
+        })
+
+    total_cost = float(total_costs.sum())
+    total_sell = float(total_sells.sum())
+
+    return {
+        "lines": out,
+        "totals": {
+            "cost": round(total_cost, 2),
+            "sell": round(total_sell, 2),
+            "profit": round(total_sell - total_cost, 2)
+        },
+        "rules_applied": sorted({r for rs in nights["rules"] for r in rs}),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+
+def price_quotation(db: Session, quotation_id: int) -> dict:
+
+    QI = models.QuotationItem
+
+    quotation = db.query(models.Quotation).filter(models.Quotation.id == quotation_id).first()
+    if quotation is None:
+        return None
+
+    items = db.execute(
+        select(
+            QI.id.label("key"), QI.service_id, QI.vendor_id, QI.start_date, QI.end_date,
+            QI.quantity, QI.cost_price, QI.manual_margin_percentage
+        ).where(QI.quotation_id == quotation_id, QI.service_id.isnot(None)).order_by(QI.id)
+    ).mappings().all()
+
+    report = price_lines(db, [dict(i) for i in items], quotation.margin_percentage)
+    report["quotation_id"] = quotation_id
+
+    return report
@@ -0,0 +1,246 @@
+import argparse
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import cast, func, Integer, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app import models
+from app.config import NUMBER_BLOCK_SIZE
+from app.database import engine
+
+
+# =====================================================
+# SERIES
+# =====================================================
+# format       → how a sequence value is rendered
+# yearly       → counter resets every calendar year
+# model/column → existing documents, used once to seed a new counter
+
+SERIES = {
+    "QT": {
+        "format": "QT-{seq:04d}",
+        "yearly": False,
+        "model": "Quotation",
+        "column": "quotation_number"
+    },
+    "INV": {
+        "format": "INV-{year}-{seq:04d}",
+        "yearly": True,
+        "model": "Invoice",
+        "column": "invoice_number"
+    },
+    "RCPT": {
+        "format": "RCPT-{year}-{seq:04d}",
+        "yearly": True,
+        "model": "InvoicePayment",
+        "column": "receipt_number"
+    },
+}
+
+
+def _series_config(series: str) -> dict:
+    return SERIES.get(series, {
+        "format": series + "-{year}-{seq:04d}",
+        "yearly": True,
+        "model": None,
+        "column": None
+    })
+
+
+def _prefix(series: str, year: int) -> str:
+    return _series_config(series)["format"].split("{seq")[0].format(year=year)
+
+
+# =====================================================
+# COUNTER TABLE (row-locked block reservation)
+# =====================================================
+
+def _seed_value(conn, series: str, year: int) -> int:
+    """Highest number already issued for this series/year, or 0."""
+
+    config = _series_config(series)
+
+    if not config["model"]:
+        return 0
+
+    column = getattr(getattr(models, config["model"]), config["column"])
+    prefix = _prefix(series, year)
+
+    value = conn.execute(
+        select(
+            func.max(cast(func.substring(column, r"([0-9]+)$"), Integer))
+        ).where(column.like(prefix + "%"))
+    ).scalar()
+
+    return value or 0
+
+
+def reserve_block(series: str, year: int, size: int) -> Tuple[int, int]:
+    """
+    Reserve `size` consecutive values and return (first, last).
+
+    Runs in its own short transaction: the UPDATE row-locks the counter,
+    so concurrent workers queue on that one row and always receive
+    disjoint ranges, and the lock is released before the caller's
+    request transaction does anything else.
+    """
+
+    table = models.DocumentCounter.__table__
+
+    bump = (
+        update(table)
+        .where(table.c.series == series, table.c.year == year)
+        .values(last_value=table.c.last_value + size)
+        .returning(table.c.last_value)
+    )
+
+    with engine.begin() as conn:
+        last = conn.execute(bump).scalar()
+
+        if last is None:
+            conn.execute(
+                pg_insert(table)
+                .values(
+                    series=series,
+                    year=year,
+                    last_value=_seed_value(conn, series, year)
+                )
+                .on_conflict_do_nothing(index_elements=["series", "year"])
+            )
+            last = conn.execute(bump).scalar()
+
+    return last - size + 1, last
+
+
+# =====================================================
+# PER-WORKER ALLOCATOR
+# =====================================================
+
+class NumberAllocator:
+
+    def __init__(self, block_size: int = NUMBER_BLOCK_SIZE):
+        self.block_size = max(1, block_size)
+        self._blocks: Dict[Tuple[str, int], List[int]] = {}
+        self._lock = threading.Lock()
+
+    def next_values(self, series: str, year: int, count: int = 1) -> List[int]:
+
+        values = []
+
+        with self._lock:
+            while len(values) < count:
+                block = self._blocks.get((series, year))
+
+                if not block or block[0] > block[1]:
+                    size = max(self.block_size, count - len(values))
+                    block = list(reserve_block(series, year, size))
+                    self._blocks[(series, year)] = block
+
+                take = min(count - len(values), block[1] - block[0] + 1)
+                values.extend(range(block[0], block[0] + take))
+                block[0] += take
+
+        return values
+
+    def next_numbers(
+        self,
+        series: str,
+        count: int = 1,
+        when: Optional[datetime] = None
+    ) -> List[str]:
+
+        config = _series_config(series)
+        calendar_year = (when or datetime.utcnow()).year
+        year = calendar_year if config["yearly"] else 0
+
+        return [
+            config["format"].format(year=calendar_year, seq=value)
+            for value in self.next_values(series, year, count)
+        ]
+
+    def reset(self):
+        with self._lock:
+            self._blocks.clear()
+
+
+allocator = NumberAllocator()
+
+
+def next_number(series: str) -> str:
+    return allocator.next_numbers(series, 1)[0]
+
+
+def next_numbers(series: str, count: int) -> List[str]:
+    return allocator.next_numbers(series, count)
+
+
+# =====================================================
+# LOAD TEST
+# =====================================================
+# python -m app.services.numbering --processes 4 --threads 16 --count 250
+# Simulates several uvicorn workers hammering one scratch series and
+# checks that no number was handed out twice.
+
+def _worker(args):
+    series, threads, count, block_size = args
+
+    engine.dispose()  # never share pooled connections across fork
+    local = NumberAllocator(block_size)
+    issued = []
+    issued_lock = threading.Lock()
+
+    def run():
+        mine = [local.next_numbers(series)[0] for _ in range(count)]
+        with issued_lock:
+            issued.extend(mine)
+
+    pool = [threading.Thread(target=run) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+    return issued
+
+
+def main():
+    import multiprocessing
+    import time
+
+    parser = argparse.ArgumentParser(description="Document numbering load test")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--count", type=int, default=250)
+    parser.add_argument("--block-size", type=int, default=NUMBER_BLOCK_SIZE)
+    args = parser.parse_args()
+
+    series = f"LOADTEST{int(time.time())}"
+    started = time.perf_counter()
+
+    with multiprocessing.Pool(args.processes) as pool:
+        batches = pool.map(
+            _worker,
+            [(series, args.threads, args.count, args.block_size)] * args.processes
+        )
+
+    elapsed = time.perf_counter() - started
+    issued = [n for batch in batches for n in batch]
+    duplicates = len(issued) - len(set(issued))
+
+    table = models.DocumentCounter.__table__
+    with engine.begin() as conn:
+        conn.execute(table.delete().where(table.c.series == series))
+
+    print(
+        f"issued={len(issued)} unique={len(set(issued))} "
+        f"duplicates={duplicates} elapsed={elapsed:.2f}s "
+        f"rate={len(issued) / elapsed:.0f}/s"
+    )
+
+    raise SystemExit(1 if duplicates else 0)
+
+
+if __name__ == "__main__":
+    main()
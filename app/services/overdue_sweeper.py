@@ -0,0 +1,176 @@
+import argparse
+import threading
+import time
+from collections import deque
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import literal, select, update
+
+from app import models
+from app.config import OVERDUE_SWEEP_BATCH, OVERDUE_SWEEP_INTERVAL
+from app.database import SessionLocal
+
+
+# =====================================================
+# SET-BASED SWEEP
+# =====================================================
+
+def _status(value: models.PaymentStatus):
+    return literal(value, models.Invoice.payment_status.type)
+
+
+def mark_overdue_batch(db, today: date, batch_size: int) -> int:
+    """
+    Flip up to `batch_size` open invoices past their quotation due date to
+    OVERDUE in one UPDATE. Rows locked by a concurrent payment are skipped
+    (they are picked up on the next run) instead of waited on.
+    """
+
+    I = models.Invoice
+    Q = models.Quotation
+
+    candidates = (
+        select(I.id)
+        .join(Q, Q.id == I.quotation_id)
+        .where(
+            Q.due_date < today,
+            I.due_amount > 0,
+            I.payment_status.in_([
+                _status(models.PaymentStatus.UNPAID),
+                _status(models.PaymentStatus.PARTIAL)
+            ])
+        )
+        .order_by(I.id)
+        .limit(batch_size)
+        .with_for_update(of=I, skip_locked=True)
+    )
+
+    result = db.execute(
+        update(I)
+        .where(I.id.in_(candidates.scalar_subquery()))
+        .values(payment_status=_status(models.PaymentStatus.OVERDUE))
+        .execution_options(synchronize_session=False)
+    )
+
+    return result.rowcount
+
+
+def sweep_overdue(
+    today: Optional[date] = None,
+    batch_size: int = OVERDUE_SWEEP_BATCH
+) -> dict:
+    """Run batches (one short transaction each) until nothing is left."""
+
+    today = today or date.today()
+    started = time.perf_counter()
+    marked = 0
+    batches = 0
+
+    db = SessionLocal()
+
+    try:
+        while True:
+            changed = mark_overdue_batch(db, today, batch_size)
+            db.commit()
+
+            batches += 1
+            marked += changed
+
+            if changed < batch_size:
+                break
+    finally:
+        db.close()
+
+    return {
+        "as_of": today,
+        "marked": marked,
+        "batches": batches,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+
+# =====================================================
+# IN-PROCESS SCHEDULER
+# =====================================================
+
+class OverdueSweeper:
+
+    def __init__(self, interval: float = OVERDUE_SWEEP_INTERVAL):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._run_lock = threading.Lock()
+        self._lock = threading.Lock()
+
+        self.runs = 0
+        self.failures = 0
+        self.total_marked = 0
+        self.history = deque(maxlen=20)
+
+    def run_once(self, trigger: str = "manual") -> dict:
+
+        # One sweep at a time per process; a manual trigger waits for a
+        # scheduled run already in progress rather than racing it
+        with self._run_lock:
+            started_at = datetime.utcnow()
+
+            try:
+                report = sweep_overdue()
+                report["error"] = None
+            except Exception as exc:
+                report = {"marked": 0, "batches": 0, "duration_ms": None, "error": str(exc)}
+
+            report.update(trigger=trigger, started_at=started_at)
+
+        with self._lock:
+            self.runs += 1
+            self.total_marked += report["marked"]
+            if report["error"]:
+                self.failures += 1
+            self.history.appendleft(report)
+
+        return report
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.run_once("scheduled")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self.interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="overdue-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "interval_seconds": self.interval,
+                "running": bool(self._thread and self._thread.is_alive()),
+                "runs": self.runs,
+                "failures": self.failures,
+                "total_marked": self.total_marked,
+                "last_run": self.history[0] if self.history else None,
+                "history": list(self.history)
+            }
+
+
+overdue_sweeper = OverdueSweeper()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mark invoices past their due date as OVERDUE")
+    parser.add_argument("--batch-size", type=int, default=OVERDUE_SWEEP_BATCH)
+    args = parser.parse_args()
+
+    report = sweep_overdue(batch_size=args.batch_size)
+    print(f"marked={report['marked']} batches={report['batches']} duration_ms={report['duration_ms']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.config import PDF_CACHE_DIR, PDF_CACHE_MAX_BYTES
+
+
+# Bump when a template changes so every cached document re-renders
+RENDER_VERSION = 2
+
+
+# =====================================================
+# FINGERPRINT
+# =====================================================
+
+def fingerprint(kind: str, snapshot: dict) -> str:
+    """
+    Version of a document = hash of everything that is printed on it.
+    A new payment, a cancellation or an edited line changes the snapshot
+    and therefore the key; untouched documents keep theirs.
+    """
+
+    payload = json.dumps(
+        {"kind": kind, "version": RENDER_VERSION, "data": snapshot},
+        sort_keys=True,
+        default=str,
+        separators=(",", ":")
+    )
+
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# =====================================================
+# DISK CACHE (size-bounded LRU)
+# =====================================================
+
+class PdfDiskCache:
+
+    def __init__(self, directory: str = PDF_CACHE_DIR, max_bytes: int = PDF_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "not_modified": 0}
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.pdf"
+
+    def _files(self):
+        return self.directory.glob("*/*.pdf") if self.directory.exists() else []
+
+    def _current_size(self) -> int:
+        if self._size is None:
+            self._size = sum(p.stat().st_size for p in self._files())
+        return self._size
+
+    def get(self, key: str) -> Optional[bytes]:
+
+        path = self._path(key)
+
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # mtime doubles as LRU recency
+        except FileNotFoundError:
+            self.bump("misses")
+            return None
+
+        self.bump("hits")
+        return data
+
+    def put(self, key: str, data: bytes):
+
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Atomic publish: readers see the whole file or nothing
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+        with self._lock:
+            self._size = self._current_size() + len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Oldest-used first until 90% of the budget is free again
+        target = int(self.max_bytes * 0.9)
+        entries = []
+        for path in self._files():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort(key=lambda e: e[0])
+
+        size = sum(e[1] for e in entries)
+
+        for _, file_size, path in entries:
+            if size <= target:
+                break
+            try:
+                path.unlink()
+                size -= file_size
+                self.counters["evictions"] += 1
+            except FileNotFoundError:
+                pass
+
+        self._size = size
+
+    def bump(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self.counters,
+                "size_bytes": self._current_size(),
+                "max_bytes": self.max_bytes
+            }
+
+
+pdf_cache = PdfDiskCache()
+
+
+# =====================================================
+# HTTP (ETag / If-None-Match)
+# =====================================================
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [c.strip() for c in header.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+def cached_pdf_response(
+    request: Request,
+    kind: str,
+    snapshot: dict,
+    filename: str,
+    render: Callable[[str, dict], bytes]
+) -> Response:
+
+    key = fingerprint(kind, snapshot)
+    etag = f'"{key}"'
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache"
+    }
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        pdf_cache.bump("not_modified")
+        return Response(status_code=304, headers=headers)
+
+    pdf = pdf_cache.get(key)
+
+    if pdf is None:
+        pdf = render(kind, snapshot)
+        pdf_cache.put(key, pdf)
+
+    headers["Content-Disposition"] = f'inline; filename="{filename}"'
+
+    return Response(content=pdf, media_type="application/pdf", headers=headers)
@@ -0,0 +1,194 @@
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from fastapi import HTTPException
+
+from app.config import (
+    PDF_RENDER_MAX_PENDING, PDF_RENDER_RETRY_AFTER,
+    PDF_RENDER_TIMEOUT, PDF_RENDER_WORKERS
+)
+
+
+# =====================================================
+# WORKER SIDE
+# =====================================================
+
+def _renderer(kind: str):
+    # Imported inside the worker so the API process never pays for it
+    if kind == "invoice":
+        from app.utils.pdf_generator import generate_invoice_pdf
+        return generate_invoice_pdf
+    if kind == "voucher":
+        from app.utils.payment_voucher_generator import generate_payment_voucher_pdf
+        return generate_payment_voucher_pdf
+    if kind == "quotation":
+        from app.utils.pdf_generator import generate_quotation_pdf
+        return generate_quotation_pdf
+    if kind == "profit":
+        from app.utils.pdf_generator import generate_profit_pdf
+        return generate_profit_pdf
+    if kind == "statement":
+        from app.utils.pdf_generator import generate_statement_pdf
+        return generate_statement_pdf
+    raise ValueError(f"Unknown document type: {kind}")
+
+
+def render_document(kind: str, snapshot: dict):
+    """Render one document from its snapshot. Returns (pdf_bytes, seconds)."""
+
+    started = time.perf_counter()
+    buffer = _renderer(kind)(snapshot)
+    return buffer.getvalue(), time.perf_counter() - started
+
+
+# =====================================================
+# API SIDE
+# =====================================================
+
+class PdfRenderService:
+    """
+    Bounded process pool for ReportLab layout.
+
+    At most `max_pending` documents may be queued or rendering; beyond
+    that callers get 503 + Retry-After instead of piling up threads.
+    """
+
+    def __init__(
+        self,
+        workers: int = PDF_RENDER_WORKERS,
+        max_pending: int = PDF_RENDER_MAX_PENDING,
+        timeout: float = PDF_RENDER_TIMEOUT,
+        retry_after: int = PDF_RENDER_RETRY_AFTER
+    ):
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.timeout = timeout
+        self.retry_after = retry_after
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+
+        self._pending = 0
+        self._counters = {"rendered": 0, "rejected": 0, "failed": 0, "timed_out": 0}
+        self._render_times = deque(maxlen=1000)
+        self._total_times = deque(maxlen=1000)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: never fork a process that holds DB sockets/threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _reset_pool(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _busy(self, detail: str):
+        return HTTPException(
+            status_code=503,
+            detail=detail,
+            headers={"Retry-After": str(self.retry_after)}
+        )
+
+    def _release(self, future=None):
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def render(self, kind: str, snapshot: dict) -> bytes:
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._counters["rejected"] += 1
+            raise self._busy("PDF renderer is busy, try again shortly")
+
+        started = time.perf_counter()
+
+        with self._lock:
+            self._pending += 1
+
+        try:
+            future = self._pool().submit(render_document, kind, snapshot)
+        except BaseException:
+            self._release()
+            raise
+
+        # The slot is held until the job itself finishes (or is cancelled
+        # while still queued), not until this caller stops waiting: a
+        # timed-out render keeps its worker busy and must keep counting
+        # against max_pending
+        future.add_done_callback(self._release)
+
+        try:
+            pdf, render_seconds = future.result(timeout=self.timeout)
+
+        except FutureTimeout:
+            future.cancel()
+            with self._lock:
+                self._counters["timed_out"] += 1
+            raise self._busy("PDF rendering timed out")
+
+        except BrokenProcessPool:
+            self._reset_pool()
+            with self._lock:
+                self._counters["failed"] += 1
+            raise self._busy("PDF renderer restarted, try again")
+
+        except Exception:
+            with self._lock:
+                self._counters["failed"] += 1
+            raise
+
+        with self._lock:
+            self._counters["rendered"] += 1
+            self._render_times.append(render_seconds)
+            self._total_times.append(time.perf_counter() - started)
+
+        return pdf
+
+    def shutdown(self):
+        self._reset_pool()
+
+    def metrics(self) -> dict:
+
+        def summary(samples):
+            if not samples:
+                return {"count": 0}
+            ordered = sorted(samples)
+            return {
+                "count": len(ordered),
+                "avg_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+                "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2),
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+                "max_ms": round(ordered[-1] * 1000, 2)
+            }
+
+        with self._lock:
+            render_times = list(self._render_times)
+            total_times = list(self._total_times)
+            counters = dict(self._counters)
+            pending = self._pending
+
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": pending,
+            **counters,
+            "render_time": summary(render_times),        # layout only
+            "request_time": summary(total_times)         # queue wait + layout
+        }
+
+
+pdf_renderer = PdfRenderService()
@@ -1,7 +1,12 @@
+from datetime import date
 from decimal import Decimal
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from app import models
+from app.services.lookups import load_by_ids
+from app.config import BASE_CURRENCY
+from app.services.rate_resolver import rate_index
 
 
 def create_quotation(db: Session, quotation_data):
@@ -36,32 +41,43 @@ def create_quotation(db: Session, quotation_data):
     grand_selling_total = Decimal("0")
 
     # -----------------------------
-    # Process Each Item
+    # Batched Lookups
     # -----------------------------
-    for item in quotation_data.items:
-
-        service = db.query(models.Service).filter(
-            models.Service.id == item.service_id
-        ).first()
+    services = load_by_ids(
+        db, models.Service, (item.service_id for item in quotation_data.items)
+    )
 
-        if not service:
+    for item in quotation_data.items:
+        if item.service_id not in services:
             raise HTTPException(
                 status_code=404,
                 detail=f"Service ID {item.service_id} not found"
             )
 
-        # Get latest valid rate
-        rate = db.query(models.ServiceRate).filter(
-            models.ServiceRate.service_id == service.id
-        ).first()
+    # Rate valid on the travel date (cheapest vendor), all lines at once
+    travel_date = quotation_data.travel_date or date.today()
+
+    resolved = rate_index.resolve_many(
+        db, [(item.service_id, None, travel_date) for item in quotation_data.items],
+        currency=BASE_CURRENCY
+    )
+
+    # -----------------------------
+    # Process Each Item
+    # -----------------------------
+    item_rows = []
+
+    for item, rate in zip(quotation_data.items, resolved):
+
+        service = services[item.service_id]
 
         if not rate:
             raise HTTPException(
                 status_code=404,
-                detail=f"No rate found for service ID {service.id}"
+                detail=f"No {BASE_CURRENCY} rate valid on {travel_date} for service ID {service.id}"
             )
 
-        cost = Decimal(str(rate.cost))
+        cost = Decimal(str(rate.cost_price))
         margin_percent = Decimal(str(item.margin_percent))
         units = item.units
 
@@ -69,29 +85,29 @@ def create_quotation(db: Session, quotation_data):
 
         total_net = cost * units
         total_selling = selling_price * units
-        profit = total_selling - total_net
 
         grand_net_total += total_net
         grand_selling_total += total_selling
 
-        # -----------------------------
-        # SAVE QUOTATION ITEM
-        # -----------------------------
-        quotation_item = models.QuotationItem(
-            quotation_id=quotation.id,
-            service_id=service.id,
-            service_name=service.name,
-            supplier_name=None,  # You can enhance later
-            cost=cost,
-            selling_price=selling_price,
-            margin_percent=margin_percent,
-            units=units,
-            total_net=total_net,
-            total_selling=total_selling,
-            profit=profit
-        )
-
-        db.add(quotation_item)
+        # Keys must be QuotationItem columns: insert() drops unknown ones
+        item_rows.append({
+            "quotation_id": quotation.id,
+            "service_id": service.id,
+            "vendor_id": rate.vendor_id,
+            "quantity": units,
+            "start_date": travel_date,
+            "manual_margin_percentage": float(margin_percent),
+            "cost_price": float(cost),
+            "sell_price": float(selling_price),
+            "total_cost": float(total_net),
+            "total_sell": float(total_selling)
+        })
+
+    # -----------------------------
+    # SAVE QUOTATION ITEMS (single multi-row INSERT)
+    # -----------------------------
+    if item_rows:
+        db.execute(insert(models.QuotationItem), item_rows)
 
     # -----------------------------
     # Apply Discount
@@ -0,0 +1,253 @@
+import time
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.services.quotation_totals import recompute_totals
+
+
+# =====================================================
+# WHAT-IF REPRICING OF OPEN QUOTATIONS
+# =====================================================
+# Every line of the affected quotations is loaded with one SELECT into
+# columnar arrays, then for all lines at once:
+#
+#   cost'   = cost * (1 + Σ percent / 100) + Σ amount   (matching changes)
+#   markup  = manual margin if set and kept
+#             else the new default margin if one is given
+#             else the line's current markup (sell / cost - 1)
+#   sell'   = cost' * (1 + markup / 100)
+#
+# Only lines a change matches, or that take the new default margin, are
+# repriced; every other line keeps its stored cost and sell (a zero-cost
+# line has no markup to carry over).
+#
+# Per-quotation sums are bincounts over the factorized quotation ids.
+# Nothing is written unless apply=True, which locks the lines, bulk-
+# updates the changed ones by primary key, stores a new default margin
+# on the quotations and recomputes their totals.
+
+OPEN_STATUSES = (models.QuotationStatus.DRAFT, models.QuotationStatus.SENT)
+
+
+def _load_lines(db: Session, statuses, quotation_ids: Optional[List[int]], lock: bool = False) -> pd.DataFrame:
+
+    Q = models.Quotation
+    QI = models.QuotationItem
+
+    stmt = (
+        select(
+            QI.id, QI.quotation_id, QI.service_id, QI.vendor_id,
+            QI.quantity, QI.cost_price, QI.sell_price, QI.manual_margin_percentage
+        )
+        .join(Q, Q.id == QI.quotation_id)
+        .where(Q.status.in_(statuses))
+    )
+
+    if quotation_ids:
+        stmt = stmt.where(Q.id.in_(quotation_ids))
+
+    # Applying: hold the lines (and their quotations) until the commit so
+    # a concurrent edit cannot be overwritten with prices computed from
+    # what it replaced
+    if lock:
+        stmt = stmt.with_for_update()
+
+    return pd.DataFrame(
+        db.execute(stmt).all(),
+        columns=[
+            "id", "quotation_id", "service_id", "vendor_id",
+            "quantity", "cost_price", "sell_price", "manual_margin"
+        ]
+    )
+
+
+def _numeric(frame: pd.DataFrame, column: str, default: float) -> np.ndarray:
+    return pd.to_numeric(frame[column], errors="coerce").fillna(default).to_numpy(dtype=float)
+
+
+def _ids(frame: pd.DataFrame, column: str) -> np.ndarray:
+    return pd.to_numeric(frame[column], errors="coerce").fillna(-1).to_numpy(dtype=np.int64)
+
+
+def simulate(
+    db: Session,
+    cost_changes: Optional[List[dict]] = None,
+    margin_percentage: Optional[float] = None,
+    override_manual_margins: bool = False,
+    statuses=OPEN_STATUSES,
+    quotation_ids: Optional[List[int]] = None,
+    apply: bool = False
+) -> dict:
+    """
+    cost_changes: dicts with optional vendor_id / service_id (both None
+    means every line) and percent / amount. Changes matching the same
+    line add up.
+    """
+
+    started = time.perf_counter()
+
+    frame = _load_lines(db, statuses, quotation_ids, lock=apply)
+    loaded_ms = (time.perf_counter() - started) * 1000
+
+    n = len(frame)
+
+    quantity = _numeric(frame, "quantity", 1)
+    cost = _numeric(frame, "cost_price", 0)
+    sell = _numeric(frame, "sell_price", 0)
+    manual = pd.to_numeric(frame["manual_margin"], errors="coerce").to_numpy(dtype=float)
+    vendor = _ids(frame, "vendor_id")
+    service = _ids(frame, "service_id")
+
+    # ---- cost changes ---------------------------------------------------
+    percent = np.zeros(n)
+    amount = np.zeros(n)
+    hit = np.zeros(n, dtype=bool)
+    matched = np.zeros(len(cost_changes or []), dtype=np.int64)
+
+    for j, change in enumerate(cost_changes or []):
+        mask = np.ones(n, dtype=bool)
+        if change.get("vendor_id") is not None:
+            mask &= vendor == change["vendor_id"]
+        if change.get("service_id") is not None:
+            mask &= service == change["service_id"]
+
+        percent += mask * (change.get("percent") or 0)
+        amount += mask * (change.get("amount") or 0)
+        hit |= mask
+        matched[j] = mask.sum()
+
+    new_cost = np.where(hit, cost * (1 + percent / 100) + amount, cost)
+
+    # ---- margins --------------------------------------------------------
+    with np.errstate(divide="ignore", invalid="ignore"):
+        current_markup = np.where(cost != 0, (sell / cost - 1) * 100, 0.0)
+
+    markup = current_markup
+    repriced = hit
+    if margin_percentage is not None:
+        markup = np.full(n, float(margin_percentage))
+        repriced = hit | override_manual_margins | np.isnan(manual)
+    if not override_manual_margins:
+        markup = np.where(np.isnan(manual), markup, manual)
+
+    new_sell = np.where(repriced, new_cost * (1 + markup / 100), sell)
+
+    old_total_cost = cost * quantity
+    old_total_sell = sell * quantity
+    new_total_cost = new_cost * quantity
+    new_total_sell = new_sell * quantity
+
+    changed = repriced & ~(np.isclose(new_cost, cost, atol=0.005) & np.isclose(new_sell, sell, atol=0.005))
+
+    # ---- per quotation --------------------------------------------------
+    codes, quotations = pd.factorize(frame["quotation_id"], sort=True)
+    size = len(quotations)
+
+    def per_quotation(values):
+        return np.bincount(codes, weights=values, minlength=size)
+
+    q_old_cost = per_quotation(old_total_cost)
+    q_old_sell = per_quotation(old_total_sell)
+    q_new_cost = per_quotation(new_total_cost)
+    q_new_sell = per_quotation(new_total_sell)
+    q_changed = np.bincount(codes, weights=changed, minlength=size).astype(int)
+
+    q_old_profit = q_old_sell - q_old_cost
+    q_new_profit = q_new_sell - q_new_cost
+
+    touched = np.flatnonzero(q_changed)
+    touched = touched[np.argsort(q_new_profit[touched] - q_old_profit[touched], kind="stable")]
+    touched_ids = quotations.to_numpy()[touched].tolist()
+
+    numbers = dict(db.execute(
+        select(models.Quotation.id, models.Quotation.quotation_number)
+        .where(models.Quotation.id.in_(touched_ids))
+    ).all()) if touched_ids else {}
+
+    rows = [
+        {
+            "quotation_id": quotation_id,
+            "quotation_number": numbers.get(quotation_id),
+            "lines_changed": int(q_changed[k]),
+            "old_cost": round(float(q_old_cost[k]), 2),
+            "new_cost": round(float(q_new_cost[k]), 2),
+            "old_sell": round(float(q_old_sell[k]), 2),
+            "new_sell": round(float(q_new_sell[k]), 2),
+            "old_profit": round(float(q_old_profit[k]), 2),
+            "new_profit": round(float(q_new_profit[k]), 2),
+            "profit_delta": round(float(q_new_profit[k] - q_old_profit[k]), 2)
+        }
+        for k, quotation_id in zip(touched, touched_ids)
+    ]
+
+    old_cost_sum, new_cost_sum = float(old_total_cost.sum()), float(new_total_cost.sum())
+    old_sell_sum, new_sell_sum = float(old_total_sell.sum()), float(new_total_sell.sum())
+
+    # ---- apply ----------------------------------------------------------
+    updated = 0
+    if apply:
+        idx = np.flatnonzero(changed)
+
+        if len(idx):
+            db.execute(
+                update(models.QuotationItem),
+                [
+                    {
+                        "id": int(item_id),
+                        "cost_price": c,
+                        "sell_price": s,
+                        "total_cost": tc,
+                        "total_sell": ts
+                    }
+                    for item_id, c, s, tc, ts in zip(
+                        frame["id"].to_numpy()[idx],
+                        np.round(new_cost[idx], 2).tolist(),
+                        np.round(new_sell[idx], 2).tolist(),
+                        np.round(new_total_cost[idx], 2).tolist(),
+                        np.round(new_total_sell[idx], 2).tolist()
+                    )
+                ]
+            )
+
+        if margin_percentage is not None:
+            # New default for lines added later; totals keep it as is
+            db.execute(
+                update(models.Quotation)
+                .where(models.Quotation.id.in_(quotations.to_numpy().tolist()))
+                .values(margin_percentage=float(margin_percentage))
+                .execution_options(synchronize_session=False)
+            )
+            recompute_totals(db, touched_ids, update_margin=False)
+        else:
+            recompute_totals(db, touched_ids)
+
+        db.commit()
+
+        updated = len(idx)
+
+    return {
+        "applied": bool(apply),
+        "lines": n,
+        "lines_changed": int(changed.sum()),
+        "lines_updated": updated,
+        "quotations": size,
+        "quotations_changed": len(rows),
+        "changes_matched": matched.tolist(),
+        "totals": {
+            "old_cost": round(old_cost_sum, 2),
+            "new_cost": round(new_cost_sum, 2),
+            "old_sell": round(old_sell_sum, 2),
+            "new_sell": round(new_sell_sum, 2),
+            "old_profit": round(old_sell_sum - old_cost_sum, 2),
+            "new_profit": round(new_sell_sum - new_cost_sum, 2),
+            "profit_delta": round((new_sell_sum - new_cost_sum) - (old_sell_sum - old_cost_sum), 2)
+        },
+        "by_quotation": rows,
+        "load_ms": round(loaded_ms, 2),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
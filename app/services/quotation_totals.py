@@ -0,0 +1,207 @@
+import argparse
+from typing import Iterable, List, Optional
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session, aliased
+
+from app import models
+from app.database import SessionLocal
+
+
+# =====================================================
+# ATOMIC DELTA (single item insert / update / delete)
+# =====================================================
+
+def apply_item_delta(
+    db: Session,
+    quotation_id: int,
+    cost_delta: float,
+    sell_delta: float
+):
+    """
+    Shift a quotation's totals by one item's contribution with a single
+    UPDATE. Postgres evaluates every SET expression against the old row,
+    so concurrent writers serialize on the row lock instead of losing
+    each other's lines. Runs in the caller's transaction.
+    """
+
+    Q = models.Quotation
+
+    new_cost = func.coalesce(Q.total_cost, 0) + cost_delta
+    new_sell = func.coalesce(Q.total_sell, 0) + sell_delta
+
+    db.execute(
+        update(Q)
+        .where(Q.id == quotation_id)
+        .values(
+            total_cost=new_cost,
+            total_sell=new_sell,
+            total_profit=new_sell - new_cost,
+            margin_percentage=case(
+                (new_cost > 0, (new_sell - new_cost) / new_cost * 100),
+                else_=Q.margin_percentage
+            )
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+# =====================================================
+# SET-BASED RECOMPUTE
+# =====================================================
+
+def recompute_totals(
+    db: Session,
+    quotation_ids: Optional[Iterable[int]] = None,
+    update_margin: bool = True
+) -> int:
+    """
+    Recompute totals from quotation_items with one UPDATE ... FROM over a
+    grouped aggregate. `quotation_ids=None` means every quotation.
+    Returns rows touched.
+    """
+
+    Q = models.Quotation
+    QI = models.QuotationItem
+    target = aliased(Q)
+
+    sums = (
+        select(
+            target.id.label("quotation_id"),
+            func.coalesce(func.sum(QI.total_cost), 0).label("cost"),
+            func.coalesce(func.sum(QI.total_sell), 0).label("sell")
+        )
+        .outerjoin(QI, QI.quotation_id == target.id)
+        .group_by(target.id)
+    )
+
+    if quotation_ids is not None:
+        ids = list(set(quotation_ids))
+        if not ids:
+            return 0
+        sums = sums.where(target.id.in_(ids))
+
+    sums = sums.subquery()
+
+    values = {
+        "total_cost": sums.c.cost,
+        "total_sell": sums.c.sell,
+        "total_profit": sums.c.sell - sums.c.cost
+    }
+
+    if update_margin:
+        values["margin_percentage"] = case(
+            (sums.c.cost > 0, (sums.c.sell - sums.c.cost) / sums.c.cost * 100),
+            else_=Q.margin_percentage
+        )
+
+    result = db.execute(
+        update(Q)
+        .where(Q.id == sums.c.quotation_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+    return result.rowcount
+
+
+# =====================================================
+# CONSISTENCY CHECK
+# =====================================================
+
+def find_total_drift(db: Session, tolerance: float = 0.01) -> List[dict]:
+    """Quotations whose stored totals disagree with their items."""
+
+    Q = models.Quotation
+    QI = models.QuotationItem
+
+    sums = (
+        select(
+            QI.quotation_id.label("quotation_id"),
+            func.sum(QI.total_cost).label("cost"),
+            func.sum(QI.total_sell).label("sell")
+        )
+        .group_by(QI.quotation_id)
+        .subquery()
+    )
+
+    actual_cost = func.coalesce(sums.c.cost, 0)
+    actual_sell = func.coalesce(sums.c.sell, 0)
+    stored_cost = func.coalesce(Q.total_cost, 0)
+    stored_sell = func.coalesce(Q.total_sell, 0)
+
+    rows = db.execute(
+        select(
+            Q.id,
+            Q.quotation_number,
+            stored_cost.label("stored_cost"),
+            actual_cost.label("actual_cost"),
+            stored_sell.label("stored_sell"),
+            actual_sell.label("actual_sell")
+        )
+        .outerjoin(sums, sums.c.quotation_id == Q.id)
+        .where(
+            (func.abs(stored_cost - actual_cost) > tolerance)
+            | (func.abs(stored_sell - actual_sell) > tolerance)
+        )
+        .order_by(Q.id)
+    ).all()
+
+    return [
+        {
+            "quotation_id": r.id,
+            "quotation_number": r.quotation_number,
+            "stored_cost": float(r.stored_cost),
+            "actual_cost": float(r.actual_cost),
+            "stored_sell": float(r.stored_sell),
+            "actual_sell": float(r.actual_sell)
+        }
+        for r in rows
+    ]
+
+
+def check_totals(db: Session, fix: bool = False, tolerance: float = 0.01) -> dict:
+
+    drift = find_total_drift(db, tolerance)
+    fixed = 0
+
+    if fix and drift:
+        fixed = recompute_totals(
+            db,
+            [d["quotation_id"] for d in drift],
+            update_margin=False
+        )
+        db.commit()
+
+    return {
+        "drifted": len(drift),
+        "fixed": fixed,
+        "quotations": drift
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report (and optionally fix) quotation total drift"
+    )
+    parser.add_argument("--fix", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.01)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        report = check_totals(db, fix=args.fix, tolerance=args.tolerance)
+    finally:
+        db.close()
+
+    for d in report["quotations"]:
+        print(
+            f"{d['quotation_number']}: cost {d['stored_cost']:.2f} -> {d['actual_cost']:.2f}, "
+            f"sell {d['stored_sell']:.2f} -> {d['actual_sell']:.2f}"
+        )
+
+    print(f"drifted={report['drifted']} fixed={report['fixed']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict, defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import RATE_INDEX_MAX_SERVICES, RATE_INDEX_TTL
+from app.services import commit_hooks
+
+
+# =====================================================
+# SERVICE RATE INTERVAL INDEX
+# =====================================================
+# Per process, per service: for every vendor the rates sorted by
+# valid_from, with
+#
+#   starts[i]    valid_from of rate i
+#   reach[i]     max(valid_to) over rates 0..i (running max)
+#
+# The rate valid on day d is found by bisecting `starts` for the last
+# rate starting on or before d. With non-overlapping windows (what the
+# rate-sheet import enforces) that rate either covers d or nothing does:
+# O(log n). Legacy overlapping rows are still answered correctly by
+# stepping back while reach[i] >= d; the latest-starting match wins.
+#
+# Services are loaded on first use (one IN query per batch of misses)
+# and kept LRU-bounded. A commit touching service_rates drops the index;
+# RATE_INDEX_TTL bounds staleness for writes made by other processes.
+
+OPEN_END = date.max
+
+
+class ResolvedRate(NamedTuple):
+    rate_id: int
+    service_id: int
+    vendor_id: Optional[int]
+    valid_from: Optional[date]
+    valid_to: Optional[date]
+    cost_price: float
+    currency: Optional[str]
+
+
+class _VendorRates:
+
+    __slots__ = ("starts", "reach", "rates")
+
+    def __init__(self, rates: List[ResolvedRate]):
+        rates.sort(key=lambda r: (r.valid_from or date.min, r.rate_id))
+        self.rates = rates
+        self.starts = [r.valid_from or date.min for r in rates]
+
+        self.reach = []
+        furthest = date.min
+        for r in rates:
+            furthest = max(furthest, r.valid_to or OPEN_END)
+            self.reach.append(furthest)
+
+    def at(self, day: date) -> Optional[ResolvedRate]:
+        i = bisect_right(self.starts, day) - 1
+        while i >= 0 and self.reach[i] >= day:
+            rate = self.rates[i]
+            if (rate.valid_to or OPEN_END) >= day:
+                return rate
+            i -= 1
+        return None
+
+
+class RateIndex:
+
+    def __init__(self, ttl: float = RATE_INDEX_TTL, max_services: int = RATE_INDEX_MAX_SERVICES):
+        self.ttl = ttl
+        self.max_services = max_services
+        self._services: "OrderedDict[int, Tuple[float, Dict[Optional[int], _VendorRates]]]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "loads": 0, "services_loaded": 0, "invalidations": 0}
+
+    # ---------------------------------------------
+    # cache maintenance
+    # ---------------------------------------------
+
+    def invalidate(self, tables=None):
+        with self._lock:
+            self._services.clear()
+            self._generation += 1
+            self.counters["invalidations"] += 1
+
+    def _cached(self, service_ids: Iterable[int]) -> Tuple[dict, set, int]:
+        now = time.monotonic()
+        found, missing = {}, set()
+
+        with self._lock:
+            for sid in service_ids:
+                entry = self._services.get(sid)
+                if entry and now - entry[0] < self.ttl:
+                    self._services.move_to_end(sid)
+                    found[sid] = entry[1]
+                else:
+                    missing.add(sid)
+            self.counters["hits"] += len(found)
+            return found, missing, self._generation
+
+    def _load(self, db: Session, service_ids: set) -> Dict[int, Dict[Optional[int], _VendorRates]]:
+
+        R = models.ServiceRate
+
+        grouped = defaultdict(lambda: defaultdict(list))
+
+        for row in db.execute(
+            select(R.id, R.service_id, R.vendor_id, R.valid_from, R.valid_to, R.cost_price, R.currency)
+            .where(R.service_id.in_(service_ids))
+        ):
+            grouped[row.service_id][row.vendor_id].append(ResolvedRate(
+                row.id, row.service_id, row.vendor_id,
+                row.valid_from, row.valid_to,
+                float(row.cost_price or 0), row.currency
+            ))
+
+        # Services without any rate are cached too (as empty)
+        return {
+            sid: {vendor: _VendorRates(rates) for vendor, rates in grouped.get(sid, {}).items()}
+            for sid in service_ids
+        }
+
+    def _services_for(self, db: Session, service_ids: Iterable[int]) -> dict:
+
+        found, missing, generation = self._cached(set(service_ids))
+
+        if missing:
+            loaded = self._load(db, missing)
+            found.update(loaded)
+
+            with self._lock:
+                self.counters["loads"] += 1
+                self.counters["services_loaded"] += len(loaded)
+
+                # A commit landed while loading: serve this call, do not keep it
+                if self._generation == generation:
+                    now = time.monotonic()
+                    for sid, vendors in loaded.items():
+                        self._services[sid] = (now, vendors)
+                        self._services.move_to_end(sid)
+                    while len(self._services) > self.max_services:
+                        self._services.popitem(last=False)
+
+        return found
+
+    # ---------------------------------------------
+    # lookups
+    # ---------------------------------------------
+
+    @staticmethod
+    def _pick(
+        vendors: Dict[Optional[int], _VendorRates],
+        day: date,
+        vendor_id: Optional[int],
+        currency: Optional[str] = None
+    ):
+
+        if vendor_id is not None:
+            rates = vendors.get(vendor_id)
+            return rates.at(day) if rates else None
+
+        # No vendor asked for: cheapest vendor valid that day. Prices are
+        # only comparable within one currency; without a currency to
+        # compare in, vendors quoting in several currencies give no answer.
+        candidates = [rate for rate in (r.at(day) for r in vendors.values()) if rate]
+
+        if currency:
+            candidates = [r for r in candidates if (r.currency or "").upper() == currency.upper()]
+        elif len({(r.currency or "").upper() for r in candidates}) > 1:
+            return None
+
+        return min(candidates, key=lambda r: (r.cost_price, r.rate_id), default=None)
+
+    def resolve_many(
+        self,
+        db: Session,
+        requests: Sequence[Tuple[int, Optional[int], date]],
+        currency: Optional[str] = None
+    ) -> List[Optional[ResolvedRate]]:
+        """
+        (service_id, vendor_id or None, day) → rate valid that day, in order.
+        `currency` restricts the cheapest-vendor choice to rates in it.
+        """
+
+        services = self._services_for(db, {service_id for service_id, _, _ in requests})
+
+        return [
+            self._pick(services.get(service_id, {}), day, vendor_id, currency)
+            for service_id, vendor_id, day in requests
+        ]
+
+    def resolve(
+        self,
+        db: Session,
+        service_id: int,
+        day: date,
+        vendor_id: Optional[int] = None,
+        currency: Optional[str] = None
+    ) -> Optional[ResolvedRate]:
+        return self.resolve_many(db, [(service_id, vendor_id, day)], currency)[0]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self.counters,
+                "services_cached": len(self._services),
+                "max_services": self.max_services,
+                "ttl_seconds": self.ttl
+            }
+
+
+rate_index = RateIndex()
+
+commit_hooks.subscribe({"service_rates"}, rate_index.invalidate)
+
+
+# =====================================================
+# QUOTATION LINES
+# =====================================================
+
+def resolve_quotation_items(db: Session, quotation_id: int) -> List[dict]:
+    """Rate valid at each line's start date, every line in one pass."""
+
+    QI = models.QuotationItem
+
+    items = db.execute(
+        select(QI.id, QI.service_id, QI.vendor_id, QI.start_date, QI.cost_price)
+        .where(QI.quotation_id == quotation_id, QI.service_id.isnot(None))
+        .order_by(QI.id)
+    ).all()
+
+    resolved = rate_index.resolve_many(
+        db, [(i.service_id, i.vendor_id, i.start_date or date.today()) for i in items]
+    )
+
+    return [
+        {
+            "item_id": item.id,
+            "service_id": item.service_id,
+            "vendor_id": item.vendor_id,
+            "date": item.start_date,
+            "current_cost_price": item.cost_price,
+            "rate": rate._asdict() if rate else None
+        }
+        for item, rate in zip(items, resolved)
+    ]
@@ -0,0 +1,453 @@
+import io
+import time
+from datetime import date
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from app import models
+
+
+# =====================================================
+# RATE SHEET PARSING
+# =====================================================
+# One row per rate:
+#
+#   service (id or name) | city (optional) | vendor (id or name)
+#   | valid_from | valid_to (blank = open ended) | cost_price | currency
+#
+# Each row becomes exactly one of:
+#
+#   insert      no current rate of the (service, vendor) overlaps it
+#   update      a current rate has the same window; price/currency change
+#   unchanged   a current rate has the same window and price
+#   replace     overlaps current rates (on_overlap=replace); those are
+#               trimmed or split around the new window, and removed only
+#               when the new windows cover them completely
+#   duplicate   repeats an earlier row of the sheet
+#   error       unreadable, or overlaps a sheet row / current rate
+
+COLUMN_ALIASES = {
+    "service": ["service_id", "service", "service_name"],
+    "city": ["city", "city_name"],
+    "vendor": ["vendor_id", "vendor", "vendor_name"],
+    "valid_from": ["valid_from", "from", "start_date", "date_from"],
+    "valid_to": ["valid_to", "to", "end_date", "date_to"],
+    "cost_price": ["cost_price", "cost", "rate", "net_rate", "price"],
+    "currency": ["currency", "ccy"],
+}
+
+EXCEL_SUFFIXES = (".xlsx", ".xlsm", ".xls")
+
+# Open-ended windows compare as if they ended on this day
+OPEN_END = pd.Timestamp("2262-04-11")
+
+PAIR = ["service_id", "vendor_id"]
+
+
+def _key(series: pd.Series) -> pd.Series:
+    return series.fillna("").astype(str).str.strip().str.casefold()
+
+
+def _pick(frame: pd.DataFrame, logical: str) -> Optional[str]:
+    for name in COLUMN_ALIASES[logical]:
+        if name in frame.columns:
+            return name
+    return None
+
+
+def _fail(rows: pd.DataFrame, mask: pd.Series, reason):
+    # First error wins, later checks do not overwrite it
+    mask = mask & rows["error"].isna()
+    rows.loc[mask, "error"] = reason[mask] if isinstance(reason, pd.Series) else reason
+
+
+def read_rate_sheet(raw: bytes, filename: str, currency: str, dayfirst: bool = True) -> pd.DataFrame:
+
+    try:
+        if filename.lower().endswith(EXCEL_SUFFIXES):
+            frame = pd.read_excel(io.BytesIO(raw), dtype=str)
+        else:
+            frame = pd.read_csv(io.BytesIO(raw), dtype=str, skipinitialspace=True)
+    except ImportError:
+        raise HTTPException(status_code=400, detail="Excel upload needs openpyxl installed; upload CSV instead")
+    except (ValueError, pd.errors.ParserError) as exc:
+        raise HTTPException(status_code=400, detail=f"Could not read rate sheet: {exc}")
+
+    frame.columns = (
+        frame.columns.astype(str).str.strip().str.lower().str.replace(r"[^a-z0-9]+", "_", regex=True)
+    )
+
+    columns = {logical: _pick(frame, logical) for logical in COLUMN_ALIASES}
+
+    missing = [c for c in ("service", "vendor", "valid_from", "cost_price") if not columns[c]]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Missing column(s): {', '.join(missing)}")
+
+    def text(logical):
+        column = columns[logical]
+        return frame[column].fillna("").astype(str).str.strip() if column else pd.Series("", index=frame.index)
+
+    out = pd.DataFrame({"row": frame.index + 2})   # +1 header, +1 one-based
+
+    out["service"] = text("service")
+    out["city"] = text("city")
+    out["vendor"] = text("vendor")
+
+    out["valid_from"] = pd.to_datetime(text("valid_from"), errors="coerce", dayfirst=dayfirst)
+    out["valid_to"] = pd.to_datetime(text("valid_to"), errors="coerce", dayfirst=dayfirst)
+    out["to_given"] = text("valid_to") != ""
+
+    out["cost_price"] = pd.to_numeric(
+        text("cost_price").str.replace(r"[^0-9.\-]", "", regex=True), errors="coerce"
+    ).round(2)
+
+    out["currency"] = text("currency").str.upper().replace("", currency.upper())
+
+    out["error"] = None
+
+    _fail(out, out["valid_from"].isna(), "valid_from is not a date")
+    _fail(out, out["to_given"] & out["valid_to"].isna(), "valid_to is not a date")
+    _fail(out, out["valid_to"].notna() & (out["valid_to"] < out["valid_from"]), "valid_to is before valid_from")
+    _fail(out, out["cost_price"].isna() | (out["cost_price"] < 0), "cost_price must be a non-negative number")
+
+    out["end"] = out["valid_to"].fillna(OPEN_END)
+
+    return out
+
+
+# =====================================================
+# VECTORIZED RESOLUTION
+# =====================================================
+
+def _resolve(db: Session, rows: pd.DataFrame):
+    """Fill service_id / vendor_id from ids or names."""
+
+    S = models.Service
+    C = models.City
+    V = models.Vendor
+
+    services = pd.DataFrame(
+        db.execute(select(S.id, S.name, C.name).outerjoin(C, C.id == S.city_id)).all(),
+        columns=["service_id", "name", "city"]
+    )
+    services["name_key"] = _key(services["name"])
+    services["city_key"] = _key(services["city"])
+
+    vendors = pd.DataFrame(db.execute(select(V.id, V.name)).all(), columns=["vendor_id", "name"])
+    vendors["name_key"] = _key(vendors["name"])
+
+    # ---- service: id, name + city, or a name unique across cities ------
+    as_id = pd.to_numeric(rows["service"], errors="coerce")
+    service_id = as_id.where(as_id.isin(services["service_id"]))
+
+    by_pair = services.drop_duplicates(["name_key", "city_key"], keep=False)
+    paired = rows.assign(name_key=_key(rows["service"]), city_key=_key(rows["city"]))[
+        ["name_key", "city_key"]
+    ].merge(by_pair, on=["name_key", "city_key"], how="left")["service_id"].set_axis(rows.index)
+
+    unique = services.drop_duplicates("name_key", keep=False).set_index("name_key")["service_id"]
+    by_name = _key(rows["service"]).map(unique)
+
+    has_city = rows["city"] != ""
+    service_id = service_id.fillna(paired.where(has_city)).fillna(by_name.where(~has_city))
+
+    rows["service_id"] = service_id.astype("Int64")
+    _fail(rows, rows["service_id"].isna(), "service not found or ambiguous (add a city column)")
+
+    # ---- vendor: id or unique name -------------------------------------
+    as_id = pd.to_numeric(rows["vendor"], errors="coerce")
+    vendor_id = as_id.where(as_id.isin(vendors["vendor_id"]))
+
+    unique = vendors.drop_duplicates("name_key", keep=False).set_index("name_key")["vendor_id"]
+    rows["vendor_id"] = vendor_id.fillna(_key(rows["vendor"]).map(unique)).astype("Int64")
+    _fail(rows, rows["vendor_id"].isna(), "vendor not found or ambiguous")
+
+
+# =====================================================
+# OVERLAP DETECTION
+# =====================================================
+
+def _sheet_overlaps(rows: pd.DataFrame):
+    """
+    Sort each (service, vendor) by start; a row overlaps an earlier one
+    when it starts on or before the latest end seen so far in its group.
+    Same price and currency → duplicate, otherwise a conflict.
+    """
+
+    valid = rows[rows["error"].isna()].sort_values(PAIR + ["valid_from", "row"])
+
+    if valid.empty:
+        return
+
+    running_end = valid.groupby(PAIR)["end"].cummax()
+    prior_end = running_end.groupby([valid["service_id"], valid["vendor_id"]]).shift()
+    overlapping = valid["valid_from"] <= prior_end
+
+    same = valid.duplicated(PAIR + ["valid_from", "end", "cost_price", "currency"], keep="first")
+
+    duplicate = overlapping & same
+    conflict = overlapping & ~same
+
+    rows.loc[duplicate[duplicate].index, "action"] = "duplicate"
+    _fail(
+        rows,
+        pd.Series(rows.index.isin(conflict[conflict].index), index=rows.index),
+        "overlaps an earlier row of the sheet for this service and vendor"
+    )
+
+
+def _current_rates(db: Session, rows: pd.DataFrame) -> pd.DataFrame:
+
+    R = models.ServiceRate
+
+    service_ids = rows["service_id"].dropna().astype(int).unique().tolist()
+
+    frame = pd.DataFrame(
+        db.execute(
+            select(R.id, R.service_id, R.vendor_id, R.valid_from, R.valid_to, R.cost_price, R.currency)
+            .where(R.service_id.in_(service_ids))
+        ).all() if service_ids else [],
+        columns=["rate_id", "service_id", "vendor_id", "cur_from", "cur_to", "cur_price", "cur_currency"]
+    )
+
+    frame["cur_from"] = pd.to_datetime(frame["cur_from"])
+    frame["cur_end"] = pd.to_datetime(frame["cur_to"]).fillna(OPEN_END)
+    frame[PAIR] = frame[PAIR].astype("Int64")
+
+    return frame
+
+
+# =====================================================
+# REPLACE: TRIM / SPLIT OVERLAPPED RATES
+# =====================================================
+
+def _remaining(cur_from, cur_end, windows) -> List[tuple]:
+    """Parts of [cur_from, cur_end] outside every (start, end) window, inclusive days."""
+
+    day = pd.Timedelta(days=1)
+    pieces = []
+    cursor = cur_from
+
+    for start, end in sorted(windows):
+        if start > cursor:
+            pieces.append((cursor, start - day))
+        if end >= OPEN_END:
+            return pieces
+        cursor = max(cursor, end + day)
+
+    if cursor <= cur_end:
+        pieces.append((cursor, cur_end))
+
+    return pieces
+
+
+def _rate_changes(rows: pd.DataFrame, current: pd.DataFrame) -> List[dict]:
+    """
+    For every current rate overlapped by replace rows: delete when fully
+    covered, otherwise keep its first remaining piece (trim) and add the
+    others as new rates with the same price (split).
+    """
+
+    replacing = rows[rows["action"] == "replace"]
+    if replacing.empty:
+        return []
+
+    windows = {}
+    for r in replacing.itertuples(index=False):
+        for rate_id in r.replaces:
+            windows.setdefault(rate_id, []).append((r.valid_from, r.end))
+
+    changes = []
+
+    for cur in current[current["rate_id"].isin(list(windows))].sort_values("rate_id").itertuples(index=False):
+
+        pieces = _remaining(cur.cur_from, cur.cur_end, windows[cur.rate_id])
+
+        if not pieces:
+            kind = "delete"
+        elif len(pieces) == 1:
+            kind = "trim"
+        else:
+            kind = "split"
+
+        changes.append({
+            "rate_id": int(cur.rate_id),
+            "action": kind,
+            "service_id": int(cur.service_id),
+            "vendor_id": int(cur.vendor_id),
+            "cost_price": float(cur.cur_price),
+            "currency": cur.cur_currency,
+            "valid_from": _plain_date(cur.cur_from),
+            "valid_to": _open_date(cur.cur_end),
+            "keeps": [
+                {"valid_from": _plain_date(start), "valid_to": _open_date(end)}
+                for start, end in pieces
+            ]
+        })
+
+    return changes
+
+
+# =====================================================
+# IMPORT
+# =====================================================
+
+def _plain_date(value) -> Optional[date]:
+    return None if pd.isna(value) else value.date()
+
+
+def _open_date(value) -> Optional[date]:
+    return None if pd.isna(value) or value >= OPEN_END else value.date()
+
+
+def import_rate_sheet(
+    db: Session,
+    raw: bytes,
+    filename: str,
+    currency: str = "PKR",
+    dayfirst: bool = True,
+    on_overlap: str = "error",
+    dry_run: bool = False
+) -> dict:
+
+    started = time.perf_counter()
+
+    rows = read_rate_sheet(raw, filename, currency, dayfirst)
+    rows["action"] = None
+
+    _resolve(db, rows)
+    _sheet_overlaps(rows)
+
+    live = rows["error"].isna() & rows["action"].isna()
+
+    # ---- compare with current rates (one query, one merge) ------------
+    current = _current_rates(db, rows.loc[live])
+
+    pairs = rows.loc[live, ["row"] + PAIR + ["valid_from", "end"]].merge(current, on=PAIR)
+    pairs = pairs[(pairs["valid_from"] <= pairs["cur_end"]) & (pairs["cur_from"] <= pairs["end"])]
+
+    exact = pairs[(pairs["valid_from"] == pairs["cur_from"]) & (pairs["end"] == pairs["cur_end"])]
+    touched = pairs.groupby("row")["rate_id"].agg(list)
+    overlap_count = pairs.groupby("row").size()
+    exact_rate = exact.drop_duplicates("row").set_index("row")
+
+    rows["rate_id"] = rows["row"].map(exact_rate["rate_id"]).astype("Int64")
+    rows["previous_price"] = rows["row"].map(exact_rate["cur_price"])
+    rows["previous_currency"] = rows["row"].map(exact_rate["cur_currency"])
+    rows["replaces"] = rows["row"].map(touched)
+
+    only_exact = rows["rate_id"].notna() & (rows["row"].map(overlap_count) == 1)
+    overlaps = rows["row"].map(overlap_count).fillna(0) > 0
+
+    price_same = np.isclose(rows["previous_price"].astype(float), rows["cost_price"].astype(float)) & (
+        rows["previous_currency"] == rows["currency"]
+    )
+
+    rows.loc[live & only_exact & price_same, "action"] = "unchanged"
+    rows.loc[live & only_exact & ~price_same, "action"] = "update"
+    rows.loc[live & ~overlaps, "action"] = "insert"
+
+    partial = live & overlaps & ~only_exact
+    if on_overlap == "replace":
+        rows.loc[partial, "action"] = "replace"
+    else:
+        _fail(rows, partial, "overlaps a current rate with a different validity window")
+
+    rows.loc[rows["error"].notna(), "action"] = "error"
+
+    # ---- write ---------------------------------------------------------
+    R = models.ServiceRate
+
+    def values(frame):
+        return [
+            {
+                "service_id": int(r.service_id),
+                "vendor_id": int(r.vendor_id),
+                "valid_from": r.valid_from.date(),
+                "valid_to": _plain_date(r.valid_to),
+                "cost_price": float(r.cost_price),
+                "currency": r.currency
+            }
+            for r in frame.itertuples(index=False)
+        ]
+
+    inserts = rows[rows["action"].isin(["insert", "replace"])]
+    updates = rows[rows["action"] == "update"]
+
+    changes = _rate_changes(rows, current)
+    removed = [c["rate_id"] for c in changes if c["action"] == "delete"]
+    trimmed = [
+        {"id": c["rate_id"], "valid_from": c["keeps"][0]["valid_from"], "valid_to": c["keeps"][0]["valid_to"]}
+        for c in changes if c["keeps"]
+    ]
+    split_off = [
+        {
+            "service_id": c["service_id"],
+            "vendor_id": c["vendor_id"],
+            "cost_price": c["cost_price"],
+            "currency": c["currency"],
+            **piece
+        }
+        for c in changes for piece in c["keeps"][1:]
+    ]
+
+    if not dry_run:
+
+        if removed:
+            db.execute(delete(R).where(R.id.in_(removed)).execution_options(synchronize_session=False))
+
+        if trimmed:
+            db.execute(update(R), trimmed)
+
+        if not updates.empty:
+            db.execute(update(R), [
+                {"id": int(r.rate_id), "cost_price": float(r.cost_price), "currency": r.currency}
+                for r in updates.itertuples(index=False)
+            ])
+
+        if split_off:
+            db.execute(insert(R), split_off)
+
+        if not inserts.empty:
+            db.execute(insert(R), values(inserts))
+
+        db.commit()
+
+    summary = rows["action"].value_counts()
+
+    return {
+        "dry_run": dry_run,
+        "total_rows": len(rows),
+        "inserted": int(summary.get("insert", 0)),
+        "updated": int(summary.get("update", 0)),
+        "unchanged": int(summary.get("unchanged", 0)),
+        "replaced": int(summary.get("replace", 0)),
+        "rates_removed": len(removed),
+        "rates_trimmed": sum(c["action"] == "trim" for c in changes),
+        "rates_split": sum(c["action"] == "split" for c in changes),
+        "duplicates": int(summary.get("duplicate", 0)),
+        "errors": int(summary.get("error", 0)),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        "rows": [
+            {
+                "row": int(r.row),
+                "action": r.action,
+                "service_id": None if pd.isna(r.service_id) else int(r.service_id),
+                "vendor_id": None if pd.isna(r.vendor_id) else int(r.vendor_id),
+                "valid_from": _plain_date(r.valid_from),
+                "valid_to": _plain_date(r.valid_to),
+                "cost_price": None if pd.isna(r.cost_price) else float(r.cost_price),
+                "currency": r.currency,
+                "previous_price": None if pd.isna(r.previous_price) else float(r.previous_price),
+                "replaces": r.replaces if r.action == "replace" else [],
+                "error": r.error
+            }
+            for r in rows.sort_values("row").itertuples(index=False)
+        ],
+        "rate_changes": changes
+    }
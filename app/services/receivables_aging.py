@@ -0,0 +1,152 @@
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app import models
+
+
+# =====================================================
+# RECEIVABLES AGING
+# =====================================================
+# An invoice is open at `as_of` when it existed by then, is not cancelled
+# and its total exceeds the payments dated on or before `as_of`. It ages
+# from its quotation due date (invoice date when the quotation has none);
+# not-yet-due balances fall in the first bucket.
+#
+# Limitation: invoices record no cancellation date, so "not cancelled"
+# is today's status. An invoice cancelled after `as_of` is left out of
+# that historical report even though it was open on the day.
+#
+# Bucket edges are turned into dates here, so the SQL compares dates
+# (index friendly, no interval arithmetic) and runs as one statement.
+
+BUCKETS = ("days_0_30", "days_31_60", "days_61_90", "days_over_90")
+
+# Balances under a cent are rounding noise, not receivables
+OPEN_BALANCE = 0.01
+
+
+def _open_items(as_of: date, client_id: Optional[int]):
+
+    I = models.Invoice
+    Q = models.Quotation
+    P = models.InvoicePayment
+
+    paid = (
+        select(P.invoice_id, func.sum(P.amount).label("paid"))
+        .where(P.payment_date <= as_of)
+        .group_by(P.invoice_id)
+        .subquery()
+    )
+
+    balance = I.total_amount - func.coalesce(paid.c.paid, 0)
+
+    stmt = (
+        select(
+            I.client_id,
+            balance.label("balance"),
+            func.coalesce(Q.due_date, func.date(I.created_at)).label("due_on")
+        )
+        .outerjoin(Q, Q.id == I.quotation_id)
+        .outerjoin(paid, paid.c.invoice_id == I.id)
+        .where(
+            I.created_at < as_of + timedelta(days=1),
+            I.payment_status != models.PaymentStatus.CANCELLED,
+            balance > OPEN_BALANCE
+        )
+    )
+
+    if client_id:
+        stmt = stmt.where(I.client_id == client_id)
+
+    return stmt.subquery()
+
+
+def aging_statement(as_of: date, client_id: Optional[int] = None, with_totals: bool = False):
+    """
+    One row per client: balance per bucket, total, open invoice count,
+    oldest due date, share of all receivables and rank by total.
+
+    with_totals adds grand totals as window columns on every row, so the
+    JSON report needs no second query.
+    """
+
+    items = _open_items(as_of, client_id)
+
+    edges = [as_of - timedelta(days=d) for d in (30, 60, 90)]
+
+    def bucket(condition):
+        return func.coalesce(func.sum(items.c.balance).filter(condition), 0)
+
+    per_client = (
+        select(
+            items.c.client_id,
+            bucket(items.c.due_on >= edges[0]).label("days_0_30"),
+            bucket((items.c.due_on < edges[0]) & (items.c.due_on >= edges[1])).label("days_31_60"),
+            bucket((items.c.due_on < edges[1]) & (items.c.due_on >= edges[2])).label("days_61_90"),
+            bucket(items.c.due_on < edges[2]).label("days_over_90"),
+            func.sum(items.c.balance).label("total"),
+            func.count().label("invoices"),
+            func.min(items.c.due_on).label("oldest_due_on")
+        )
+        .group_by(items.c.client_id)
+        .subquery()
+    )
+
+    c = per_client.c
+
+    columns = [
+        c.client_id,
+        models.Client.company_name.label("client_name"),
+        *[c[name] for name in BUCKETS],
+        c.total,
+        c.invoices,
+        c.oldest_due_on,
+        (c.total * 100.0 / func.sum(c.total).over()).label("share_pct"),
+        func.rank().over(order_by=c.total.desc()).label("rank")
+    ]
+
+    if with_totals:
+        columns += [
+            func.sum(c[name]).over().label(f"all_{name}")
+            for name in BUCKETS + ("total", "invoices")
+        ]
+
+    return (
+        select(*columns)
+        .outerjoin(models.Client, models.Client.id == c.client_id)
+        .order_by(c.total.desc(), c.client_id)
+    )
+
+
+def aging_report(db: Session, as_of: date, client_id: Optional[int] = None) -> dict:
+
+    rows = db.execute(aging_statement(as_of, client_id, with_totals=True)).mappings().all()
+
+    first = rows[0] if rows else {}
+
+    totals = {
+        name: round(float(first.get(f"all_{name}") or 0), 2)
+        for name in BUCKETS + ("total",)
+    }
+    totals["invoices"] = int(first.get("all_invoices") or 0)
+
+    return {
+        "as_of": as_of,
+        "totals": totals,
+        "clients": [
+            {
+                "client_id": r["client_id"],
+                "client_name": r["client_name"],
+                **{name: round(float(r[name]), 2) for name in BUCKETS},
+                "total": round(float(r["total"]), 2),
+                "invoices": r["invoices"],
+                "oldest_due_on": r["oldest_due_on"],
+                "share_pct": round(float(r["share_pct"] or 0), 2),
+                "rank": r["rank"]
+            }
+            for r in rows
+        ]
+    }
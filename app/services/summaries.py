@@ -0,0 +1,236 @@
+import threading
+import time
+from typing import Callable, Dict, Iterable
+
+from sqlalchemy import func, select, true
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import SUMMARY_MAX_STALENESS
+from app.services import commit_hooks, finance_rollups
+
+
+# =====================================================
+# SNAPSHOT CACHE
+# =====================================================
+
+class SnapshotCache:
+    """
+    Tiny per-process cache for summary payloads.
+
+    An entry is dropped as soon as a commit touches one of its tables and
+    is never served older than `max_staleness` seconds (covers writes made
+    by other processes or outside the ORM session).
+    """
+
+    def __init__(self, max_staleness: float = SUMMARY_MAX_STALENESS):
+        self.max_staleness = max_staleness
+        self._entries: Dict[str, tuple] = {}          # key -> (value, computed_at)
+        self._tables: Dict[str, set] = {}             # key -> tables it depends on
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._generation: Dict[str, int] = {}          # bumped on invalidation
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def register(self, key: str, tables: Iterable[str]):
+        with self._lock:
+            self._tables[key] = set(tables)
+            self._key_locks.setdefault(key, threading.Lock())
+
+    def invalidate_tables(self, tables: set):
+        with self._lock:
+            for key, depends in self._tables.items():
+                if depends & tables:
+                    self._generation[key] = self._generation.get(key, 0) + 1
+                    if self._entries.pop(key, None) is not None:
+                        self.counters["invalidations"] += 1
+
+    def _fresh(self, key: str):
+        entry = self._entries.get(key)
+        if entry and time.monotonic() - entry[1] < self.max_staleness:
+            return entry
+        return None
+
+    def get(self, key: str, compute: Callable[[], dict]) -> dict:
+
+        with self._lock:
+            entry = self._fresh(key)
+            if entry:
+                self.counters["hits"] += 1
+                return entry[0]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # One computation per key at a time; concurrent pollers wait for it
+        with key_lock:
+            with self._lock:
+                entry = self._fresh(key)
+                if entry:
+                    self.counters["hits"] += 1
+                    return entry[0]
+                self.counters["misses"] += 1
+                generation = self._generation.get(key, 0)
+
+            started = time.monotonic()
+            value = compute()
+
+            with self._lock:
+                # Skip storing if a commit landed while we were computing
+                if self._generation.get(key, 0) == generation:
+                    self._entries[key] = (value, started)
+
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self.counters,
+                "entries": len(self._entries),
+                "max_staleness_seconds": self.max_staleness
+            }
+
+
+summary_cache = SnapshotCache()
+
+
+def cached_summary(key: str, *tables: str):
+    """Decorator: cache `fn(db)` under `key`, invalidated by writes to `tables`."""
+
+    summary_cache.register(key, tables)
+
+    def wrap(fn):
+        def cached(db: Session) -> dict:
+            return summary_cache.get(key, lambda: fn(db))
+        cached.uncached = fn
+        return cached
+
+    return wrap
+
+
+def _invalidate(tables: set):
+    summary_cache.invalidate_tables(tables)
+
+
+QUOTATIONS = "quotations"
+INVOICES = "invoices"
+INVOICE_PAYMENTS = "invoice_payments"
+PAYMENTS = "payments"
+FINANCE_ROLLUPS = "finance_rollups"
+
+commit_hooks.subscribe(
+    {QUOTATIONS, INVOICES, INVOICE_PAYMENTS, PAYMENTS, FINANCE_ROLLUPS},
+    _invalidate
+)
+
+
+# =====================================================
+# ONE AGGREGATE PER DOMAIN
+# =====================================================
+
+def quotation_aggregate():
+    Q = models.Quotation
+    return select(
+        func.count(Q.id).label("total_quotations"),
+        func.count(Q.id).filter(
+            Q.status == models.QuotationStatus.CONFIRMED
+        ).label("confirmed_quotations"),
+        func.coalesce(func.sum(Q.total_profit), 0).label("total_profit")
+    )
+
+
+def invoice_aggregate():
+    I = models.Invoice
+    overdue = I.payment_status == models.PaymentStatus.OVERDUE
+    return select(
+        func.count(I.id).label("total_invoices"),
+        func.coalesce(func.sum(I.total_amount), 0).label("total_revenue"),
+        func.coalesce(func.sum(I.paid_amount), 0).label("total_paid"),
+        func.coalesce(func.sum(I.due_amount), 0).label("total_outstanding"),
+        func.count(I.id).filter(overdue).label("overdue_invoices"),
+        func.coalesce(func.sum(I.due_amount).filter(overdue), 0).label("overdue_amount")
+    )
+
+
+def payment_aggregate():
+    P = models.Payment
+    return select(
+        func.coalesce(func.sum(P.amount_paid), 0).label("total_collected")
+    )
+
+
+def _one_row(db: Session, *aggregates) -> dict:
+    """Several single-row aggregates side by side in one round trip."""
+
+    subqueries = [a.subquery() for a in aggregates]
+
+    stmt = select(*[c for s in subqueries for c in s.c]).select_from(subqueries[0])
+    for s in subqueries[1:]:
+        stmt = stmt.join(s, true())
+
+    return dict(db.execute(stmt).mappings().one())
+
+
+# =====================================================
+# ENDPOINT PAYLOADS
+# =====================================================
+
+@cached_summary("dashboard", QUOTATIONS, INVOICES)
+def dashboard_summary(db: Session) -> dict:
+
+    row = _one_row(db, quotation_aggregate(), invoice_aggregate())
+
+    total_quotations = row["total_quotations"] or 0
+    confirmed = row["confirmed_quotations"] or 0
+
+    conversion_rate = 0
+    if total_quotations > 0:
+        conversion_rate = (confirmed / total_quotations) * 100
+
+    return {
+        "quotation_metrics": {
+            "total_quotations": total_quotations,
+            "confirmed_quotations": confirmed,
+            "conversion_rate_percentage": round(conversion_rate, 2),
+            "total_profit": row["total_profit"]
+        },
+        "invoice_metrics": {
+            "total_invoices": row["total_invoices"],
+            "total_revenue": row["total_revenue"],
+            "total_paid": row["total_paid"],
+            "total_outstanding": row["total_outstanding"]
+        }
+    }
+
+
+@cached_summary("accounts", FINANCE_ROLLUPS)
+def accounts_summary(db: Session) -> dict:
+
+    # Both figures come from the monthly rollup rows, not the raw tables
+    total = finance_rollups.totals(db)
+    monthly = finance_rollups.series(db, "month")
+
+    return {
+        "total_revenue": round(total["revenue"], 2),
+        "total_paid": round(total["cash_in"], 2),
+        "total_outstanding": round(total["outstanding"], 2),
+        "total_invoices": int(round(total["invoices"])),
+        "monthly_cashflow": [
+            {
+                "month": m["period"].strftime("%b %Y"),
+                "period": m["period"],
+                "cash_in": m["cash_in"]
+            }
+            for m in monthly
+        ]
+    }
+
+
+@cached_summary("payments", INVOICES, PAYMENTS)
+def payment_summary(db: Session) -> dict:
+
+    row = _one_row(db, payment_aggregate(), invoice_aggregate())
+
+    return {
+        "total_collected": row["total_collected"],
+        "total_due": row["total_outstanding"],
+        "overdue_amount": row["overdue_amount"]
+    }
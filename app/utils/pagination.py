@@ -0,0 +1,152 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Callable, List, Optional, Sequence
+
+from fastapi import HTTPException, Query
+from sqlalchemy import text, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Query as ORMQuery, Session
+
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+# =====================================================
+# REQUEST PARAMS (shared dependency)
+# =====================================================
+
+@dataclass
+class PageParams:
+    limit: int = DEFAULT_LIMIT
+    cursor: Optional[str] = None
+    include_total: bool = False
+    unpaginated: bool = False
+
+
+def page_params(
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    include_total: bool = Query(False, description="Add a planner-estimated total"),
+    unpaginated: bool = Query(False, description="Legacy: return every row as a plain list")
+) -> PageParams:
+    return PageParams(limit, cursor, include_total, unpaginated)
+
+
+# =====================================================
+# OPAQUE CURSOR
+# =====================================================
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "value"):          # enums
+        return value.value
+    return value
+
+
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps([_plain(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> list:
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+
+        decoded = []
+        for column, value in zip(columns, values):
+            python_type = column.type.python_type
+            if value is not None and python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif value is not None and python_type is date:
+                value = date.fromisoformat(value)
+            decoded.append(value)
+
+        return decoded
+
+    except (ValueError, TypeError, NotImplementedError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# =====================================================
+# PLANNER ESTIMATE
+# =====================================================
+
+def estimate_count(db: Session, query: ORMQuery) -> Optional[int]:
+    """
+    Row estimate from EXPLAIN instead of COUNT(*): constant time on large
+    tables, exact enough for "about N results". Runs in a savepoint so a
+    failed EXPLAIN leaves the caller's transaction usable.
+    """
+
+    try:
+        compiled = query.statement.compile(
+            dialect=db.get_bind().dialect,
+            compile_kwargs={"literal_binds": True}
+        )
+        with db.begin_nested():
+            plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+    except SQLAlchemyError:
+        return None
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+# =====================================================
+# KEYSET PAGINATION
+# =====================================================
+
+def paginate(
+    db: Session,
+    query: ORMQuery,
+    order_columns: List,
+    page: PageParams,
+    descending: bool = False,
+    serialize: Optional[Callable] = None
+):
+    """
+    Keyset-paginate `query` on `order_columns` (last one must be unique,
+    normally the primary key).
+
+    Returns {"items", "next_cursor", "limit", "total_estimate"}, or the
+    legacy unbounded list when `page.unpaginated` is set.
+    """
+
+    serialize = serialize or (lambda row: row)
+    ordering = [c.desc() if descending else c.asc() for c in order_columns]
+
+    if page.unpaginated:
+        return [serialize(row) for row in query.order_by(*ordering).all()]
+
+    total_estimate = estimate_count(db, query) if page.include_total else None
+
+    if page.cursor:
+        values = decode_cursor(page.cursor, order_columns)
+        key = tuple_(*order_columns)
+        after = tuple_(*values)
+        query = query.filter(key < after if descending else key > after)
+
+    rows = query.order_by(*ordering).limit(page.limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in order_columns])
+
+    return {
+        "items": [serialize(row) for row in rows],
+        "next_cursor": next_cursor,
+        "limit": page.limit,
+        "total_estimate": total_estimate
+    }
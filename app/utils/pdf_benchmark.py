@@ -0,0 +1,132 @@
+"""
+Per-document render time with and without the template registry.
+
+    python -m app.utils.pdf_benchmark --runs 50
+
+"cold" clears the registry before every render, which reproduces the old
+behaviour (stylesheet rebuilt, logo and flags read and decoded each time);
+"warm" reuses the registry the way a long-lived worker process does.
+"""
+
+import argparse
+import time
+from datetime import date
+
+from app.models import PaymentMethod, PaymentStatus, QuotationStatus
+from app.services.pdf_render import render_document
+from app.utils.pdf_templates import get_templates
+
+
+def sample_snapshots(lines: int = 12) -> dict:
+
+    items = [
+        {
+            "id": i,
+            "service_name": f"Deluxe room with breakfast, night {i}",
+            "country": ("Thailand", "Malaysia", "Singapore")[i % 3],
+            "start_date": date(2026, 1, 1),
+            "end_date": date(2026, 1, 4),
+            "quantity": 2,
+            "cost_price": 8000.0,
+            "sell_price": 10000.0,
+            "total_cost": 16000.0,
+            "total_sell": 20000.0
+        }
+        for i in range(1, lines + 1)
+    ]
+
+    total_cost = sum(i["total_cost"] for i in items)
+    total_sell = sum(i["total_sell"] for i in items)
+
+    quotation = {
+        "quotation_id": 1,
+        "quotation_number": "QT-0001",
+        "date": date(2026, 1, 1),
+        "client_name": "Benchmark Travels",
+        "status": QuotationStatus.CONFIRMED.value,
+        "margin_percentage": 25.0,
+        "total_cost": total_cost,
+        "total_sell": total_sell,
+        "total_profit": total_sell - total_cost,
+        "countries": ["Thailand", "Malaysia", "Singapore"],
+        "items": items
+    }
+
+    invoice = {
+        "invoice_id": 1,
+        "invoice_number": "INV-2026-0001",
+        "date": date(2026, 1, 2),
+        "client_name": "Benchmark Travels",
+        "total_amount": total_sell,
+        "paid_amount": 50000.0,
+        "due_amount": total_sell - 50000.0,
+        "payment_status": PaymentStatus.PARTIAL.value,
+        "items": items,
+        "payments": [
+            {
+                "id": 1,
+                "payment_date": date(2026, 1, 3),
+                "payment_method": PaymentMethod.BANK_TRANSFER.value,
+                "reference_no": "TRX-1",
+                "amount": 50000.0
+            }
+        ]
+    }
+
+    voucher = {
+        "payment_id": 1,
+        "receipt_number": "RCPT-2026-0001",
+        "invoice_number": "INV-2026-0001",
+        "client_name": "Benchmark Travels",
+        "payment_date": date(2026, 1, 3),
+        "payment_method": PaymentMethod.BANK_TRANSFER.value,
+        "reference_no": "TRX-1",
+        "amount": 50000.0
+    }
+
+    return {
+        "invoice": invoice,
+        "voucher": voucher,
+        "quotation": quotation,
+        "profit": quotation
+    }
+
+
+def measure(kind: str, snapshot: dict, runs: int, cold: bool) -> float:
+
+    samples = []
+
+    for _ in range(runs):
+        started = time.perf_counter()
+        if cold:
+            get_templates.cache_clear()
+        render_document(kind, snapshot)
+        samples.append(time.perf_counter() - started)
+
+    samples.sort()
+    return samples[len(samples) // 2] * 1000
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Benchmark PDF rendering")
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--lines", type=int, default=12)
+    args = parser.parse_args()
+
+    snapshots = sample_snapshots(args.lines)
+
+    # First render imports ReportLab fonts etc. — keep it out of both columns
+    for kind, snapshot in snapshots.items():
+        render_document(kind, snapshot)
+
+    print(f"{'document':<12}{'cold p50 ms':>14}{'warm p50 ms':>14}{'speedup':>10}")
+
+    for kind, snapshot in snapshots.items():
+        cold = measure(kind, snapshot, args.runs, cold=True)
+        warm = measure(kind, snapshot, args.runs, cold=False)
+        print(f"{kind:<12}{cold:>14.2f}{warm:>14.2f}{cold / warm:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,14 @@
 from io import BytesIO
 from decimal import Decimal
 from reportlab.platypus import (
-    SimpleDocTemplate,
     Paragraph,
     Spacer,
     Table,
-    TableStyle,
-    Image
+    TableStyle
 )
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import inch
-from reportlab.lib import enums
-import os
+
+from app.utils.pdf_templates import CachedImage, get_templates
 
 
 CURRENCY = "PKR"
@@ -26,63 +21,21 @@ def format_currency(value):
         return f"{CURRENCY} 0.00"
 
 
-# =====================================================
-# COMPANY HEADER
-# =====================================================
-
-def add_company_header(elements, styles):
-
-    logo_path = os.path.join("app", "static", "uniworld_logo.png")
-
-    if os.path.exists(logo_path):
-        elements.append(Image(logo_path, width=1.2 * inch, height=1.2 * inch))
-
-    elements.append(Spacer(1, 0.2 * inch))
-    elements.append(
-        Paragraph("<b>UniWorld Travel & Tours Pvt. Ltd.</b>", styles["Title"])
-    )
-    elements.append(Spacer(1, 0.3 * inch))
-
-
 # =====================================================
 # INVOICE PDF (WRAP FIXED VERSION)
 # =====================================================
 
-def generate_invoice_pdf(invoice):
+def generate_invoice_pdf(invoice: dict):
+
+    t = get_templates()
+    styles = t.styles
 
     buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=40,
-        leftMargin=40
-    )
+    doc = t.document(buffer)
 
     elements = []
-    styles = getSampleStyleSheet()
-
-    # Custom paragraph style for wrapping service text
-    service_style = ParagraphStyle(
-        'ServiceStyle',
-        parent=styles['Normal'],
-        fontSize=9,
-        leading=12,
-        wordWrap='LTR',
-    )
-
-    normal_center = ParagraphStyle(
-        'NormalCenter',
-        parent=styles['Normal'],
-        alignment=enums.TA_CENTER
-    )
-
-    normal_right = ParagraphStyle(
-        'NormalRight',
-        parent=styles['Normal'],
-        alignment=enums.TA_RIGHT
-    )
 
-    add_company_header(elements, styles)
+    t.header(elements)
 
     elements.append(Paragraph("<b>INVOICE</b>", styles["Heading1"]))
     elements.append(Spacer(1, 0.3 * inch))
@@ -91,18 +44,14 @@ def generate_invoice_pdf(invoice):
     # BASIC INFO
     # ==============================
 
-    client_name = ""
-    if invoice.client:
-        client_name = invoice.client.company_name
-
     elements.append(
-        Paragraph(f"<b>Invoice Number:</b> {invoice.invoice_number}", styles["Normal"])
+        Paragraph(f"<b>Invoice Number:</b> {invoice['invoice_number']}", styles["Normal"])
     )
     elements.append(
-        Paragraph(f"<b>Date:</b> {invoice.created_at.date()}", styles["Normal"])
+        Paragraph(f"<b>Date:</b> {invoice['date']}", styles["Normal"])
     )
     elements.append(
-        Paragraph(f"<b>Client:</b> {client_name}", styles["Normal"])
+        Paragraph(f"<b>Client:</b> {invoice['client_name']}", styles["Normal"])
     )
     elements.append(Spacer(1, 0.3 * inch))
 
@@ -119,50 +68,34 @@ def generate_invoice_pdf(invoice):
         ]
     ]
 
-    quotation = invoice.quotation
-
-    if quotation and quotation.items:
-        for item in quotation.items:
+    for item in invoice["items"]:
 
-            service_name = ""
-            if item.service:
-                service_name = item.service.name
-
-            data.append([
-                Paragraph(service_name, service_style),  # WRAP FIXED
-                Paragraph(str(item.quantity), normal_center),
-                Paragraph(format_currency(item.sell_price), normal_right),
-                Paragraph(format_currency(item.total_sell), normal_right)
-            ])
+        data.append([
+            Paragraph(item["service_name"], t.service),  # WRAP FIXED
+            Paragraph(str(item["quantity"]), t.center),
+            Paragraph(format_currency(item["sell_price"]), t.right),
+            Paragraph(format_currency(item["total_sell"]), t.right)
+        ])
 
     # Totals Section
-    data.append(["", "", Paragraph("<b>Total Amount</b>", normal_right),
-                 Paragraph(format_currency(invoice.total_amount), normal_right)])
+    data.append(["", "", Paragraph("<b>Total Amount</b>", t.right),
+                 Paragraph(format_currency(invoice["total_amount"]), t.right)])
 
-    data.append(["", "", Paragraph("<b>Paid Amount</b>", normal_right),
-                 Paragraph(format_currency(invoice.paid_amount), normal_right)])
+    data.append(["", "", Paragraph("<b>Paid Amount</b>", t.right),
+                 Paragraph(format_currency(invoice["paid_amount"]), t.right)])
 
-    data.append(["", "", Paragraph("<b>Due Amount</b>", normal_right),
-                 Paragraph(format_currency(invoice.due_amount), normal_right)])
+    data.append(["", "", Paragraph("<b>Due Amount</b>", t.right),
+                 Paragraph(format_currency(invoice["due_amount"]), t.right)])
 
-    data.append(["", "", Paragraph("<b>Payment Status</b>", normal_right),
-                 Paragraph(invoice.payment_status.value, normal_right)])
+    data.append(["", "", Paragraph("<b>Payment Status</b>", t.right),
+                 Paragraph(invoice["payment_status"], t.right)])
 
     table = Table(
         data,
         colWidths=[3.2 * inch, 0.8 * inch, 1.2 * inch, 1.2 * inch]
     )
 
-    table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.black),
-        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-
-        ("VALIGN", (0, 0), (-1, -1), "TOP"),
-
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-
-        ("BACKGROUND", (-2, -4), (-1, -1), colors.whitesmoke),
-    ]))
+    table.setStyle(t.table_styles["invoice"])
 
     elements.append(table)
 
@@ -170,9 +103,7 @@ def generate_invoice_pdf(invoice):
     # PAYMENT HISTORY
     # ==============================
 
-    payments = []
-    if hasattr(invoice, "payments") and invoice.payments:
-        payments = invoice.payments
+    payments = invoice["payments"]
 
     if payments:
 
@@ -186,15 +117,11 @@ def generate_invoice_pdf(invoice):
 
         for p in payments:
 
-            method = ""
-            if p.payment_method:
-                method = p.payment_method.value
-
             payment_data.append([
-                str(p.payment_date),
-                method,
-                p.reference_no or "",
-                format_currency(p.amount)
+                str(p["payment_date"]),
+                p["payment_method"],
+                p["reference_no"],
+                format_currency(p["amount"])
             ])
 
         payment_table = Table(
@@ -202,16 +129,252 @@ def generate_invoice_pdf(invoice):
             colWidths=[1.2 * inch, 1.2 * inch, 1.8 * inch, 1.2 * inch]
         )
 
-        payment_table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.darkblue),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-            ("ALIGN", (3, 1), (3, -1), "RIGHT"),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey)
-        ]))
+        payment_table.setStyle(t.table_styles["payments"])
 
         elements.append(payment_table)
 
-    doc.build(elements)
+    doc.build(elements, onFirstPage=t.draw_footer, onLaterPages=t.draw_footer)
+    buffer.seek(0)
+
+    return buffer
+
+
+# =====================================================
+# QUOTATION PDF (client facing)
+# =====================================================
+
+def _destinations(t, countries):
+    """One row of flags with the country name under each."""
+
+    cells = []
+    for name in countries:
+        flag = t.flag(name)
+        cell = [CachedImage(flag, 0.5 * inch, 0.33 * inch)] if flag else []
+        cell.append(Paragraph(name, t.center))
+        cells.append(cell)
+
+    table = Table([cells], colWidths=[1.1 * inch] * len(cells), hAlign="LEFT")
+    table.setStyle(TableStyle([("VALIGN", (0, 0), (-1, -1), "BOTTOM")]))
+    return table
+
+
+def _date_range(item):
+    if item["start_date"] and item["end_date"]:
+        return f"{item['start_date']} → {item['end_date']}"
+    return str(item["start_date"] or "-")
+
+
+def generate_quotation_pdf(quotation: dict):
+
+    t = get_templates()
+    styles = t.styles
+
+    buffer = BytesIO()
+    doc = t.document(buffer)
+
+    elements = []
+
+    t.header(elements)
+
+    elements.append(Paragraph("<b>QUOTATION</b>", styles["Heading1"]))
+    elements.append(Spacer(1, 0.3 * inch))
+
+    elements.append(
+        Paragraph(f"<b>Quotation Number:</b> {quotation['quotation_number']}", styles["Normal"])
+    )
+    elements.append(
+        Paragraph(f"<b>Date:</b> {quotation['date']}", styles["Normal"])
+    )
+    elements.append(
+        Paragraph(f"<b>Client:</b> {quotation['client_name']}", styles["Normal"])
+    )
+    elements.append(Spacer(1, 0.3 * inch))
+
+    if quotation["countries"]:
+        elements.append(_destinations(t, quotation["countries"]))
+        elements.append(Spacer(1, 0.3 * inch))
+
+    data = [
+        [
+            Paragraph("<b>Service</b>", styles["Normal"]),
+            Paragraph("<b>Dates</b>", styles["Normal"]),
+            Paragraph("<b>Units</b>", styles["Normal"]),
+            Paragraph("<b>Unit Price</b>", styles["Normal"]),
+            Paragraph("<b>Total</b>", styles["Normal"])
+        ]
+    ]
+
+    for item in quotation["items"]:
+
+        data.append([
+            Paragraph(item["service_name"], t.service),
+            Paragraph(_date_range(item), t.service),
+            Paragraph(str(item["quantity"]), t.center),
+            Paragraph(format_currency(item["sell_price"]), t.right),
+            Paragraph(format_currency(item["total_sell"]), t.right)
+        ])
+
+    data.append(["", "", "", Paragraph("<b>Total Amount</b>", t.right),
+                 Paragraph(format_currency(quotation["total_sell"]), t.right)])
+
+    table = Table(
+        data,
+        colWidths=[2.2 * inch, 1.4 * inch, 0.6 * inch, 1.2 * inch, 1.2 * inch]
+    )
+
+    table.setStyle(t.table_styles["quotation"])
+
+    elements.append(table)
+
+    doc.build(elements, onFirstPage=t.draw_footer, onLaterPages=t.draw_footer)
+    buffer.seek(0)
+
+    return buffer
+
+
+# =====================================================
+# PROFIT SHEET PDF (internal)
+# =====================================================
+
+def generate_profit_pdf(quotation: dict):
+
+    t = get_templates()
+    styles = t.styles
+
+    buffer = BytesIO()
+    doc = t.document(buffer)
+
+    elements = []
+
+    t.header(elements, spacing=0.2)
+
+    elements.append(Paragraph("<b>PROFIT SHEET</b>", styles["Heading1"]))
+    elements.append(Spacer(1, 0.2 * inch))
+
+    elements.append(
+        Paragraph(
+            f"<b>Quotation:</b> {quotation['quotation_number']} &nbsp; "
+            f"<b>Client:</b> {quotation['client_name']} &nbsp; "
+            f"<b>Status:</b> {quotation['status']}",
+            styles["Normal"]
+        )
+    )
+    elements.append(Spacer(1, 0.3 * inch))
+
+    data = [
+        [
+            Paragraph("<b>Service</b>", styles["Normal"]),
+            Paragraph("<b>Units</b>", styles["Normal"]),
+            Paragraph("<b>Total Cost</b>", styles["Normal"]),
+            Paragraph("<b>Total Sell</b>", styles["Normal"]),
+            Paragraph("<b>Profit</b>", styles["Normal"])
+        ]
+    ]
+
+    for item in quotation["items"]:
+
+        data.append([
+            Paragraph(item["service_name"], t.service),
+            Paragraph(str(item["quantity"]), t.center),
+            Paragraph(format_currency(item["total_cost"]), t.right),
+            Paragraph(format_currency(item["total_sell"]), t.right),
+            Paragraph(format_currency(item["total_sell"] - item["total_cost"]), t.right)
+        ])
+
+    data.append([
+        Paragraph(f"<b>Margin {quotation['margin_percentage']:.2f}%</b>", t.service),
+        "",
+        Paragraph(f"<b>{format_currency(quotation['total_cost'])}</b>", t.right),
+        Paragraph(f"<b>{format_currency(quotation['total_sell'])}</b>", t.right),
+        Paragraph(f"<b>{format_currency(quotation['total_profit'])}</b>", t.right)
+    ])
+
+    table = Table(
+        data,
+        colWidths=[2.6 * inch, 0.6 * inch, 1.2 * inch, 1.2 * inch, 1.2 * inch]
+    )
+
+    table.setStyle(t.table_styles["profit"])
+
+    elements.append(table)
+
+    doc.build(elements, onFirstPage=t.draw_footer, onLaterPages=t.draw_footer)
+    buffer.seek(0)
+
+    return buffer
+
+
+# =====================================================
+# CLIENT STATEMENT PDF
+# =====================================================
+
+def generate_statement_pdf(statement: dict):
+
+    t = get_templates()
+    styles = t.styles
+
+    buffer = BytesIO()
+    doc = t.document(buffer)
+
+    elements = []
+
+    t.header(elements)
+
+    elements.append(Paragraph("<b>STATEMENT OF ACCOUNT</b>", styles["Heading1"]))
+    elements.append(Spacer(1, 0.3 * inch))
+
+    period = f"{statement['date_from'] or '…'} to {statement['date_to'] or '…'}"
+
+    elements.append(
+        Paragraph(f"<b>Client:</b> {statement['client_name']}", styles["Normal"])
+    )
+    elements.append(
+        Paragraph(f"<b>Period:</b> {period}", styles["Normal"])
+    )
+    elements.append(Spacer(1, 0.3 * inch))
+
+    data = [
+        [
+            Paragraph("<b>Invoice</b>", styles["Normal"]),
+            Paragraph("<b>Date</b>", styles["Normal"]),
+            Paragraph("<b>Total</b>", styles["Normal"]),
+            Paragraph("<b>Paid</b>", styles["Normal"]),
+            Paragraph("<b>Due</b>", styles["Normal"]),
+            Paragraph("<b>Status</b>", styles["Normal"])
+        ]
+    ]
+
+    for inv in statement["invoices"]:
+
+        data.append([
+            Paragraph(inv["invoice_number"], t.service),
+            Paragraph(str(inv["date"]), t.service),
+            Paragraph(format_currency(inv["total_amount"]), t.right),
+            Paragraph(format_currency(inv["paid_amount"]), t.right),
+            Paragraph(format_currency(inv["due_amount"]), t.right),
+            Paragraph(inv["payment_status"] or "", t.center)
+        ])
+
+    data.append([
+        Paragraph("<b>Total</b>", t.service),
+        "",
+        Paragraph(f"<b>{format_currency(statement['total_amount'])}</b>", t.right),
+        Paragraph(f"<b>{format_currency(statement['paid_amount'])}</b>", t.right),
+        Paragraph(f"<b>{format_currency(statement['due_amount'])}</b>", t.right),
+        ""
+    ])
+
+    table = Table(
+        data,
+        colWidths=[1.4 * inch, 0.9 * inch, 1.2 * inch, 1.2 * inch, 1.2 * inch, 0.9 * inch],
+        repeatRows=1
+    )
+
+    table.setStyle(t.table_styles["statement"])
+
+    elements.append(table)
+
+    doc.build(elements, onFirstPage=t.draw_footer, onLaterPages=t.draw_footer)
     buffer.seek(0)
 
     return buffer
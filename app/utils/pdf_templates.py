@@ -0,0 +1,202 @@
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+from PIL import Image as PILImage
+from reportlab.lib import colors, enums
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import Flowable, Paragraph, SimpleDocTemplate, Spacer, TableStyle
+
+from app.config import BASE_DIR
+
+
+STATIC_DIR = BASE_DIR / "app" / "static"
+
+# Longest edge kept in memory; ~3x the printed size is plenty for A4
+LOGO_MAX_PX = 360
+FLAG_MAX_PX = 150
+COMPANY_NAME = "UniWorld Travel & Tours Pvt. Ltd."
+
+# Country names as stored → flag file stem in app/static/countries
+FLAG_ALIASES = {
+    "unitedarabemirates": "uae",
+    "dubai": "uae",
+    "turkiye": "turkey",
+    "türkiye": "turkey",
+}
+
+
+# =====================================================
+# REUSABLE FLOWABLES
+# =====================================================
+
+class CachedImage(Flowable):
+    """
+    Image flowable over an already decoded ImageReader, so every document
+    reuses the same pixels instead of re-reading and re-decoding the file.
+    """
+
+    def __init__(self, reader: ImageReader, width: float, height: float, h_align: str = "CENTER"):
+        super().__init__()
+        self.reader = reader
+        self.width = width
+        self.height = height
+        self.hAlign = h_align   # same default as platypus.Image
+
+    def wrap(self, available_width, available_height):
+        return self.width, self.height
+
+    def draw(self):
+        self.canv.drawImage(
+            self.reader, 0, 0, self.width, self.height,
+            mask="auto", preserveAspectRatio=True
+        )
+
+
+# =====================================================
+# REGISTRY
+# =====================================================
+
+class DocumentTemplates:
+    """Everything that is identical across renders, built once per process."""
+
+    def __init__(self):
+        self.styles = getSampleStyleSheet()
+
+        self.service = ParagraphStyle(
+            "ServiceStyle",
+            parent=self.styles["Normal"],
+            fontSize=9,
+            leading=12,
+            wordWrap="LTR",
+        )
+        self.center = ParagraphStyle(
+            "NormalCenter",
+            parent=self.styles["Normal"],
+            alignment=enums.TA_CENTER
+        )
+        self.right = ParagraphStyle(
+            "NormalRight",
+            parent=self.styles["Normal"],
+            alignment=enums.TA_RIGHT
+        )
+
+        self.logo = self._load_image(STATIC_DIR / "uniworld_logo.png", LOGO_MAX_PX)
+        self._flag_paths = self._flag_files()
+        self.flags: Dict[str, ImageReader] = {}   # decoded on first use
+        self._flags_lock = threading.Lock()         # renders run in worker threads
+
+        self.table_styles = {
+            "invoice": TableStyle([
+                ("BACKGROUND", (0, 0), (-1, 0), colors.black),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+                ("VALIGN", (0, 0), (-1, -1), "TOP"),
+                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+                ("BACKGROUND", (-2, -4), (-1, -1), colors.whitesmoke),
+            ]),
+            "payments": TableStyle([
+                ("BACKGROUND", (0, 0), (-1, 0), colors.darkblue),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+                ("ALIGN", (3, 1), (3, -1), "RIGHT"),
+                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey)
+            ]),
+            "voucher": TableStyle([
+                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+                ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ]),
+            "quotation": TableStyle([
+                ("BACKGROUND", (0, 0), (-1, 0), colors.black),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+                ("VALIGN", (0, 0), (-1, -1), "TOP"),
+                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+                ("BACKGROUND", (-2, -1), (-1, -1), colors.whitesmoke),
+            ]),
+            "statement": TableStyle([
+                ("BACKGROUND", (0, 0), (-1, 0), colors.darkblue),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+                ("VALIGN", (0, 0), (-1, -1), "TOP"),
+                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+                ("BACKGROUND", (0, -1), (-1, -1), colors.whitesmoke),
+            ]),
+            "profit": TableStyle([
+                ("BACKGROUND", (0, 0), (-1, 0), colors.darkgreen),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+                ("VALIGN", (0, 0), (-1, -1), "TOP"),
+                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+                ("BACKGROUND", (0, -1), (-1, -1), colors.whitesmoke),
+            ]),
+        }
+
+    @staticmethod
+    def _load_image(path, max_px: int) -> Optional[ImageReader]:
+        """
+        Decode once and downscale to print resolution: the source flags are
+        1536px wide, and every embedded pixel is recompressed per document.
+        """
+        if not path.exists():
+            return None
+        with PILImage.open(path) as img:
+            img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+            img.thumbnail((max_px, max_px), PILImage.LANCZOS)
+        reader = ImageReader(img)
+        reader.getRGBData()  # decode now, not during the first render
+        return reader
+
+    def _flag_files(self) -> Dict[str, Path]:
+        folder = STATIC_DIR / "countries"
+        if not folder.exists():
+            return {}
+        return {
+            path.stem.lower(): path
+            for path in folder.iterdir()
+            if path.suffix.lower() in (".png", ".jpg", ".jpeg")
+        }
+
+    # -------------------------------------------------
+
+    def flag(self, country_name: Optional[str]) -> Optional[ImageReader]:
+        if not country_name:
+            return None
+        key = re.sub(r"[^a-zü]", "", country_name.lower())
+        key = FLAG_ALIASES.get(key, key)
+        path = self._flag_paths.get(key)
+        if path is None:
+            return None
+        with self._flags_lock:
+            if key not in self.flags:
+                self.flags[key] = self._load_image(path, FLAG_MAX_PX)
+            return self.flags[key]
+
+    def header(self, elements: list, spacing: float = 0.3):
+        if self.logo:
+            elements.append(CachedImage(self.logo, 1.2 * inch, 1.2 * inch))
+        elements.append(Spacer(1, 0.2 * inch))
+        # Flowables hold per-layout state: never share one across renders
+        elements.append(Paragraph(f"<b>{COMPANY_NAME}</b>", self.styles["Title"]))
+        elements.append(Spacer(1, spacing * inch))
+
+    def document(self, buffer, **kwargs) -> SimpleDocTemplate:
+        options = {"pagesize": A4, "rightMargin": 40, "leftMargin": 40}
+        options.update(kwargs)
+        return SimpleDocTemplate(buffer, **options)
+
+    def draw_footer(self, canvas, doc):
+        canvas.saveState()
+        canvas.setFont("Helvetica", 8)
+        canvas.setFillColor(colors.grey)
+        canvas.drawCentredString(
+            A4[0] / 2, 0.5 * inch,
+            f"{COMPANY_NAME}  ·  Page {doc.page}"
+        )
+        canvas.restoreState()
+
+
+@lru_cache(maxsize=1)
+def get_templates() -> DocumentTemplates:
+    return DocumentTemplates()
@@ -0,0 +1,84 @@
+import csv
+import enum
+import io
+import json
+from datetime import date, datetime
+
+from fastapi.responses import StreamingResponse
+
+from app import schemas
+from app.database import SessionLocal
+
+
+# Rows fetched per server-side cursor round trip
+YIELD_PER = 2000
+
+
+# =====================================================
+# STREAMING ENGINE
+# =====================================================
+
+def plain_value(value):
+    if value is None:
+        return None
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def stream_rows(stmt, fmt: schemas.ExportFormat):
+    """
+    Yield the export chunk by chunk from a server-side cursor.
+
+    The session is opened here (not via get_db) so it lives exactly as
+    long as the response body is being sent.
+    """
+
+    db = SessionLocal()
+
+    try:
+        result = db.execute(
+            stmt.execution_options(yield_per=YIELD_PER, stream_results=True)
+        )
+        columns = list(result.keys())
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if fmt == schemas.ExportFormat.CSV else None
+
+        if writer:
+            writer.writerow(columns)
+
+        for partition in result.partitions():
+
+            for row in partition:
+                values = [plain_value(v) for v in row]
+
+                if writer:
+                    writer.writerow(["" if v is None else v for v in values])
+                else:
+                    buffer.write(json.dumps(dict(zip(columns, values))))
+                    buffer.write("\n")
+
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    finally:
+        db.close()
+
+
+def export_response(stmt, fmt: schemas.ExportFormat, name: str):
+
+    media_type = "text/csv" if fmt == schemas.ExportFormat.CSV else "application/x-ndjson"
+    filename = f"{name}-{date.today().isoformat()}.{fmt.value}"
+
+    return StreamingResponse(
+        stream_rows(stmt, fmt),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,7 @@
+-- Last supplier price: when it was fetched and the stay it was quoted for.
+-- Read by the rate cache's stored tier (app/services/external_api/rate_cache.py).
+
+ALTER TABLE external_products
+    ADD COLUMN IF NOT EXISTS last_price_at TIMESTAMP WITHOUT TIME ZONE,
+    ADD COLUMN IF NOT EXISTS last_price_start_date DATE,
+    ADD COLUMN IF NOT EXISTS last_price_end_date DATE;
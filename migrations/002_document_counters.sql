@@ -0,0 +1,11 @@
+-- Document number counters (app/services/numbering.py).
+-- One row per series and year (year 0 = series that never reset). Rows
+-- are created and seeded from existing document numbers on first use,
+-- so no data is copied here.
+
+CREATE TABLE IF NOT EXISTS document_counters (
+    series      VARCHAR NOT NULL,
+    year        INTEGER NOT NULL,
+    last_value  INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (series, year)
+);
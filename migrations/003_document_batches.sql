@@ -0,0 +1,37 @@
+-- Background invoice-pack / client-statement jobs (app/services/document_batches.py).
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'documentbatchkind') THEN
+        CREATE TYPE documentbatchkind AS ENUM ('INVOICE_PACK', 'CLIENT_STATEMENTS');
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'batchstatus') THEN
+        CREATE TYPE batchstatus AS ENUM ('PENDING', 'RUNNING', 'COMPLETED', 'FAILED');
+    END IF;
+END
+$$;
+
+CREATE TABLE IF NOT EXISTS document_batches (
+    id            SERIAL PRIMARY KEY,
+    kind          documentbatchkind NOT NULL,
+    status        batchstatus NOT NULL DEFAULT 'PENDING',
+
+    client_id     INTEGER REFERENCES clients (id),
+    date_from     DATE,
+    date_to       DATE,
+
+    total         INTEGER DEFAULT 0,
+    rendered      INTEGER DEFAULT 0,
+    heartbeat_at  TIMESTAMP WITHOUT TIME ZONE,
+
+    file_path     VARCHAR,
+    file_size     INTEGER,
+    error         TEXT,
+
+    created_at    TIMESTAMP WITHOUT TIME ZONE DEFAULT (now() AT TIME ZONE 'utc'),
+    started_at    TIMESTAMP WITHOUT TIME ZONE,
+    finished_at   TIMESTAMP WITHOUT TIME ZONE
+);
+
+CREATE INDEX IF NOT EXISTS ix_document_batches_id ON document_batches (id);
+CREATE INDEX IF NOT EXISTS ix_document_batches_status ON document_batches (status);
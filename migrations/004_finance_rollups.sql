@@ -0,0 +1,37 @@
+-- Finance rollups (app/services/finance_rollups.py) and the frozen
+-- per-invoice country/category split they are booked under.
+-- servicecategory is the enum type services.category already uses.
+-- Fill both tables afterwards with:
+--     python -m app.services.finance_rollups
+
+CREATE TABLE IF NOT EXISTS finance_rollups (
+    id           SERIAL PRIMARY KEY,
+    granularity  VARCHAR(5) NOT NULL,
+    period       DATE NOT NULL,
+    client_id    INTEGER NOT NULL DEFAULT 0,
+    country_id   INTEGER NOT NULL DEFAULT 0,
+    category     servicecategory NOT NULL,
+    revenue      FLOAT NOT NULL DEFAULT 0,
+    cost         FLOAT NOT NULL DEFAULT 0,
+    profit       FLOAT NOT NULL DEFAULT 0,
+    cash_in      FLOAT NOT NULL DEFAULT 0,
+    outstanding  FLOAT NOT NULL DEFAULT 0,
+    invoices     INTEGER NOT NULL DEFAULT 0,
+    CONSTRAINT uq_finance_rollups_key
+        UNIQUE (granularity, period, client_id, country_id, category)
+);
+
+CREATE INDEX IF NOT EXISTS ix_finance_rollups_id ON finance_rollups (id);
+CREATE INDEX IF NOT EXISTS ix_finance_rollups_period ON finance_rollups (granularity, period);
+
+CREATE TABLE IF NOT EXISTS finance_invoice_shares (
+    id          SERIAL PRIMARY KEY,
+    invoice_id  INTEGER NOT NULL REFERENCES invoices (id),
+    country_id  INTEGER NOT NULL DEFAULT 0,
+    category    servicecategory NOT NULL,
+    share       FLOAT NOT NULL,
+    cost        FLOAT NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS ix_finance_invoice_shares_id ON finance_invoice_shares (id);
+CREATE INDEX IF NOT EXISTS ix_finance_invoice_shares_invoice_id ON finance_invoice_shares (invoice_id);
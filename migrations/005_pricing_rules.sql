@@ -0,0 +1,35 @@
+-- Nightly pricing rules (app/services/nightly_pricing.py).
+-- servicecategory is the enum type services.category already uses.
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'pricingrulekind') THEN
+        CREATE TYPE pricingrulekind AS ENUM ('SEASON', 'WEEKDAY', 'MIN_STAY');
+    END IF;
+END
+$$;
+
+CREATE TABLE IF NOT EXISTS pricing_rules (
+    id          SERIAL PRIMARY KEY,
+    name        VARCHAR NOT NULL,
+    kind        pricingrulekind NOT NULL,
+
+    service_id  INTEGER REFERENCES services (id),
+    vendor_id   INTEGER REFERENCES vendors (id),
+    category    servicecategory,
+
+    valid_from  DATE,
+    valid_to    DATE,
+
+    weekdays    VARCHAR,
+    min_nights  INTEGER,
+
+    percent     FLOAT NOT NULL DEFAULT 0,
+    amount      FLOAT NOT NULL DEFAULT 0,
+
+    is_active   BOOLEAN DEFAULT TRUE,
+    created_at  TIMESTAMP WITHOUT TIME ZONE DEFAULT (now() AT TIME ZONE 'utc')
+);
+
+CREATE INDEX IF NOT EXISTS ix_pricing_rules_id ON pricing_rules (id);
+CREATE INDEX IF NOT EXISTS ix_pricing_rules_service_id ON pricing_rules (service_id);
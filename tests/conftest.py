@@ -0,0 +1,188 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import (
+    Column, Integer, String, Float, DateTime,
+    ForeignKey, Date, Enum, Text, UniqueConstraint,
+    create_engine, event
+)
+from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import models
+from app.database import Base
+
+
+# =====================================================
+# CORE TABLES
+# =====================================================
+# models.py in this tree only carries the tables added alongside the
+# supplier / finance work; Country, City, Client, Vendor, Service,
+# Quotation, Invoice and the payment tables live in the full schema.
+# Minimal stand-ins with the columns the services read are registered
+# on app.models so the suite runs against an in-memory database.
+
+if not hasattr(models, "Quotation"):
+
+    class Country(Base):
+        __tablename__ = "countries"
+
+        id = Column(Integer, primary_key=True)
+        name = Column(String)
+
+    class City(Base):
+        __tablename__ = "cities"
+
+        id = Column(Integer, primary_key=True)
+        name = Column(String)
+        country_id = Column(Integer, ForeignKey("countries.id"))
+
+        country = relationship(Country)
+
+    class Client(Base):
+        __tablename__ = "clients"
+
+        id = Column(Integer, primary_key=True)
+        company_name = Column(String)
+        email = Column(String)
+        phone = Column(String)
+        created_at = Column(DateTime, default=datetime.utcnow)
+
+    class Vendor(Base):
+        __tablename__ = "vendors"
+
+        id = Column(Integer, primary_key=True)
+        name = Column(String)
+
+        quotation_items = relationship("QuotationItem", back_populates="vendor")
+
+    class Service(Base):
+        __tablename__ = "services"
+
+        id = Column(Integer, primary_key=True)
+        name = Column(String)
+        category = Column(Enum(models.ServiceCategory))
+        city_id = Column(Integer, ForeignKey("cities.id"))
+        created_at = Column(DateTime, default=datetime.utcnow)
+
+        city = relationship(City)
+        quotation_items = relationship("QuotationItem", back_populates="service")
+
+    class Quotation(Base):
+        __tablename__ = "quotations"
+
+        id = Column(Integer, primary_key=True)
+        quotation_number = Column(String)
+        client_id = Column(Integer, ForeignKey("clients.id"))
+        status = Column(Enum(models.QuotationStatus), default=models.QuotationStatus.DRAFT)
+        margin_percentage = Column(Float, default=25)
+        total_cost = Column(Float, default=0)
+        total_sell = Column(Float, default=0)
+        total_profit = Column(Float, default=0)
+        due_date = Column(Date)
+        created_at = Column(DateTime, default=datetime.utcnow)
+
+        client = relationship(Client)
+        items = relationship("QuotationItem", back_populates="quotation")
+
+    class Invoice(Base):
+        __tablename__ = "invoices"
+
+        id = Column(Integer, primary_key=True)
+        invoice_number = Column(String)
+        quotation_id = Column(Integer, ForeignKey("quotations.id"))
+        client_id = Column(Integer, ForeignKey("clients.id"))
+        total_amount = Column(Float, default=0)
+        paid_amount = Column(Float, default=0)
+        due_amount = Column(Float, default=0)
+        payment_status = Column(Enum(models.PaymentStatus), default=models.PaymentStatus.UNPAID)
+        created_at = Column(DateTime, default=datetime.utcnow)
+
+        client = relationship(Client)
+        quotation = relationship(Quotation)
+        payments = relationship("InvoicePayment", back_populates="invoice")
+
+    class InvoicePayment(Base):
+        __tablename__ = "invoice_payments"
+
+        id = Column(Integer, primary_key=True)
+        invoice_id = Column(Integer, ForeignKey("invoices.id"))
+        receipt_number = Column(String)
+        payment_date = Column(Date)
+        payment_method = Column(Enum(models.PaymentMethod))
+        reference_no = Column(String)
+        notes = Column(Text)
+        amount = Column(Float)
+        created_at = Column(DateTime, default=datetime.utcnow)
+
+        invoice = relationship(Invoice, back_populates="payments")
+
+    class Payment(Base):
+        __tablename__ = "payments"
+
+        id = Column(Integer, primary_key=True)
+        quotation_id = Column(Integer, ForeignKey("quotations.id"))
+        client_id = Column(Integer, ForeignKey("clients.id"))
+        amount_paid = Column(Float)
+        payment_method = Column(Enum(models.PaymentMethod))
+        reference_number = Column(String)
+        notes = Column(Text)
+        created_at = Column(DateTime, default=datetime.utcnow)
+
+    class VendorService(Base):
+        __tablename__ = "vendor_services"
+
+        id = Column(Integer, primary_key=True)
+        vendor_id = Column(Integer, ForeignKey("vendors.id"))
+        service_id = Column(Integer, ForeignKey("services.id"))
+
+        vendor = relationship(Vendor)
+
+        __table_args__ = (UniqueConstraint("vendor_id", "service_id"),)
+
+    class ServiceRate(Base):
+        __tablename__ = "service_rates"
+
+        id = Column(Integer, primary_key=True)
+        service_id = Column(Integer, ForeignKey("services.id"))
+        vendor_id = Column(Integer, ForeignKey("vendors.id"))
+        valid_from = Column(Date)
+        valid_to = Column(Date)
+        cost_price = Column(Float)
+        currency = Column(String, default="PKR")
+
+        vendor = relationship(Vendor)
+
+    for _model in (
+        Country, City, Client, Vendor, Service, Quotation, Invoice,
+        InvoicePayment, Payment, VendorService, ServiceRate
+    ):
+        setattr(models, _model.__name__, _model)
+
+
+# =====================================================
+# DATABASE
+# =====================================================
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False}
+    )
+
+    @event.listens_for(engine, "connect")
+    def _functions(conn, record):
+        # Postgres builtins the ledger / rollup updates use
+        conn.create_function("greatest", -1, lambda *a: max(x for x in a if x is not None))
+        conn.create_function("least", -1, lambda *a: min(x for x in a if x is not None))
+
+    Base.metadata.create_all(engine)
+
+    session = sessionmaker(bind=engine, autoflush=False)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
@@ -0,0 +1,109 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from app import models
+from app.services.bank_import import match_statement, read_statement
+
+
+def _csv(*lines):
+    return "\n".join(lines).encode()
+
+
+@pytest.fixture
+def invoices(db):
+    db.add_all([
+        models.Client(id=1, company_name="Acme Travels"),
+        models.Client(id=2, company_name="Blue Sky"),
+        models.Invoice(
+            id=1, invoice_number="INV-2026-0001", client_id=1,
+            total_amount=100, due_amount=100, payment_status=models.PaymentStatus.UNPAID
+        ),
+        models.Invoice(
+            id=2, invoice_number="INV-2026-0002", client_id=1,
+            total_amount=50, paid_amount=50, due_amount=0, payment_status=models.PaymentStatus.PAID
+        ),
+        models.Invoice(
+            id=3, invoice_number="INV-2026-0003", client_id=2,
+            total_amount=70, due_amount=70, payment_status=models.PaymentStatus.UNPAID
+        ),
+        models.Invoice(
+            id=4, invoice_number="INV-2026-0004", client_id=2,
+            total_amount=70, due_amount=70, payment_status=models.PaymentStatus.PARTIAL
+        )
+    ])
+    db.commit()
+    return db
+
+
+def _outcome(rows):
+    return [
+        (r.row, None if pd.isna(r.invoice_id) else r.invoice_id, r.reason)
+        for r in rows.itertuples(index=False)
+    ]
+
+
+def test_read_statement_maps_bank_headers():
+    statement = read_statement(_csv(
+        "Transaction Date,Credit,Narration,Remitter,UTR",
+        "03/02/2026,\"1,250.50\",Payment INV-2026-0001,Acme Travels,UTR1",
+        "31/02/2026,abc,,,"
+    ))
+
+    assert statement["row"].tolist() == [2, 3]
+    assert statement.loc[0, "date"] == date(2026, 2, 3)
+    assert statement.loc[0, "amount"] == 1250.5
+    assert statement.loc[0, "reference"] == "Payment INV-2026-0001"
+    assert statement.loc[0, "payer"] == "Acme Travels"
+    assert statement.loc[0, "bank_ref"] == "UTR1"
+    assert statement["date"].isna().tolist() == [False, True]
+    assert statement["amount"].isna().tolist() == [False, True]
+
+
+def test_read_statement_needs_date_and_amount():
+    with pytest.raises(HTTPException) as raised:
+        read_statement(_csv("date,description", "01/01/2026,hello"))
+
+    assert raised.value.status_code == 400
+
+
+def test_match_by_reference_and_by_client_balance(invoices):
+    rows = match_statement(invoices, read_statement(_csv(
+        "date,amount,description,payer",
+        "01/03/2026,40,inv-2026-0001 part,",
+        "01/03/2026,10,INV-2026-0002,",
+        "01/03/2026,10,INV-2026-0999,",
+        "01/03/2026,70,,Blue Sky",
+        "01/03/2026,60,,Acme Travels",
+        "01/03/2026,60,,Unknown Ltd",
+        "01/03/2026,-5,INV-2026-0001,"
+    )))
+
+    assert _outcome(rows) == [
+        (2, 1, None),
+        (3, None, "invoice is paid or cancelled"),
+        (4, None, "invoice number not found"),
+        (5, None, "several open invoices match client and amount"),
+        (6, None, "no open invoice of this client with that balance"),
+        (7, None, "no invoice number and payer is not a known client"),
+        (8, None, "missing date or non-positive amount")
+    ]
+    assert rows.loc[0, "matched_by"] == "reference"
+    assert rows.loc[0, "invoice_number"] == "INV-2026-0001"
+
+
+def test_rejected_overpayment_does_not_use_up_the_balance(invoices):
+    rows = match_statement(invoices, read_statement(_csv(
+        "date,amount,description",
+        "01/03/2026,60,INV-2026-0001",
+        "02/03/2026,60,INV-2026-0001",
+        "03/03/2026,30,INV-2026-0001"
+    )))
+
+    assert _outcome(rows) == [
+        (2, 1, None),
+        (3, None, "amount exceeds balance due"),
+        (4, 1, None)
+    ]
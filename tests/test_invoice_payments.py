@@ -0,0 +1,51 @@
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from app import models
+from app.routers.invoices import cancel_payment
+
+
+@pytest.fixture
+def paid_invoice(db):
+    db.add_all([
+        models.Client(id=1, company_name="Acme"),
+        models.Quotation(id=1, quotation_number="QT-1", client_id=1),
+        models.Invoice(
+            id=1, invoice_number="INV-1", quotation_id=1, client_id=1,
+            total_amount=100, paid_amount=100, due_amount=0,
+            payment_status=models.PaymentStatus.PAID
+        ),
+        models.InvoicePayment(
+            id=5, invoice_id=1, receipt_number="RCPT-1",
+            payment_date=date(2026, 3, 1), amount=60
+        ),
+        models.InvoicePayment(
+            id=6, invoice_id=1, receipt_number="RCPT-2",
+            payment_date=date(2026, 3, 2), amount=40
+        )
+    ])
+    db.commit()
+    return db
+
+
+def test_cancel_reverses_the_payment(paid_invoice):
+    invoice = cancel_payment(6, paid_invoice, current_user=None)
+
+    assert (invoice.paid_amount, invoice.due_amount) == (60, 40)
+    assert invoice.payment_status == models.PaymentStatus.PARTIAL
+    assert paid_invoice.get(models.InvoicePayment, 6) is None
+
+
+def test_second_cancel_does_not_reverse_again(paid_invoice):
+    cancel_payment(6, paid_invoice, current_user=None)
+
+    with pytest.raises(HTTPException) as raised:
+        cancel_payment(6, paid_invoice, current_user=None)
+
+    assert raised.value.status_code == 404
+
+    invoice = paid_invoice.get(models.Invoice, 1)
+    paid_invoice.refresh(invoice)
+    assert (invoice.paid_amount, invoice.due_amount) == (60, 40)
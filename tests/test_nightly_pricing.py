@@ -0,0 +1,108 @@
+from datetime import date
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from app import models
+from app.services import nightly_pricing
+from app.services.nightly_pricing import _fill_vendors, price_lines
+from app.services.rate_resolver import rate_index
+
+
+def test_fill_vendors_keeps_set_vendor_when_open_line_has_no_rate():
+    # One line with a vendor, two without: one resolved, one with no valid rate
+    vendor_id = pd.Series([8, None, None])
+    open_vendor = vendor_id.isna()
+
+    filled = _fill_vendors(vendor_id, open_vendor, [SimpleNamespace(vendor_id=3), None])
+
+    assert filled.tolist() == [8, 3, -1]
+
+
+def test_fill_vendors_all_lines_have_vendors():
+    vendor_id = pd.Series([8, 9])
+
+    filled = _fill_vendors(vendor_id, vendor_id.isna(), [])
+
+    assert filled.tolist() == [8, 9]
+
+
+# =====================================================
+# price_lines
+# =====================================================
+
+@pytest.fixture
+def hotel(db, monkeypatch):
+    monkeypatch.setattr(nightly_pricing, "BASE_CURRENCY", "PKR")
+    rate_index.invalidate()
+
+    db.add_all([
+        models.Vendor(id=7, name="Atlas"),
+        models.Vendor(id=8, name="Blue"),
+        models.Service(id=1, name="Hotel", category=models.ServiceCategory.HOTEL),
+        models.Service(id=2, name="Tour", category=models.ServiceCategory.TOUR),
+        models.ServiceRate(service_id=1, vendor_id=7, valid_from=date(2020, 1, 1), valid_to=date(2026, 3, 31), cost_price=100, currency="PKR"),
+        models.ServiceRate(service_id=1, vendor_id=7, valid_from=date(2026, 4, 1), cost_price=120, currency="PKR"),
+        models.ServiceRate(service_id=1, vendor_id=8, valid_from=date(2020, 1, 1), cost_price=150, currency="PKR"),
+        models.ServiceRate(service_id=1, vendor_id=8, valid_from=date(2020, 1, 1), cost_price=1, currency="USD"),
+        models.ServiceRate(service_id=2, vendor_id=8, valid_from=date(2020, 1, 1), cost_price=30, currency="PKR"),
+        models.PricingRule(
+            id=1, name="April season", kind=models.PricingRuleKind.SEASON, service_id=1,
+            valid_from=date(2026, 4, 1), valid_to=date(2026, 4, 30), percent=20
+        ),
+        models.PricingRule(
+            id=2, name="Weekend", kind=models.PricingRuleKind.WEEKDAY, service_id=1,
+            weekdays="4,5", amount=10
+        ),
+        models.PricingRule(
+            id=3, name="Two nights minimum", kind=models.PricingRuleKind.MIN_STAY, service_id=1,
+            min_nights=2
+        )
+    ])
+    db.commit()
+
+    yield db
+    rate_index.invalidate()
+
+
+def _line(key, service_id, start=None, end=None, vendor_id=None, quantity=1, cost_price=0, margin=None):
+    return {
+        "key": key, "service_id": service_id, "vendor_id": vendor_id,
+        "start_date": start, "end_date": end, "quantity": quantity,
+        "cost_price": cost_price, "manual_margin_percentage": margin
+    }
+
+
+def test_price_lines_nights_rules_and_season_bounds(hotel):
+    report = price_lines(hotel, [
+        # Mon 30 Mar - Sun 5 Apr: season starts 1 Apr, Fri/Sat +10
+        _line("stay", 1, date(2026, 3, 30), date(2026, 4, 5), quantity=2),
+        _line("short", 1, date(2026, 4, 10), date(2026, 4, 11), vendor_id=7),
+        _line("tour", 2, cost_price=999, margin=0),
+        _line("unrated", 2, date(2026, 4, 1), vendor_id=9, cost_price=40)
+    ], default_margin=10)
+
+    stay, short, tour, unrated = report["lines"]
+
+    # Cheapest base-currency vendor at check-in; the USD rate is ignored
+    assert (stay["vendor_id"], stay["nightly"], stay["nights"]) == (7, True, 6)
+    assert [n["cost"] for n in stay["breakdown"]] == [100, 100, 144, 144, 154, 154]
+    assert [n["rules"] for n in stay["breakdown"]] == [[], [], [1], [1], [1, 2], [1, 2]]
+    assert (stay["unit_cost"], stay["total_cost"], stay["total_sell"]) == (796, 1592, 1751.2)
+    assert stay["bookable"] and not stay["missing_rates"]
+
+    # One night under the two-night minimum
+    assert short["nights"] == 1 and not short["bookable"]
+    assert short["unit_cost"] == 154
+
+    # No dates: priced at today with the cheapest vendor, one unit
+    assert (tour["vendor_id"], tour["nightly"], tour["nights"], tour["unit_cost"]) == (8, False, 1, 30)
+    assert tour["breakdown"][0]["date"] == date.today()
+
+    # No rate for the vendor: the line's own cost
+    assert (unrated["base_cost"], unrated["missing_rates"]) == (40, True)
+    assert unrated["breakdown"][0]["source"] == "item"
+
+    assert report["rules_applied"] == [1, 2, 3]
+    assert report["totals"]["cost"] == 1592 + 154 + 30 + 40
@@ -0,0 +1,41 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import pdf_render
+from app.services.pdf_render import PdfRenderService
+
+
+def test_timed_out_render_holds_its_slot_until_it_finishes(monkeypatch):
+    finish = threading.Event()
+
+    def slow_render(kind, snapshot):
+        finish.wait(5)
+        return b"%PDF", 0.0
+
+    monkeypatch.setattr(pdf_render, "render_document", slow_render)
+
+    service = PdfRenderService(workers=1, max_pending=1, timeout=0.1)
+    # Threads stand in for worker processes; the slot accounting is the same
+    service._executor = ThreadPoolExecutor(max_workers=1)
+
+    with pytest.raises(HTTPException) as timed_out:
+        service.render("invoice", {})
+    assert timed_out.value.detail == "PDF rendering timed out"
+
+    # The job is still running, so there is no free slot yet
+    with pytest.raises(HTTPException) as busy:
+        service.render("invoice", {})
+    assert busy.value.detail == "PDF renderer is busy, try again shortly"
+    assert service.metrics()["pending"] == 1
+
+    finish.set()
+    service._executor.shutdown(wait=True)
+    service._executor = ThreadPoolExecutor(max_workers=1)
+
+    assert service.render("invoice", {}) == b"%PDF"
+    assert service.metrics()["pending"] == 0
+
+    service.shutdown()
@@ -0,0 +1,84 @@
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from app import models, schemas
+from app.routers.quotation_items import create_quotation_items_bulk
+
+
+@pytest.fixture
+def seeded(db):
+    db.add_all([
+        models.Client(id=1, company_name="Acme"),
+        models.Service(id=1, name="Hotel", category=models.ServiceCategory.HOTEL),
+        models.Vendor(id=7, name="Vendor"),
+        models.Quotation(id=1, quotation_number="QT-1", client_id=1),
+        models.Quotation(id=2, quotation_number="QT-2", client_id=1)
+    ])
+    db.commit()
+    return db
+
+
+def _row(**overrides):
+    values = dict(
+        quotation_id=1, service_id=1, quantity=2,
+        start_date=date(2026, 3, 1), end_date=date(2026, 3, 3),
+        cost_price=100, manual_margin_percentage=10
+    )
+    values.update(overrides)
+    return schemas.QuotationItemCreate(**values)
+
+
+def test_inserts_rows_and_recomputes_each_quotation(seeded):
+    result = create_quotation_items_bulk(
+        schemas.QuotationItemBulkCreate(items=[
+            _row(),
+            _row(quotation_id=2, vendor_id=7, quantity=1, cost_price=50, manual_margin_percentage=None)
+        ]),
+        seeded
+    )
+
+    assert result == {"inserted": 2, "quotation_ids": [1, 2], "errors": []}
+
+    first, second = seeded.get(models.Quotation, 1), seeded.get(models.Quotation, 2)
+    seeded.refresh(first)
+    seeded.refresh(second)
+
+    assert (first.total_cost, first.total_sell) == (200, pytest.approx(220))
+    assert (second.total_cost, second.total_sell) == (50, 50)
+
+
+def test_atomic_mode_rejects_the_batch_listing_every_bad_row(seeded):
+    with pytest.raises(HTTPException) as raised:
+        create_quotation_items_bulk(
+            schemas.QuotationItemBulkCreate(items=[
+                _row(),
+                _row(quotation_id=99),
+                _row(vendor_id=7, external_supplier_id=3),
+                _row(vendor_id=8)
+            ]),
+            seeded
+        )
+
+    assert raised.value.status_code == 400
+    assert raised.value.detail == [
+        {"row": 1, "detail": "Quotation not found"},
+        {"row": 2, "detail": "Cannot use both vendor and external supplier for same item"},
+        {"row": 3, "detail": "Vendor not found"}
+    ]
+    assert seeded.query(models.QuotationItem).count() == 0
+
+
+def test_partial_mode_inserts_valid_rows(seeded):
+    result = create_quotation_items_bulk(
+        schemas.QuotationItemBulkCreate(
+            items=[_row(service_id=5), _row()],
+            mode=schemas.BulkMode.PARTIAL
+        ),
+        seeded
+    )
+
+    assert result["inserted"] == 1
+    assert result["errors"] == [{"row": 0, "detail": "Service not found"}]
+    assert seeded.query(models.QuotationItem).count() == 1
@@ -0,0 +1,92 @@
+import pytest
+
+from app import models
+from app.services.quotation_simulation import simulate
+
+
+def _item(item_id, quotation_id, vendor_id, cost, sell, quantity=1, manual=None):
+    return models.QuotationItem(
+        id=item_id, quotation_id=quotation_id, service_id=1, vendor_id=vendor_id,
+        quantity=quantity, cost_price=cost, sell_price=sell,
+        total_cost=cost * quantity, total_sell=sell * quantity,
+        manual_margin_percentage=manual
+    )
+
+
+@pytest.fixture
+def open_quotations(db):
+    db.add_all([
+        models.Service(id=1, name="Hotel", category=models.ServiceCategory.HOTEL),
+        models.Vendor(id=7, name="Atlas"),
+        models.Vendor(id=8, name="Blue"),
+        models.Quotation(id=1, quotation_number="QT-1", status=models.QuotationStatus.DRAFT,
+                         total_cost=100, total_sell=220, total_profit=120),
+        models.Quotation(id=2, quotation_number="QT-2", status=models.QuotationStatus.SENT,
+                         total_cost=400, total_sell=480, total_profit=80),
+        models.Quotation(id=3, quotation_number="QT-3", status=models.QuotationStatus.CONFIRMED,
+                         total_cost=100, total_sell=120, total_profit=20),
+        _item(1, 1, 7, 0, 100),                     # complimentary line: no markup
+        _item(2, 1, 8, 100, 120),
+        _item(3, 2, 7, 200, 240, quantity=2, manual=20),
+        _item(4, 3, 8, 100, 120)                     # not open
+    ])
+    db.commit()
+    return db
+
+
+def test_zero_cost_line_keeps_its_sell_when_not_repriced(open_quotations):
+    result = simulate(open_quotations, [{"vendor_id": 8, "percent": 10}])
+
+    assert result["lines"] == 3
+    assert result["lines_changed"] == 1
+    assert result["totals"]["profit_delta"] == 2
+    assert result["by_quotation"] == [{
+        "quotation_id": 1,
+        "quotation_number": "QT-1",
+        "lines_changed": 1,
+        "old_cost": 100, "new_cost": 110,
+        "old_sell": 220, "new_sell": 232,
+        "old_profit": 120, "new_profit": 122,
+        "profit_delta": 2
+    }]
+
+
+def test_new_margin_skips_kept_manual_margins(open_quotations):
+    result = simulate(open_quotations, margin_percentage=50)
+
+    # Lines 1 and 2 take 50%; line 3 keeps its manual 20%
+    assert result["lines_changed"] == 2
+    assert [(q["quotation_id"], q["new_sell"]) for q in result["by_quotation"]] == [(1, 150)]
+
+    overridden = simulate(open_quotations, margin_percentage=50, override_manual_margins=True)
+    assert overridden["lines_changed"] == 3
+
+
+def test_changes_add_up_on_matching_lines(open_quotations):
+    result = simulate(open_quotations, [
+        {"vendor_id": 7, "percent": 10},
+        {"amount": 5}
+    ])
+
+    assert result["changes_matched"] == [2, 3]
+    by_id = {q["quotation_id"]: q for q in result["by_quotation"]}
+    # 200 * 1.1 + 5 = 225 per unit, manual 20% on top, two units
+    assert (by_id[2]["new_cost"], by_id[2]["new_sell"]) == (450, 540)
+
+
+def test_apply_writes_only_changed_lines(open_quotations):
+    result = simulate(open_quotations, [{"vendor_id": 8, "percent": 10}], apply=True)
+
+    assert result["lines_updated"] == 1
+
+    QI = models.QuotationItem
+    items = {
+        i.id: (i.cost_price, i.sell_price, i.total_sell)
+        for i in open_quotations.query(QI).populate_existing()
+    }
+    assert items[1] == (0, 100, 100)
+    assert items[2] == (110, 132, 132)
+    assert items[4] == (100, 120, 120)     # confirmed quotation untouched
+
+    quotation = open_quotations.get(models.Quotation, 1, populate_existing=True)
+    assert (quotation.total_cost, quotation.total_sell) == (110, 232)
@@ -0,0 +1,137 @@
+from datetime import date
+
+import pytest
+
+from app import models, schemas
+from app.config import BASE_CURRENCY
+from app.routers import quotations
+from app.services.rate_resolver import RateIndex, ResolvedRate, _VendorRates, rate_index
+
+
+def _rate(rate_id, valid_from, valid_to, cost, vendor_id=1, currency=BASE_CURRENCY):
+    return ResolvedRate(rate_id, 1, vendor_id, valid_from, valid_to, cost, currency)
+
+
+# =====================================================
+# _VendorRates.at
+# =====================================================
+
+def test_at_finds_the_window_covering_the_day():
+    rates = _VendorRates([
+        _rate(2, date(2026, 4, 1), date(2026, 6, 30), 120),
+        _rate(1, date(2026, 1, 1), date(2026, 3, 31), 100),
+        _rate(3, date(2026, 9, 1), None, 140)
+    ])
+
+    assert rates.at(date(2025, 12, 31)) is None
+    assert rates.at(date(2026, 1, 1)).rate_id == 1
+    assert rates.at(date(2026, 3, 31)).rate_id == 1
+    assert rates.at(date(2026, 4, 1)).rate_id == 2
+    assert rates.at(date(2026, 7, 15)) is None          # gap
+    assert rates.at(date(2030, 1, 1)).rate_id == 3      # open ended
+
+
+def test_at_overlapping_rows_latest_start_wins():
+    rates = _VendorRates([
+        _rate(1, date(2026, 1, 1), date(2026, 12, 31), 100),
+        _rate(2, date(2026, 5, 1), date(2026, 5, 31), 150),
+        _rate(3, date(2026, 6, 1), date(2026, 6, 10), 90)
+    ])
+
+    assert rates.at(date(2026, 5, 15)).rate_id == 2
+    # Rate 3 ended; stepping back past it finds the long rate 1
+    assert rates.at(date(2026, 6, 20)).rate_id == 1
+
+
+# =====================================================
+# RateIndex._pick
+# =====================================================
+
+DAY = date(2026, 3, 1)
+
+
+def _vendors(*rates):
+    by_vendor = {}
+    for rate in rates:
+        by_vendor.setdefault(rate.vendor_id, []).append(rate)
+    return {vendor: _VendorRates(list(group)) for vendor, group in by_vendor.items()}
+
+
+def test_pick_given_vendor_only():
+    vendors = _vendors(_rate(1, DAY, None, 100, vendor_id=7), _rate(2, DAY, None, 80, vendor_id=8))
+
+    assert RateIndex._pick(vendors, DAY, 7).rate_id == 1
+    assert RateIndex._pick(vendors, DAY, 9) is None
+
+
+def test_pick_cheapest_vendor_then_lowest_rate_id():
+    vendors = _vendors(
+        _rate(3, DAY, None, 80, vendor_id=7),
+        _rate(2, DAY, None, 80, vendor_id=8),
+        _rate(1, DAY, None, 95, vendor_id=9),
+        _rate(4, date(2026, 4, 1), None, 10, vendor_id=10)   # not valid yet
+    )
+
+    assert RateIndex._pick(vendors, DAY, None).rate_id == 2
+
+
+def test_pick_compares_prices_within_one_currency():
+    vendors = _vendors(
+        _rate(1, DAY, None, 100, vendor_id=7, currency="PKR"),
+        _rate(2, DAY, None, 5, vendor_id=8, currency="USD")
+    )
+
+    assert RateIndex._pick(vendors, DAY, None) is None
+    assert RateIndex._pick(vendors, DAY, None, "pkr").rate_id == 1
+    assert RateIndex._pick(vendors, DAY, None, "USD").rate_id == 2
+    assert RateIndex._pick(vendors, DAY, None, "EUR") is None
+
+
+# =====================================================
+# POST /quotations/ prices from the index
+# =====================================================
+
+@pytest.fixture
+def catalogue(db, monkeypatch):
+    monkeypatch.setattr(quotations, "generate_quotation_number", lambda db: "QT-0001")
+    rate_index.invalidate()
+
+    db.add_all([
+        models.Client(id=1, company_name="Acme"),
+        models.Vendor(id=7, name="Atlas"),
+        models.Vendor(id=8, name="Blue"),
+        models.Service(id=1, name="Hotel", category=models.ServiceCategory.HOTEL),
+        models.Service(id=2, name="Tour", category=models.ServiceCategory.TOUR),
+        models.ServiceRate(service_id=1, vendor_id=7, valid_from=date(2026, 1, 1), cost_price=100, currency=BASE_CURRENCY),
+        models.ServiceRate(service_id=1, vendor_id=8, valid_from=date(2026, 1, 1), cost_price=90, currency=BASE_CURRENCY)
+    ])
+    db.commit()
+
+    yield db
+    rate_index.invalidate()
+
+
+def _line(service_id, vendor_id=None, cost_price=50):
+    return schemas.QuotationItemCreate(
+        service_id=service_id, vendor_id=vendor_id, quantity=2,
+        start_date=date(2026, 3, 1), end_date=date(2026, 3, 3), cost_price=cost_price
+    )
+
+
+def test_create_quotation_prices_lines_from_contracted_rates(catalogue):
+    quotation = quotations.create_quotation(
+        schemas.QuotationCreate(client_id=1, margin_percentage=10, items=[
+            _line(1),               # cheapest vendor: 8 at 90
+            _line(1, vendor_id=7),  # vendor given: 100
+            _line(2)                # no rate: submitted cost
+        ]),
+        catalogue
+    )
+
+    lines = sorted(quotation.items, key=lambda i: i.id)
+
+    assert [(i.vendor_id, i.cost_price, i.total_cost) for i in lines] == [
+        (8, 90, 180), (7, 100, 200), (None, 50, 100)
+    ]
+    assert lines[0].sell_price == pytest.approx(99)
+    assert quotation.total_cost == 480
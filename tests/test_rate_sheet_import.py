@@ -0,0 +1,131 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from app import models
+from app.services.rate_sheet_import import OPEN_END, _remaining, import_rate_sheet
+
+
+def _day(text):
+    return pd.Timestamp(text)
+
+
+def _spans(pieces):
+    return [(start.date(), end.date()) for start, end in pieces]
+
+
+# =====================================================
+# _remaining
+# =====================================================
+
+def test_remaining_window_in_the_middle_splits():
+    pieces = _remaining(_day("2026-01-01"), _day("2026-12-31"), [(_day("2026-04-01"), _day("2026-06-30"))])
+
+    assert _spans(pieces) == [
+        (date(2026, 1, 1), date(2026, 3, 31)),
+        (date(2026, 7, 1), date(2026, 12, 31))
+    ]
+
+
+def test_remaining_window_over_the_start_trims():
+    pieces = _remaining(_day("2026-01-01"), _day("2026-12-31"), [(_day("2025-12-01"), _day("2026-02-28"))])
+
+    assert _spans(pieces) == [(date(2026, 3, 1), date(2026, 12, 31))]
+
+
+def test_remaining_several_windows_leave_the_gaps():
+    pieces = _remaining(
+        _day("2026-01-01"), _day("2026-12-31"),
+        [(_day("2026-09-01"), _day("2026-12-31")), (_day("2026-03-01"), _day("2026-03-31"))]
+    )
+
+    assert _spans(pieces) == [
+        (date(2026, 1, 1), date(2026, 2, 28)),
+        (date(2026, 4, 1), date(2026, 8, 31))
+    ]
+
+
+def test_remaining_open_ended_window_keeps_only_the_head():
+    pieces = _remaining(_day("2026-01-01"), OPEN_END, [(_day("2026-05-01"), OPEN_END)])
+
+    assert _spans(pieces) == [(date(2026, 1, 1), date(2026, 4, 30))]
+
+
+def test_remaining_fully_covered_is_empty():
+    assert _remaining(_day("2026-02-01"), _day("2026-02-28"), [(_day("2026-01-01"), _day("2026-03-31"))]) == []
+
+
+# =====================================================
+# on_overlap=replace
+# =====================================================
+
+@pytest.fixture
+def rates(db):
+    db.add_all([
+        models.Vendor(id=1, name="Atlas"),
+        models.Service(id=1, name="Hotel A", category=models.ServiceCategory.HOTEL),
+        models.ServiceRate(
+            id=10, service_id=1, vendor_id=1, cost_price=100, currency="PKR",
+            valid_from=date(2026, 1, 1), valid_to=date(2026, 12, 31)
+        ),
+        models.ServiceRate(
+            id=11, service_id=1, vendor_id=1, cost_price=200, currency="PKR",
+            valid_from=date(2027, 2, 1), valid_to=date(2027, 2, 28)
+        ),
+        models.ServiceRate(
+            id=12, service_id=1, vendor_id=1, cost_price=300, currency="PKR",
+            valid_from=date(2027, 6, 1), valid_to=None
+        )
+    ])
+    db.commit()
+    return db
+
+
+SHEET = b"""service_id,vendor_id,valid_from,valid_to,cost_price
+1,1,01/04/2026,30/06/2026,120
+1,1,01/01/2027,31/03/2027,210
+1,1,01/09/2027,,310
+"""
+
+
+def _stored(db):
+    R = models.ServiceRate
+    return db.query(R.id, R.valid_from, R.valid_to, R.cost_price).order_by(R.valid_from, R.id).all()
+
+
+def test_overlaps_are_errors_by_default(rates):
+    result = import_rate_sheet(rates, SHEET, "rates.csv")
+
+    assert result["errors"] == 3
+    assert [r["error"] for r in result["rows"]] == [
+        "overlaps a current rate with a different validity window"
+    ] * 3
+    assert len(_stored(rates)) == 3
+
+
+def test_replace_trims_splits_and_removes(rates):
+    result = import_rate_sheet(rates, SHEET, "rates.csv", on_overlap="replace")
+
+    assert (result["replaced"], result["rates_split"], result["rates_removed"], result["rates_trimmed"]) == (3, 1, 1, 1)
+
+    changes = {c["rate_id"]: c for c in result["rate_changes"]}
+    assert changes[10]["action"] == "split"
+    assert changes[11]["action"] == "delete"
+    assert changes[12]["keeps"] == [{"valid_from": date(2027, 6, 1), "valid_to": date(2027, 8, 31)}]
+
+    assert [(r.valid_from, r.valid_to, r.cost_price) for r in _stored(rates)] == [
+        (date(2026, 1, 1), date(2026, 3, 31), 100),
+        (date(2026, 4, 1), date(2026, 6, 30), 120),
+        (date(2026, 7, 1), date(2026, 12, 31), 100),
+        (date(2027, 1, 1), date(2027, 3, 31), 210),
+        (date(2027, 6, 1), date(2027, 8, 31), 300),
+        (date(2027, 9, 1), None, 310)
+    ]
+
+
+def test_replace_dry_run_writes_nothing(rates):
+    result = import_rate_sheet(rates, SHEET, "rates.csv", on_overlap="replace", dry_run=True)
+
+    assert result["rates_split"] == 1
+    assert len(_stored(rates)) == 3
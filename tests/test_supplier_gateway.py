@@ -0,0 +1,74 @@
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+from http.server import ThreadingHTTPServer
+
+from app.services.external_api import grn
+from app.services.external_api.gateway import RateRequest, SupplierRateGateway
+from app.services.external_api.mock_server import make_handler
+
+
+@contextmanager
+def mock_supplier(monkeypatch, latency=0.0, fail_rate=0.0):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(latency, 0.0, fail_rate))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setattr(grn, "GRN_API_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    try:
+        yield
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _requests(count, supplier_id=1):
+    return [
+        RateRequest(i, supplier_id, f"P{i}", date(2026, 3, 1), date(2026, 3, 4))
+        for i in range(count)
+    ]
+
+
+def test_calls_run_concurrently(monkeypatch):
+    with mock_supplier(monkeypatch, latency=0.3):
+        started = time.monotonic()
+        results = SupplierRateGateway(max_concurrency=8, deadline=5).fetch_all_sync(_requests(6))
+        elapsed = time.monotonic() - started
+
+    assert sorted(results) == list(range(6))
+    assert all(r.ok and r.currency == "PKR" and 3000 <= r.price <= 8000 for r in results.values())
+    # Six 0.3s calls in sequence would take 1.8s
+    assert elapsed < 1.2
+
+
+def test_concurrency_is_capped_per_supplier(monkeypatch):
+    with mock_supplier(monkeypatch, latency=0.2):
+        started = time.monotonic()
+        results = SupplierRateGateway(max_concurrency=1, deadline=5).fetch_all_sync(_requests(3))
+        elapsed = time.monotonic() - started
+
+    assert all(r.ok for r in results.values())
+    assert elapsed >= 0.6
+
+
+def test_shared_deadline_reports_each_request(monkeypatch):
+    with mock_supplier(monkeypatch, latency=1.0):
+        started = time.monotonic()
+        results = SupplierRateGateway(max_concurrency=8, deadline=0.3).fetch_all_sync(_requests(3))
+        elapsed = time.monotonic() - started
+
+    assert [r.error for r in results.values()] == ["Supplier deadline exceeded"] * 3
+    assert elapsed < 0.9
+
+
+def test_http_errors_are_reported_not_raised(monkeypatch):
+    with mock_supplier(monkeypatch, fail_rate=1.0):
+        results = SupplierRateGateway(deadline=5).fetch_all_sync(_requests(2))
+
+    assert [r.error for r in results.values()] == ["Supplier returned HTTP 503"] * 2
+    assert not any(r.ok for r in results.values())
+
+
+def test_no_requests():
+    assert SupplierRateGateway().fetch_all_sync([]) == {}